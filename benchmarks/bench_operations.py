@@ -0,0 +1,259 @@
+"""End-to-end cost of the main folder operations on synthetic directories.
+
+    python benchmarks/bench_operations.py [--sizes 100 1000 10000 100000]
+        [--repeat 3] [--output results.json] [--compare benchmarks/baseline.json]
+
+For every size a fresh directory of numbered folders is generated in a temp
+dir and ``DirectoryManagerApp`` is driven through the same calls the UI makes:
+
+* ``listing``      open the directory (``_refresh_list``)
+* ``reopen``       switch away and back again (served by the directory cache)
+* ``refresh``      an external ``mkdir`` picked up by ``_auto_refresh_folder_list``
+* ``sort``         reverse the order and commit it (``_confirm_sort``)
+* ``clear_prefix`` strip every number prefix (``_clear_prefix_number``)
+* ``delete``       delete every tenth folder (``_delete_selected_folders``)
+
+Each operation is timed until the I/O executor is idle again.  Reported per
+operation: median latency over ``--repeat`` runs, file-system calls as seen by
+Python's audit hooks (open, scandir, mkdir, rename, rmdir, ...; plain
+``stat`` calls are not audited) and the peak of Python allocations, measured
+with ``tracemalloc`` in one extra run so it does not skew the timings.
+
+``--output`` writes the results as JSON; ``--compare`` reads such a file and
+exits with status 1 if any latency regressed by more than ``--threshold``.
+Set ``QT_QPA_PLATFORM=offscreen`` to run without a display.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore, QtWidgets  # noqa: E402
+
+import directory_manager  # noqa: E402
+
+OPERATIONS = ("listing", "reopen", "refresh", "sort", "clear_prefix", "delete")
+DEFAULT_SIZES = (100, 1000, 10000)
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+# Long enough for the watcher's debounce, so follow-up rescans of an
+# operation's own changes settle before the next one starts.
+SETTLE_MS = 400
+
+
+class FsCallCounter:
+    """Counts file-system audit events raised while ``active`` is set."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.active = False
+        sys.addaudithook(self._hook)
+
+    def _hook(self, event: str, args: tuple) -> None:
+        if self.active and (event == "open" or event.startswith(("os.", "shutil."))):
+            self.count += 1
+
+
+def make_tree(path: str, count: int) -> None:
+    os.makedirs(path)
+    width = len(str(count))
+    for i in range(1, count + 1):
+        os.mkdir(os.path.join(path, f"{i:0{width}d}_folder {i}"))
+
+
+def wait_idle(window: directory_manager.DirectoryManagerApp) -> None:
+    app = QtWidgets.QApplication.instance()
+    app.processEvents()
+    while window._io.busy:
+        # Job results arrive as queued signals, which wake the wait.
+        app.processEvents(QtCore.QEventLoop.WaitForMoreEvents)
+        app.processEvents()
+
+
+def settle(window: directory_manager.DirectoryManagerApp) -> None:
+    wait_idle(window)
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(SETTLE_MS, loop.quit)
+    loop.exec_()
+    wait_idle(window)
+
+
+class Runner:
+    def __init__(self, window: directory_manager.DirectoryManagerApp, scratch: str) -> None:
+        self.window = window
+        self.scratch = scratch
+        self.counter = FsCallCounter()
+
+    def _timed(self, action: Callable[[], None], memory: bool) -> dict[str, float]:
+        settle(self.window)
+        if memory:
+            tracemalloc.start()
+        self.counter.count = 0
+        self.counter.active = True
+        started = time.perf_counter()
+        action()
+        wait_idle(self.window)
+        elapsed = time.perf_counter() - started
+        self.counter.active = False
+        sample = {"latency_ms": elapsed * 1000, "fs_calls": self.counter.count}
+        if memory:
+            sample["peak_kb"] = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        return sample
+
+    def run(self, path: str, memory: bool) -> dict[str, dict[str, float]]:
+        window = self.window
+        results: dict[str, dict[str, float]] = {}
+
+        def open_path(target: str) -> None:
+            window.path_edit.setText(target)
+            window._refresh_list(target)
+
+        results["listing"] = self._timed(lambda: open_path(path), memory)
+        open_path(self.scratch)
+        results["reopen"] = self._timed(lambda: open_path(path), memory)
+
+        def external_change() -> None:
+            os.mkdir(os.path.join(path, "zz_added externally"))
+            window._auto_refresh_folder_list(path)
+
+        results["refresh"] = self._timed(external_change, memory)
+
+        def sort() -> None:
+            window.folder_model.set_names(reversed(window.folder_model.names()))
+            window._confirm_sort()
+
+        results["sort"] = self._timed(sort, memory)
+        results["clear_prefix"] = self._timed(window._clear_prefix_number, memory)
+
+        def delete() -> None:
+            model = window.folder_model
+            selection = QtCore.QItemSelection()
+            for row in range(0, model.rowCount(), 10):
+                selection.select(model.index(row), model.index(row))
+            window.list_view.selectionModel().select(
+                selection, QtCore.QItemSelectionModel.ClearAndSelect
+            )
+            window._delete_selected_folders()
+
+        results["delete"] = self._timed(delete, memory)
+        open_path(self.scratch)
+        settle(window)
+        window._dir_cache.discard(path)
+        return results
+
+
+def run_suite(sizes: list[int], repeat: int) -> dict:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    # Deleting asks for confirmation; the benchmark always answers yes.
+    QtWidgets.QMessageBox.question = lambda *args, **kwargs: QtWidgets.QMessageBox.Yes
+    work = tempfile.mkdtemp(prefix="dm_bench_")
+    try:
+        state = os.path.join(work, directory_manager.CONFIG_FILE)
+        scratch = os.path.join(work, "scratch")
+        os.mkdir(scratch)
+        window = directory_manager.DirectoryManagerApp(state_path=state)
+        window.resize(600, 900)
+        window.show()
+        while window.blur_overlay is None:
+            app.processEvents()
+        runner = Runner(window, scratch)
+        results: dict[str, dict[str, dict[str, float]]] = {}
+        for size in sizes:
+            samples: dict[str, list[dict[str, float]]] = {op: [] for op in OPERATIONS}
+            peaks: dict[str, float] = {}
+            for run in range(repeat + 1):
+                memory = run == repeat
+                path = os.path.join(work, f"tree_{size}_{run}")
+                make_tree(path, size)
+                for op, sample in runner.run(path, memory).items():
+                    if memory:
+                        peaks[op] = sample["peak_kb"]
+                    else:
+                        samples[op].append(sample)
+                shutil.rmtree(path, ignore_errors=True)
+            results[str(size)] = {
+                op: {
+                    "latency_ms": round(statistics.median(s["latency_ms"] for s in samples[op]), 2),
+                    "fs_calls": int(statistics.median(s["fs_calls"] for s in samples[op])),
+                    "peak_kb": round(peaks[op], 1),
+                }
+                for op in OPERATIONS
+            }
+            report(size, results[str(size)])
+        window.close()
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "qt": QtCore.QT_VERSION_STR,
+            "platform": platform.platform(),
+            "qpa": QtWidgets.QApplication.platformName(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def report(size: int, results: dict[str, dict[str, float]]) -> None:
+    print(f"\n{size} folders")
+    print(f"{'operation':>14} {'latency ms':>11} {'fs calls':>9} {'peak KB':>9}")
+    for op, r in results.items():
+        print(f"{op:>14} {r['latency_ms']:>11.2f} {r['fs_calls']:>9} {r['peak_kb']:>9.1f}")
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """Print latency ratios against *baseline*; returns False on a regression."""
+    ok = True
+    print(f"\n{'size':>8} {'operation':>14} {'baseline':>9} {'now':>9} {'ratio':>6}")
+    for size, ops in current["results"].items():
+        for op, r in ops.items():
+            before = baseline.get("results", {}).get(size, {}).get(op)
+            if not before:
+                continue
+            ratio = r["latency_ms"] / max(before["latency_ms"], 0.01)
+            flag = ""
+            if ratio > 1 + threshold:
+                flag, ok = "  REGRESSION", False
+            print(
+                f"{size:>8} {op:>14} {before['latency_ms']:>9.2f} "
+                f"{r['latency_ms']:>9.2f} {ratio:>5.2f}x{flag}"
+            )
+    return ok
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help=f"baseline to compare with (e.g. {BASELINE_FILE})")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="allowed latency increase (default 0.25 = 25%%)"
+    )
+    args = parser.parse_args(argv)
+    current = run_suite(args.sizes, max(1, args.repeat))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(current, fh, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            return 0 if compare(current, json.load(fh), args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,63 @@
+"""Repaint cost of the folder list with graphics effects versus light rendering.
+
+    python benchmarks/bench_render.py [ROWS ...]
+
+Each mode scrolls the list one page at a time and repaints the whole window
+synchronously; the median frame time is reported.  Set
+``QT_QPA_PLATFORM=offscreen`` to run without a display.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtWidgets  # noqa: E402
+
+import directory_manager  # noqa: E402
+
+FRAMES = 60
+
+
+def measure(window: directory_manager.DirectoryManagerApp, light: bool) -> float:
+    window._set_light_rendering(light)
+    bar = window.list_view.verticalScrollBar()
+    bar.setValue(0)
+    QtWidgets.QApplication.processEvents()
+    times: list[float] = []
+    for frame in range(FRAMES):
+        bar.setValue((frame * bar.pageStep()) % (bar.maximum() + 1))
+        started = time.perf_counter()
+        window.repaint()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main(argv: list[str]) -> None:
+    counts = [int(a) for a in argv] or [100, 2000, 20000]
+    app = QtWidgets.QApplication(sys.argv[:1])
+    state = os.path.join(tempfile.mkdtemp(), directory_manager.CONFIG_FILE)
+    window = directory_manager.DirectoryManagerApp(state_path=state)
+    window.resize(600, 900)
+    window.show()
+    while window.blur_overlay is None:  # effects are set up after the first paint
+        app.processEvents()
+    print(f"{'rows':>8} {'effects ms':>11} {'light ms':>9} {'speed-up':>9}")
+    for count in counts:
+        window.folder_model.set_names(f"{i:05d}_folder" for i in range(count))
+        window.list_view.setFixedHeight(30 * 32 + 4)
+        window.setFixedHeight(30 * 32 + 100)
+        app.processEvents()
+        effects = measure(window, light=False)
+        light = measure(window, light=True)
+        print(f"{count:>8} {effects:>11.2f} {light:>9.2f} {effects / light:>8.1f}x")
+    window.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
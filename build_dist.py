@@ -1,10 +1,128 @@
 from __future__ import annotations
 
+import argparse
+import json
+import os
 import pathlib
+import shutil
+import statistics
+import subprocess
 import sys
+import time
+
+from startup_profile import PROFILE_FILE
+from state_store import CONFIG_FILE, default_state_path
+
+# Qt pieces PyQt5's hooks collect but this widgets-only app never loads:
+# QML/Quick and the WebGL platform (which drag in Network/WebSockets), the
+# ANGLE/D3D GL stack, SVG and the extra image-format plugins.  ``qico`` stays
+# for the window icon.
+TRIMMED_QT_FILES = [
+    "bin/Qt5Quick.dll",
+    "bin/Qt5Qml.dll",
+    "bin/Qt5QmlModels.dll",
+    "bin/Qt5Network.dll",
+    "bin/Qt5WebSockets.dll",
+    "bin/Qt5DBus.dll",
+    "bin/Qt5Svg.dll",
+    "bin/d3dcompiler_47.dll",
+    "bin/libEGL.dll",
+    "bin/libGLESv2.dll",
+    "bin/opengl32sw.dll",
+    "plugins/platforms/qwebgl.dll",
+    "plugins/platforms/qminimal.dll",
+    "plugins/platforms/qoffscreen.dll",
+    "plugins/platformthemes",
+    "plugins/generic",
+    "plugins/iconengines",
+    "plugins/imageformats/qgif.dll",
+    "plugins/imageformats/qicns.dll",
+    "plugins/imageformats/qjpeg.dll",
+    "plugins/imageformats/qsvg.dll",
+    "plugins/imageformats/qtga.dll",
+    "plugins/imageformats/qtiff.dll",
+    "plugins/imageformats/qwbmp.dll",
+    "plugins/imageformats/qwebp.dll",
+]
+TRIMMED_EXCLUDES = ["tkinter", "unittest", "pydoc", "pydoc_data", "xmlrpc", "lib2to3"]
+PROFILES = ("trimmed", "full")
+
+
+def _tree_size(path: pathlib.Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def trim_bundle(app_dir: pathlib.Path) -> int:
+    """Delete unused Qt files from a one-directory build; returns the bytes saved."""
+    qt_dir = app_dir / "_internal" / "PyQt5" / "Qt5"
+    saved = 0
+    for relative in TRIMMED_QT_FILES:
+        target = qt_dir / relative
+        if not target.exists():
+            continue
+        saved += _tree_size(target)
+        if target.is_dir():
+            shutil.rmtree(target)
+        else:
+            target.unlink()
+    return saved
+
+
+def _profile_records(path: str) -> list[dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            return [json.loads(line) for line in fh if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def measure_startup(app_dir: pathlib.Path, runs: int) -> dict[str, float]:
+    """Launch the built app *runs* times in profile mode; median of each phase in ms.
+
+    Launches that fail, time out or write no profile are reported and left out.
+    """
+    exe = app_dir / ("directory_manager.exe" if sys.platform.startswith("win") else "directory_manager")
+    # The app writes the profile next to its state file, which may be in the user config dir.
+    state_path = default_state_path(CONFIG_FILE, str(app_dir))
+    profile_file = os.path.join(os.path.dirname(state_path), PROFILE_FILE)
+    env = dict(os.environ, DM_PROFILE_STARTUP="exit")
+    samples: dict[str, list[float]] = {}
+    for run in range(1, runs + 1):
+        seen = len(_profile_records(profile_file))
+        launched = time.time()
+        try:
+            result = subprocess.run([str(exe)], env=env, timeout=60, check=False)
+        except subprocess.TimeoutExpired:
+            print(f"launch {run}: still running after 60 s, skipped", file=sys.stderr)
+            continue
+        # Each launch appends exactly one line; anything else cannot be attributed to it.
+        records = _profile_records(profile_file)[seen:]
+        if result.returncode != 0 or len(records) != 1:
+            print(
+                f"launch {run}: exit code {result.returncode}, "
+                f"{len(records)} profile records, skipped",
+                file=sys.stderr,
+            )
+            continue
+        record = records[0]
+        # Bootloader and interpreter start-up happen before the first in-process mark.
+        samples.setdefault("process_start", []).append((record["started"] - launched) * 1000)
+        for phase, ms in record["phases"].items():
+            samples.setdefault(phase, []).append(ms)
+    return {phase: round(statistics.median(values), 1) for phase, values in samples.items()}
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the one-directory distribution.")
+    parser.add_argument("--profile", choices=PROFILES, default="trimmed")
+    parser.add_argument(
+        "--measure", type=int, default=0, metavar="RUNS",
+        help="launch the build RUNS times with --profile-startup and record the medians",
+    )
+    args = parser.parse_args()
+
     try:
         import PyInstaller.__main__
     except ImportError:  # pragma: no cover - runtime guard
@@ -12,6 +130,10 @@ def main() -> None:
         sys.exit(1)
 
     project_root = pathlib.Path(__file__).resolve().parent
+    excludes: list[str] = []
+    if args.profile == "trimmed":
+        for module in TRIMMED_EXCLUDES:
+            excludes += ["--exclude-module", module]
     PyInstaller.__main__.run(
         [
             str(project_root / "directory_manager.py"),
@@ -29,9 +151,35 @@ def main() -> None:
             str(project_root / "build"),
             "--icon",
             str(project_root / "Directory_Manager.ico"),
+            *excludes,
         ]
     )
 
+    app_dir = project_root / "dist" / "directory_manager"
+    if args.profile == "trimmed":
+        saved = trim_bundle(app_dir)
+        print(f"trimmed {saved / 1e6:.1f} MB of unused Qt files")
+    print(f"bundle size: {_tree_size(app_dir) / 1e6:.1f} MB ({args.profile})")
+
+    if args.measure:
+        medians = measure_startup(app_dir, args.measure)
+        if not medians:
+            print("No launch produced a startup profile.", file=sys.stderr)
+            sys.exit(1)
+        results_file = project_root / "build" / "startup_profiles.json"
+        try:
+            recorded = json.loads(results_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            recorded = {}
+        recorded[args.profile] = medians
+        results_file.write_text(json.dumps(recorded, indent=2), encoding="utf-8")
+        other = recorded.get("full" if args.profile == "trimmed" else "trimmed", {})
+        for phase, ms in medians.items():
+            line = f"{phase:>16}: {ms:8.1f} ms"
+            if phase in other:
+                line += f"  ({ms - other[phase]:+.1f} vs {'full' if args.profile == 'trimmed' else 'trimmed'})"
+            print(line)
+
 
 if __name__ == "__main__":
     main()
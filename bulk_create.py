@@ -0,0 +1,131 @@
+"""Create many folders in one pass.
+
+Names come from pasted lines or from a template such as ``Chapter {n:03d}``.
+Collisions are resolved against a single directory snapshot instead of
+probing the disk name by name, and when sorting is active the new folders are
+created directly under their numbered names, with the existing folders
+renumbered around them in the same batch.
+"""
+
+from __future__ import annotations
+
+import os
+import string
+import sys
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Sequence
+
+from folder_snapshot import INTERNAL_PREFIX, DirectorySnapshot
+from rename_planner import NumberingScheme, RenamePlan, plan_sort_targets
+
+MAX_FOLDERS = 10000
+_WINDOWS_INVALID = set('<>:"|?*') | {chr(c) for c in range(32)}
+_WINDOWS_RESERVED = {"CON", "PRN", "AUX", "NUL"} | {
+    f"{port}{i}" for port in ("COM", "LPT") for i in range(1, 10)
+}
+
+
+def parse_lines(text: str) -> list[str]:
+    """Non-empty, stripped lines of *text*."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def expand_template(template: str, count: int, start: int = 1) -> list[str]:
+    """``template.format(n=i)`` for ``count`` numbers from ``start``."""
+    fields = [name for _, name, _, _ in string.Formatter().parse(template) if name is not None]
+    if not fields:
+        raise ValueError("the template needs a {n} placeholder")
+    if any(name != "n" for name in fields):
+        raise ValueError("only the {n} placeholder is supported")
+    if not 0 < count <= MAX_FOLDERS:
+        raise ValueError(f"count must be between 1 and {MAX_FOLDERS}")
+    return [template.format(n=i).strip() for i in range(start, start + count)]
+
+
+def name_error(name: str) -> str | None:
+    """Why *name* cannot be a folder name here, or None if it can."""
+    if not name or name in (".", ".."):
+        return "empty name"
+    if "/" in name or "\\" in name or "\0" in name:
+        return "path separators are not allowed"
+    if name.startswith(INTERNAL_PREFIX):
+        return "reserved prefix"
+    if sys.platform.startswith("win"):
+        if _WINDOWS_INVALID & set(name):
+            return "invalid character"
+        if name[-1] in ". " or name.split(".")[0].upper() in _WINDOWS_RESERVED:
+            return "reserved name"
+    return None
+
+
+@dataclass
+class CreatePlan:
+    base_path: str
+    # Names to create, in the requested order.
+    created: list[str] = field(default_factory=list)
+    # Full folder order afterwards (existing folders with the new ones inserted).
+    order: list[str] = field(default_factory=list)
+    renames: RenamePlan | None = None
+    rejected: list[tuple[str, str]] = field(default_factory=list)
+
+
+def plan_create(
+    requested: Iterable[str],
+    snapshot: DirectorySnapshot,
+    order: Sequence[str],
+    position: int | None = None,
+    scheme: NumberingScheme | None = None,
+) -> CreatePlan:
+    """Plan creating *requested* at *position* of *order* (the end if None).
+
+    Names already taken in *snapshot* or earlier in the batch get a ``(n)``
+    suffix.  With a *scheme* the new folders get their numbered names right
+    away and ``renames`` renumbers the existing folders around them.
+    """
+    plan = CreatePlan(snapshot.path)
+    taken = set(snapshot.occupied_keys())
+    fresh: list[str] = []
+    for name in requested:
+        error = name_error(name)
+        if error is not None:
+            plan.rejected.append((name, error))
+            continue
+        candidate, counter = name, 1
+        while os.path.normcase(candidate) in taken:
+            candidate = f"{name}({counter})"
+            counter += 1
+        taken.add(os.path.normcase(candidate))
+        fresh.append(candidate)
+    current = [name for name in order if name in snapshot]
+    position = len(current) if position is None else max(0, min(position, len(current)))
+    folders = current[:position] + fresh + current[position:]
+    if scheme is None:
+        plan.created, plan.order = fresh, folders
+        return plan
+    plan.renames, targets = plan_sort_targets(folders, snapshot, scheme)
+    new_names = dict(zip(folders, targets))
+    plan.created = [new_names[name] for name in fresh]
+    plan.order = targets
+    return plan
+
+
+def create_folders(
+    base_path: str,
+    names: Sequence[str],
+    progress: Callable[[int, int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> tuple[list[str], list[tuple[str, Exception]]]:
+    """``mkdir`` each name; returns the created names and the failures."""
+    created: list[str] = []
+    failures: list[tuple[str, Exception]] = []
+    for done, name in enumerate(names, 1):
+        if cancelled is not None and cancelled():
+            break
+        try:
+            os.mkdir(os.path.join(base_path, name))
+            created.append(name)
+        except OSError as exc:
+            failures.append((name, exc))
+        if progress is not None:
+            progress(done, len(names))
+    return created, failures
@@ -0,0 +1,99 @@
+"""Coalesces rapid reorders into a single rename commit.
+
+Every drop while sorting is active used to start a full rename pass.  The
+``CommitScheduler`` keeps the latest order of a directory as *pending*
+instead and asks for one commit (``commitDue``) once no further reorder
+arrived for ``quiet_ms``, or right away on ``flush``.  The app brackets each
+commit with ``begin``/``end``; while one is in flight a due commit waits for
+it, and ``remap`` carries the pending order over the folders the in-flight
+commit renamed.  A reorder of another directory commits the pending one
+first.
+"""
+
+from __future__ import annotations
+
+import os
+
+from PyQt5 import QtCore
+
+QUIET_MS = 700
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+
+class CommitScheduler(QtCore.QObject):
+    commitDue = QtCore.pyqtSignal(str, list)
+    # Pending count or in-flight state changed.
+    stateChanged = QtCore.pyqtSignal()
+
+    def __init__(self, parent: QtCore.QObject | None = None, quiet_ms: int = QUIET_MS) -> None:
+        super().__init__(parent)
+        self._path: str | None = None
+        self._order: list[str] = []
+        self.pending_count = 0
+        self.in_flight = 0
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(quiet_ms)
+        self._timer.timeout.connect(self._on_quiet)
+
+    @property
+    def idle(self) -> bool:
+        return self._path is None and not self.in_flight
+
+    def pending_order(self, path: str) -> list[str] | None:
+        if self._path is None or _key(path) != _key(self._path):
+            return None
+        return list(self._order)
+
+    def schedule(self, path: str, order: list[str]) -> None:
+        if self._path is not None and _key(path) != _key(self._path):
+            self._commit()
+        self._path = path
+        self._order = list(order)
+        self.pending_count += 1
+        self._timer.start()
+        self.stateChanged.emit()
+
+    def remap(self, path: str, renamed: list[tuple[str, str]]) -> None:
+        if renamed and self.pending_order(path) is not None:
+            mapping = dict(renamed)
+            self._order = [mapping.get(name, name) for name in self._order]
+
+    def flush(self) -> None:
+        """Commit the pending order now, or as soon as the in-flight commit ends."""
+        self._timer.stop()
+        if not self.in_flight:
+            self._commit()
+
+    def discard(self) -> None:
+        self._timer.stop()
+        if self._path is not None:
+            self._path = None
+            self.pending_count = 0
+            self.stateChanged.emit()
+
+    def begin(self) -> None:
+        self.in_flight += 1
+        self.stateChanged.emit()
+
+    def end(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        if not self.in_flight and not self._timer.isActive():
+            # The quiet period (or a flush) passed while the last commit ran.
+            self._commit()
+        self.stateChanged.emit()
+
+    def _on_quiet(self) -> None:
+        if not self.in_flight:
+            self._commit()
+
+    def _commit(self) -> None:
+        if self._path is None:
+            return
+        path, order = self._path, self._order
+        self._path, self._order, self.pending_count = None, [], 0
+        self.commitDue.emit(path, order)
+        self.stateChanged.emit()
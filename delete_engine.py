@@ -0,0 +1,190 @@
+"""Two-phase bulk delete.
+
+``stage`` renames each target into a hidden staging folder inside the same
+directory (one cheap rename per folder, so the list can update at once);
+``purge`` then removes the staged trees on a thread pool, reporting progress
+and throughput, and collects every failure into a single report.
+"""
+
+from __future__ import annotations
+
+import os
+import stat
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable
+
+import tracing
+from folder_snapshot import INTERNAL_PREFIX
+
+STAGING_DIR = INTERNAL_PREFIX + "trash"
+
+
+@dataclass
+class StagedFolder:
+    name: str
+    staged_path: str
+
+
+@dataclass
+class DeleteReport:
+    deleted: list[str] = field(default_factory=list)
+    failures: list[tuple[str, Exception]] = field(default_factory=list)
+    entries: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Removed filesystem entries per second."""
+        return self.entries / self.seconds if self.seconds > 0 else 0.0
+
+
+def _force(func: Callable[[str], None], path: str) -> None:
+    # Read-only files (common on Windows) cannot be unlinked until made writable.
+    os.chmod(path, stat.S_IWRITE)
+    func(path)
+
+
+def is_tree(info: os.stat_result) -> bool:
+    """A real directory: not a symlink, and not a junction or other reparse point on Windows."""
+    if not stat.S_ISDIR(info.st_mode):
+        return False
+    return not getattr(info, "st_file_attributes", 0) & stat.FILE_ATTRIBUTE_REPARSE_POINT
+
+
+def remove_tree(path: str) -> int:
+    """Remove a file or directory tree bottom-up; returns the number of entries removed.
+
+    Links and junctions are removed themselves, never followed, so nothing
+    outside *path* is touched.
+    """
+    try:
+        is_dir = is_tree(os.lstat(path))
+    except OSError:
+        is_dir = False
+    if not is_dir:
+        try:
+            os.unlink(path)
+        except PermissionError:
+            _force(os.unlink, path)
+        return 1
+    removed = 0
+    with os.scandir(path) as it:
+        children = [entry.path for entry in it]
+    for child in children:
+        removed += remove_tree(child)
+    try:
+        os.rmdir(path)
+    except PermissionError:
+        _force(os.rmdir, path)
+    return removed + 1
+
+
+def stage(base_path: str, names: list[str]) -> tuple[list[StagedFolder], list[tuple[str, Exception]]]:
+    staging = os.path.join(base_path, STAGING_DIR)
+    staged: list[StagedFolder] = []
+    failures: list[tuple[str, Exception]] = []
+    try:
+        os.makedirs(staging, exist_ok=True)
+    except OSError as exc:
+        return [], [(name, exc) for name in names]
+    if os.name == "nt":
+        try:
+            import ctypes
+
+            ctypes.windll.kernel32.SetFileAttributesW(staging, 0x2)  # FILE_ATTRIBUTE_HIDDEN
+        except Exception:
+            pass
+    for name in names:
+        target = os.path.join(staging, f"{uuid.uuid4().hex[:8]}_{name}")
+        try:
+            try:
+                os.rename(os.path.join(base_path, name), target)
+            except FileNotFoundError:
+                # A finishing purge may have just removed the empty staging folder.
+                os.makedirs(staging, exist_ok=True)
+                os.rename(os.path.join(base_path, name), target)
+            staged.append(StagedFolder(name, target))
+        except OSError as exc:
+            failures.append((name, exc))
+    return staged, failures
+
+
+def purge(
+    base_path: str,
+    staged: list[StagedFolder],
+    workers: int = 8,
+    progress: Callable[[int, int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> DeleteReport:
+    """Delete staged trees in parallel; failed folders are moved back to their old name."""
+    report = DeleteReport()
+    started = time.perf_counter()
+    jobs: list[tuple[StagedFolder, str]] = []
+    for folder in staged:
+        try:
+            with os.scandir(folder.staged_path) as it:
+                jobs.extend((folder, entry.path) for entry in it)
+        except OSError as exc:
+            report.failures.append((folder.name, exc))
+    failed: dict[str, Exception] = {name: exc for name, exc in report.failures}
+    total = len(jobs) + len(staged)
+    done = 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(remove_tree, path): folder for folder, path in jobs}
+        for future in as_completed(futures):
+            folder = futures[future]
+            try:
+                removed = future.result()
+                report.entries += removed
+                tracing.count("deletes", removed)
+            except Exception as exc:
+                failed.setdefault(folder.name, exc)
+            done += 1
+            if progress is not None:
+                progress(done, total)
+            if cancelled is not None and cancelled():
+                for pending in futures:
+                    pending.cancel()
+                break
+    if cancelled is not None and cancelled():
+        # Leave the rest staged; ``leftovers`` picks it up next time.
+        report.seconds = time.perf_counter() - started
+        return report
+    for folder in staged:
+        if folder.name not in failed:
+            try:
+                os.rmdir(folder.staged_path)
+                report.entries += 1
+                report.deleted.append(folder.name)
+                continue
+            except OSError as exc:
+                failed[folder.name] = exc
+        restore = os.path.join(base_path, folder.name)
+        if not os.path.lexists(restore):
+            try:
+                os.rename(folder.staged_path, restore)
+            except OSError:
+                pass
+    report.failures = [(name, exc) for name, exc in failed.items()]
+    report.seconds = time.perf_counter() - started
+    staging = os.path.join(base_path, STAGING_DIR)
+    try:
+        os.rmdir(staging)
+    except OSError:
+        pass
+    if progress is not None:
+        progress(total, total)
+    return report
+
+
+def leftovers(base_path: str) -> list[StagedFolder]:
+    """Staged folders left behind by an interrupted purge."""
+    staging = os.path.join(base_path, STAGING_DIR)
+    try:
+        with os.scandir(staging) as it:
+            return [StagedFolder(entry.name.split("_", 1)[-1], entry.path) for entry in it]
+    except OSError:
+        return []
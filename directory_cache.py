@@ -0,0 +1,122 @@
+"""LRU cache of recently shown directories.
+
+Keeps each directory's snapshot together with the view state (scroll
+position, selection, current item) so switching back to it is instant.  The
+cache is bounded both by entry count and by an estimate of the memory the
+snapshots hold; the least recently used entries are evicted first and every
+hit, miss and eviction is counted.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from folder_snapshot import DirectorySnapshot
+
+MAX_ENTRIES = 8
+MAX_BYTES = 64 * 1024 * 1024
+# Rough per-folder overhead of a snapshot beyond the name string itself
+# (FolderEntry object, dict slot, sorted-name list slot, file id).
+ENTRY_OVERHEAD = 200
+
+
+def _key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+
+def estimate_bytes(snapshot: DirectorySnapshot) -> int:
+    return sum(sys.getsizeof(name) + ENTRY_OVERHEAD for name in snapshot)
+
+
+@dataclass
+class CachedDirectory:
+    snapshot: DirectorySnapshot
+    scroll: int = 0
+    selected: list[str] = field(default_factory=list)
+    current: str | None = None
+    # Set when the watcher reported a change that has not been rescanned yet.
+    stale: bool = False
+    size: int = 0
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    evicted_bytes: int = 0
+
+
+class DirectoryCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._entries: OrderedDict[str, CachedDirectory] = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: object) -> bool:
+        return isinstance(path, str) and _key(path) in self._entries
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def paths(self) -> list[str]:
+        """Cached directory paths, most recently used last."""
+        return [entry.snapshot.path for entry in self._entries.values()]
+
+    def get(self, path: str) -> CachedDirectory | None:
+        entry = self._entries.get(_key(path))
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(_key(path))
+        self.stats.hits += 1
+        return entry
+
+    def peek(self, path: str) -> CachedDirectory | None:
+        """Like ``get`` but without touching recency or statistics."""
+        return self._entries.get(_key(path))
+
+    def put(self, entry: CachedDirectory) -> list[str]:
+        """Insert or replace *entry*; returns the paths evicted to stay within the caps."""
+        key = _key(entry.snapshot.path)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+        entry.size = estimate_bytes(entry.snapshot)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        evicted: list[str] = []
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, victim = self._entries.popitem(last=False)
+            self._bytes -= victim.size
+            self.stats.evictions += 1
+            self.stats.evicted_bytes += victim.size
+            evicted.append(victim.snapshot.path)
+        return evicted
+
+    def update_snapshot(self, snapshot: DirectorySnapshot) -> None:
+        """Refresh a cached listing in place (e.g. after a background rescan)."""
+        entry = self._entries.get(_key(snapshot.path))
+        if entry is None:
+            return
+        entry.snapshot = snapshot
+        entry.stale = False
+        self._bytes -= entry.size
+        entry.size = estimate_bytes(snapshot)
+        self._bytes += entry.size
+
+    def discard(self, path: str) -> None:
+        entry = self._entries.pop(_key(path), None)
+        if entry is not None:
+            self._bytes -= entry.size
@@ -1,16 +1,77 @@
 from __future__ import annotations
 
-import json
 import os
-import re
-import shutil
 import subprocess
 import sys
+import threading
+import time
 from functools import partial
+from typing import Any, Callable
+
+import folder_cli
+from startup_profile import StartupProfile
+
+if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        import multiprocessing
+
+        multiprocessing.freeze_support()
+    if folder_cli.is_command(sys.argv[1:]):
+        # Command-line mode: dispatch before PyQt5 is ever imported.
+        sys.exit(folder_cli.main(sys.argv[1:]))
+
+STARTUP = StartupProfile.from_environment(sys.argv)
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 
-CONFIG_FILE = "last_state.json"
+import delete_engine
+import tracing
+import transfer_engine
+from bulk_create import MAX_FOLDERS, create_folders, expand_template, parse_lines, plan_create
+from commit_scheduler import CommitScheduler
+from delete_engine import DeleteReport, StagedFolder
+from directory_cache import CachedDirectory, DirectoryCache
+from folder_delegate import FolderItemDelegate
+from folder_model import FolderFilterModel, FolderListModel, RenamePreviewModel
+from folder_snapshot import DirectorySnapshot, FolderEntry, SnapshotDiff
+from folder_tree import FolderTreeModel
+from folder_watcher import FolderWatcher
+from io_executor import IoExecutor, TaskContext
+from name_index import NameIndex
+from rename_journal import JOURNAL_DIR, RecoveryResult, RenameJournal
+from rename_planner import NumberingScheme, plan_clear_prefix, plan_sort
+from rename_rules import (
+    CASE_MODES,
+    CaseRule,
+    InsertRule,
+    ReplaceRule,
+    RuleSet,
+    StripPrefixRule,
+    TemplateRule,
+    plan_rules,
+)
+from size_index import SizeIndex, format_size, scan_folders
+from state_store import CONFIG_FILE, StateStore, default_state_path
+from transfer_engine import TransferReport
+
+SIZE_INDEX_FILE = "size_index.json"
+
+# Status tints as (r, g, b, alpha).
+PAUSED_TINT = (255, 105, 180, 0.10)
+SORTING_TINT = (120, 255, 170, 0.10)
+MANIFEST_TINT = (90, 160, 255, 0.10)
+# From this many rows on (with ``render_mode`` "auto") the list is drawn without
+# QGraphicsEffects, which re-render the whole list offscreen on every repaint.
+LIGHT_RENDER_ROWS = 2000
+# Recently opened directories kept as tabs (and persisted as ``recent_paths``).
+RECENT_TABS = 8
+
+MENU_STYLE = """
+QMenu { font-size:16px; }
+QMenu::item:selected { background-color: #3794ff; color: #fff; }
+"""
+
+STARTUP.mark("imports")
 
 LANG_STRINGS: dict[str, dict[str, str]] = {
     "zh": {
@@ -29,17 +90,73 @@ LANG_STRINGS: dict[str, dict[str, str]] = {
         "rename_failed": "重命名失败：{error}",
         "new_folder_failed": "创建文件夹失败：{error}",
         "clear_prefix_failed": "清除序号失败：{error}",
+        "undo_failed": "撤销失败：{error}",
+        "recovery_failed": "上次未完成的重命名无法自动恢复：\n{paths}",
         "path_missing": "路径不存在！",
         "confirm_delete_title": "确认删除",
         "confirm_delete_message": "确定要删除以下文件夹？\n\n{items}",
         "delete_failed": "{name} 删除失败：{error}",
+        "delete_failed_summary": "{count} 个文件夹删除失败：\n\n{items}",
+        "delete_progress": "正在删除 {done}/{total}（{rate:.0f} 项/秒）",
         "context_new_folder": "新建文件夹",
         "context_select_dir": "选择目录",
         "context_rename": "重命名",
         "context_delete": "删除所选",
         "context_clear_prefix": "清除全部序号",
+        "context_undo": "撤销重命名",
+        "context_show_sizes": "显示大小和项目数",
+        "filter_placeholder": "筛选文件夹（Esc 清除）",
+        "context_trace": "性能跟踪",
+        "context_tree_mode": "树形模式",
+        "context_number_level": "为本层编号",
+        "context_rules": "批量重命名...",
+        "rules_title": "批量重命名",
+        "rules_find": "查找",
+        "rules_replace": "替换为",
+        "rules_regex": "正则表达式",
+        "rules_ignore_case": "忽略大小写",
+        "rules_strip": "去掉序号前缀",
+        "rules_case": "大小写",
+        "case_keep": "不变",
+        "case_lower": "小写",
+        "case_upper": "大写",
+        "case_title": "首字母大写",
+        "rules_insert": "插入文本",
+        "rules_insert_at": "位置",
+        "rules_end": "末尾",
+        "rules_template": "模板",
+        "rules_old": "原名称",
+        "rules_new": "新名称",
+        "rules_summary": "将重命名 {count} 个，跳过 {skipped} 个",
+        "rules_skipped": "{count} 个文件夹未重命名：\n\n{items}",
+        "reason_invalid": "名称无效",
+        "reason_duplicate": "与本批中其他文件夹的新名称相同",
+        "reason_exists": "已存在同名项",
+        "context_bulk_create": "批量新建...",
+        "bulk_title": "批量新建文件夹",
+        "bulk_tab_list": "名称列表",
+        "bulk_list_hint": "每行一个文件夹名称",
+        "bulk_tab_template": "模板",
+        "bulk_template_default": "第{n:02d}章",
+        "bulk_count": "数量",
+        "bulk_start": "起始",
+        "bulk_preview": "将新建 {count} 个文件夹：{names}",
+        "bulk_create_failed": "{count} 个文件夹未能创建：\n\n{items}",
+        "trace_rates": "重命名 {renames:.0f}/秒 · 删除 {deletes:.0f}/秒 · 目录变动 {events:.1f}/秒",
+        "trace_last": "刷新 {refresh:.1f} ms · 布局 {relayout:.1f} ms · 绘制 {paint:.1f} ms",
+        "trace_slow": "最近的慢操作：",
+        "cache_stats": "已缓存 {count} 个目录（{size}）· 命中 {hits} · 未命中 {misses} · 淘汰 {evictions}",
+        "folder_stats": "{size} · {items} 项",
         "context_start_sort": "开始排序",
+        "context_manifest": "仅记录顺序（不重命名）",
+        "commit_pending": "{count} 次排序待应用 · Ctrl+S 立即应用",
+        "commit_running": "正在应用排序…",
+        "context_materialize": "按顺序写入序号",
         "context_pause_sort": "暂停排序",
+        "transfer_progress": "正在复制 {done} / {total}（{rate}/秒）· Esc 取消",
+        "transfer_cancelled": "已取消复制",
+        "transfer_failed": "无法移入文件夹：{error}",
+        "transfer_failures": "{count} 个文件夹未能移入：\n\n{items}",
         "context_language": "选择语言",
         "language_zh": "中文",
         "language_en": "English",
@@ -60,17 +177,73 @@ LANG_STRINGS: dict[str, dict[str, str]] = {
         "rename_failed": "Failed to rename: {error}",
         "new_folder_failed": "Failed to create folder: {error}",
         "clear_prefix_failed": "Failed to clear prefix: {error}",
+        "undo_failed": "Failed to undo: {error}",
+        "recovery_failed": "An unfinished rename batch could not be recovered automatically:\n{paths}",
         "path_missing": "Path does not exist!",
         "confirm_delete_title": "Confirm Delete",
         "confirm_delete_message": "Are you sure you want to delete these folders?\n\n{items}",
         "delete_failed": "Failed to delete {name}: {error}",
+        "delete_failed_summary": "{count} folder(s) could not be deleted:\n\n{items}",
+        "delete_progress": "Deleting {done}/{total} ({rate:.0f} items/s)",
         "context_new_folder": "New Folder",
         "context_select_dir": "Choose Directory",
         "context_rename": "Rename",
         "context_delete": "Delete Selected",
         "context_clear_prefix": "Clear Number Prefix",
+        "context_undo": "Undo Rename",
+        "context_show_sizes": "Show Size && Item Count",
+        "filter_placeholder": "Filter folders (Esc to clear)",
+        "context_trace": "Performance Trace",
+        "context_tree_mode": "Tree Mode",
+        "context_number_level": "Number This Level",
+        "context_rules": "Batch Rename...",
+        "rules_title": "Batch Rename",
+        "rules_find": "Find",
+        "rules_replace": "Replace with",
+        "rules_regex": "Regular expression",
+        "rules_ignore_case": "Ignore case",
+        "rules_strip": "Strip number prefix",
+        "rules_case": "Case",
+        "case_keep": "Unchanged",
+        "case_lower": "lower case",
+        "case_upper": "UPPER CASE",
+        "case_title": "Title Case",
+        "rules_insert": "Insert text",
+        "rules_insert_at": "at",
+        "rules_end": "end",
+        "rules_template": "Template",
+        "rules_old": "Current name",
+        "rules_new": "New name",
+        "rules_summary": "{count} to rename, {skipped} skipped",
+        "rules_skipped": "{count} folder(s) were not renamed:\n\n{items}",
+        "reason_invalid": "invalid name",
+        "reason_duplicate": "same new name as another folder in the batch",
+        "reason_exists": "name already taken",
+        "context_bulk_create": "New Folders in Bulk...",
+        "bulk_title": "Create Folders in Bulk",
+        "bulk_tab_list": "Name list",
+        "bulk_list_hint": "One folder name per line",
+        "bulk_tab_template": "Template",
+        "bulk_template_default": "Chapter {n:02d}",
+        "bulk_count": "Count",
+        "bulk_start": "Start",
+        "bulk_preview": "{count} folder(s) will be created: {names}",
+        "bulk_create_failed": "{count} folder(s) could not be created:\n\n{items}",
+        "trace_rates": "renames {renames:.0f}/s · deletes {deletes:.0f}/s · dir changes {events:.1f}/s",
+        "trace_last": "refresh {refresh:.1f} ms · layout {relayout:.1f} ms · paint {paint:.1f} ms",
+        "trace_slow": "Recent slow operations:",
+        "cache_stats": "{count} directories cached ({size}) · {hits} hits · {misses} misses · {evictions} evictions",
+        "folder_stats": "{size} · {items} items",
         "context_start_sort": "Start Sorting",
+        "context_manifest": "Keep Order Without Renaming",
+        "commit_pending": "{count} reorder(s) pending · Ctrl+S to apply now",
+        "commit_running": "Applying order…",
+        "context_materialize": "Apply Number Prefixes",
         "context_pause_sort": "Pause Sorting",
+        "transfer_progress": "Copying {done} of {total} ({rate}/s) · Esc to cancel",
+        "transfer_cancelled": "Copy cancelled",
+        "transfer_failed": "Failed to bring folders in: {error}",
+        "transfer_failures": "{count} folder(s) could not be brought in:\n\n{items}",
         "context_language": "Language",
         "language_zh": "Chinese",
         "language_en": "English",
@@ -78,6 +251,194 @@ LANG_STRINGS: dict[str, dict[str, str]] = {
 }
 
 
+class FolderExistsError(Exception):
+    pass
+
+
+def _same_path(a: str, b: str) -> bool:
+    return os.path.normcase(os.path.normpath(a)) == os.path.normcase(os.path.normpath(b))
+
+
+def _scan_job(ctx: TaskContext, base_path: str) -> DirectorySnapshot:
+    return DirectorySnapshot.scan(base_path)
+
+
+def _sort_job(
+    ctx: TaskContext,
+    journal: RenameJournal,
+    base_path: str,
+    folders: list[str],
+    scheme: NumberingScheme,
+) -> tuple[DirectorySnapshot, list[tuple[str, str]]]:
+    """Number *folders*; the renames are returned for tree levels, lists diff the snapshot."""
+    snapshot = DirectorySnapshot.scan(base_path)
+    plan = plan_sort(folders, snapshot, scheme)
+    journal.run(plan, kind="sort", progress=ctx.progress)
+    return snapshot.apply(plan.to_diff()), plan.renamed
+
+
+def _clear_prefix_job(
+    ctx: TaskContext, journal: RenameJournal, base_path: str, scheme: NumberingScheme
+) -> DirectorySnapshot | None:
+    snapshot = DirectorySnapshot.scan(base_path)
+    plan = plan_clear_prefix(snapshot, scheme)
+    if not plan:
+        return None
+    journal.run(plan, kind="clear_prefix", progress=ctx.progress)
+    return snapshot.apply(plan.to_diff())
+
+
+def _undo_job(ctx: TaskContext, journal: RenameJournal, base_path: str) -> None:
+    journal.undo(base_path, progress=ctx.progress)
+
+
+def _undo_state_job(ctx: TaskContext, journal: RenameJournal, base_path: str) -> bool:
+    return journal.last_undoable(base_path) is not None
+
+
+def _load_cached_job(ctx: TaskContext, store: StateStore, base_path: str) -> DirectorySnapshot | None:
+    store.load_order(base_path)  # reads the order manifest off the UI thread
+    names = store.load_snapshot(base_path)
+    if names is None:
+        return None
+    return DirectorySnapshot(base_path, (FolderEntry(name) for name in names))
+
+
+def _size_job(ctx: TaskContext, index: SizeIndex, base_path: str, names: list[str]) -> None:
+    batch: list[tuple[str, int, int]] = []
+    flushed = time.perf_counter()
+    done = 0
+    for result in scan_folders(index, base_path, names, cancelled=lambda: ctx.cancelled):
+        batch.append(result)
+        done += 1
+        now = time.perf_counter()
+        if now - flushed >= 0.1:
+            ctx.partial(batch)
+            ctx.progress(done, len(names))
+            batch = []
+            flushed = now
+    if batch:
+        ctx.partial(batch)
+    index.save()
+
+
+def _name_index_job(ctx: TaskContext, names: list[str]) -> NameIndex:
+    return NameIndex(names)
+
+
+def _recover_job(ctx: TaskContext, journal: RenameJournal) -> list[RecoveryResult]:
+    return journal.recover()
+
+
+def _create_folders_job(
+    ctx: TaskContext,
+    journal: RenameJournal,
+    base_path: str,
+    snapshot: DirectorySnapshot | None,
+    names: list[str],
+    order: list[str],
+    position: int | None,
+    scheme: NumberingScheme | None,
+) -> tuple[DirectorySnapshot, list[str], list[tuple[str, Exception]]]:
+    if snapshot is None:
+        snapshot = DirectorySnapshot.scan(base_path)
+    plan = plan_create(names, snapshot, order, position, scheme)
+    if plan.renames:
+        journal.run(plan.renames, kind="sort")
+        snapshot = snapshot.apply(plan.renames.to_diff())
+    created, failures = create_folders(
+        base_path, plan.created, ctx.progress, cancelled=lambda: ctx.cancelled
+    )
+    rejected = [(name, ValueError(reason)) for name, reason in plan.rejected]
+    return snapshot.apply(SnapshotDiff(added=created)), plan.order, rejected + failures
+
+
+def _rules_check_job(
+    ctx: TaskContext, snapshot: DirectorySnapshot, rules: RuleSet, names: list[str]
+) -> tuple[RuleSet, int, list[tuple[str, str, str]]]:
+    plan, skipped = plan_rules(rules, snapshot, names)
+    return rules, len(plan.renamed), skipped
+
+
+def _rules_apply_job(
+    ctx: TaskContext, journal: RenameJournal, base_path: str, rules: RuleSet, names: list[str]
+) -> tuple[DirectorySnapshot, list[tuple[str, str]], list[tuple[str, str, str]]]:
+    snapshot = DirectorySnapshot.scan(base_path)
+    plan, skipped = plan_rules(rules, snapshot, names)
+    journal.run(plan, kind="rules", progress=ctx.progress)
+    return snapshot.apply(plan.to_diff()), plan.renamed, skipped
+
+
+def _stage_delete_job(
+    ctx: TaskContext, base_path: str, names: list[str]
+) -> tuple[list[StagedFolder], list[tuple[str, Exception]]]:
+    return delete_engine.stage(base_path, names)
+
+
+def _purge_job(
+    ctx: TaskContext, base_path: str, staged: list[StagedFolder] | None, status_format: str
+) -> DeleteReport:
+    if staged is None:
+        staged = delete_engine.leftovers(base_path)
+    started = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        ctx.progress(done, total)
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        ctx.status(status_format.format(done=done, total=total, rate=rate))
+
+    return delete_engine.purge(
+        base_path, staged, progress=progress, cancelled=lambda: ctx.cancelled
+    )
+
+
+def _transfer_job(
+    ctx: TaskContext,
+    base_path: str,
+    snapshot: DirectorySnapshot | None,
+    sources: list[str],
+    order: list[str],
+    position: int | None,
+    move: bool,
+    stop: threading.Event,
+    status_format: str,
+) -> tuple[DirectorySnapshot, list[str], TransferReport]:
+    if snapshot is None:
+        snapshot = DirectorySnapshot.scan(base_path)
+        if snapshot.mtime_ns is None:
+            raise FileNotFoundError(f"not a directory: {base_path}")
+    plan = transfer_engine.plan_transfer(sources, snapshot, order, position, move)
+    started = time.perf_counter()
+
+    def progress(done: int, total: int) -> None:
+        # Byte counts overflow the int progress signal; KiB is fine for a bar.
+        ctx.progress(done >> 10, total >> 10)
+        elapsed = time.perf_counter() - started
+        rate = int(done / elapsed) if elapsed > 0 else 0
+        ctx.status(
+            status_format.format(
+                done=format_size(done), total=format_size(total), rate=format_size(rate)
+            )
+        )
+
+    # ``stop`` rather than cancelling the task, so folders already in place are still reported.
+    report = transfer_engine.transfer(
+        base_path, plan.items, progress=progress, cancelled=stop.is_set
+    )
+    report.failures[:0] = [(source, ValueError(reason)) for source, reason in plan.rejected]
+    arrived = set(report.arrived)
+    order = [name for name in plan.order if name in snapshot or name in arrived]
+    return snapshot.apply(SnapshotDiff(added=report.arrived)), order, report
+
+
+def _rename_job(ctx: TaskContext, base_path: str, old_name: str, new_name: str) -> None:
+    new_path = os.path.join(base_path, new_name)
+    if os.path.exists(new_path):
+        raise FolderExistsError(new_name)
+    os.rename(os.path.join(base_path, old_name), new_path)
+
+
 class MyButton(QtWidgets.QPushButton):
     doubleClicked = QtCore.pyqtSignal()
 
@@ -86,41 +447,433 @@ class MyButton(QtWidgets.QPushButton):
         super().mouseDoubleClickEvent(event)
 
 
-class SortListWidget(QtWidgets.QListWidget):
+class BulkCreateDialog(QtWidgets.QDialog):
+    """Folder names from pasted lines or from a ``{n}`` template."""
+
+    def __init__(self, translate, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._t = translate
+        self.setWindowTitle(translate("bulk_title"))
+        self.resize(460, 380)
+        layout = QtWidgets.QVBoxLayout(self)
+        self.tabs = QtWidgets.QTabWidget()
+        self.lines_edit = QtWidgets.QPlainTextEdit()
+        self.lines_edit.setPlaceholderText(translate("bulk_list_hint"))
+        self.tabs.addTab(self.lines_edit, translate("bulk_tab_list"))
+        template_page = QtWidgets.QWidget()
+        form = QtWidgets.QFormLayout(template_page)
+        self.template_edit = QtWidgets.QLineEdit(translate("bulk_template_default"))
+        self.count_spin = QtWidgets.QSpinBox()
+        self.count_spin.setRange(1, MAX_FOLDERS)
+        self.count_spin.setValue(10)
+        self.start_spin = QtWidgets.QSpinBox()
+        self.start_spin.setRange(0, 999999)
+        self.start_spin.setValue(1)
+        form.addRow(translate("bulk_tab_template"), self.template_edit)
+        form.addRow(translate("bulk_count"), self.count_spin)
+        form.addRow(translate("bulk_start"), self.start_spin)
+        self.tabs.addTab(template_page, translate("bulk_tab_template"))
+        layout.addWidget(self.tabs)
+        self.preview = QtWidgets.QLabel()
+        self.preview.setWordWrap(True)
+        layout.addWidget(self.preview)
+        self.buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
+        )
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+        self.tabs.currentChanged.connect(self._update_preview)
+        self.lines_edit.textChanged.connect(self._update_preview)
+        self.template_edit.textChanged.connect(self._update_preview)
+        self.count_spin.valueChanged.connect(self._update_preview)
+        self.start_spin.valueChanged.connect(self._update_preview)
+        self._update_preview()
+
+    def names(self) -> list[str]:
+        """The requested names; raises ValueError for an unusable template."""
+        if self.tabs.currentIndex() == 0:
+            return parse_lines(self.lines_edit.toPlainText())
+        return expand_template(
+            self.template_edit.text(), self.count_spin.value(), self.start_spin.value()
+        )
+
+    def _update_preview(self) -> None:
+        try:
+            names = self.names()
+        except (ValueError, IndexError, KeyError) as exc:
+            self.preview.setText(str(exc))
+            self.buttons.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(False)
+            return
+        shown = ", ".join(names[:3]) + (" ... " + names[-1] if len(names) > 3 else "")
+        self.preview.setText(self._t("bulk_preview").format(count=len(names), names=shown))
+        self.buttons.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(bool(names))
+
+
+class RenameRulesDialog(QtWidgets.QDialog):
+    """Edit a rule set and preview it; only rows on screen are ever computed."""
+
+    checkRequested = QtCore.pyqtSignal(object)
+
+    def __init__(self, translate, names: list[str], parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._t = translate
+        self.rule_set = RuleSet()
+        self.setWindowTitle(translate("rules_title"))
+        self.resize(640, 560)
+        layout = QtWidgets.QVBoxLayout(self)
+        form = QtWidgets.QFormLayout()
+        self.strip_check = QtWidgets.QCheckBox(translate("rules_strip"))
+        form.addRow(self.strip_check)
+        self.find_edit = QtWidgets.QLineEdit()
+        self.replace_edit = QtWidgets.QLineEdit()
+        self.regex_check = QtWidgets.QCheckBox(translate("rules_regex"))
+        self.ignore_case_check = QtWidgets.QCheckBox(translate("rules_ignore_case"))
+        options = QtWidgets.QHBoxLayout()
+        options.addWidget(self.regex_check)
+        options.addWidget(self.ignore_case_check)
+        options.addStretch()
+        form.addRow(translate("rules_find"), self.find_edit)
+        form.addRow(translate("rules_replace"), self.replace_edit)
+        form.addRow("", options)
+        self.case_combo = QtWidgets.QComboBox()
+        self.case_combo.addItem(translate("case_keep"), "")
+        for mode in CASE_MODES:
+            self.case_combo.addItem(translate(f"case_{mode}"), mode)
+        form.addRow(translate("rules_case"), self.case_combo)
+        self.insert_edit = QtWidgets.QLineEdit()
+        self.insert_at = QtWidgets.QSpinBox()
+        self.insert_at.setRange(-1, 255)
+        self.insert_at.setSpecialValueText(translate("rules_end"))
+        self.insert_at.setValue(0)
+        insert_row = QtWidgets.QHBoxLayout()
+        insert_row.addWidget(self.insert_edit)
+        insert_row.addWidget(QtWidgets.QLabel(translate("rules_insert_at")))
+        insert_row.addWidget(self.insert_at)
+        form.addRow(translate("rules_insert"), insert_row)
+        self.template_edit = QtWidgets.QLineEdit()
+        self.template_edit.setPlaceholderText("{n:02d}_{stem}")
+        form.addRow(translate("rules_template"), self.template_edit)
+        layout.addLayout(form)
+
+        self.preview_model = RenamePreviewModel(names, self)
+        self.preview_model.headers = (translate("rules_old"), translate("rules_new"))
+        self.preview = QtWidgets.QTreeView()
+        self.preview.setRootIsDecorated(False)
+        self.preview.setUniformRowHeights(True)
+        self.preview.setModel(self.preview_model)
+        self.preview.header().setSectionResizeMode(QtWidgets.QHeaderView.Stretch)
+        layout.addWidget(self.preview)
+        self.status = QtWidgets.QLabel()
+        layout.addWidget(self.status)
+        self.buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
+        )
+        self.buttons.accepted.connect(self.accept)
+        self.buttons.rejected.connect(self.reject)
+        layout.addWidget(self.buttons)
+
+        # The whole-batch collision check runs in the background once edits pause.
+        self._check_delay = QtCore.QTimer(self)
+        self._check_delay.setSingleShot(True)
+        self._check_delay.setInterval(250)
+        self._check_delay.timeout.connect(lambda: self.checkRequested.emit(self.rule_set))
+        for edit in (self.find_edit, self.replace_edit, self.insert_edit, self.template_edit):
+            edit.textChanged.connect(self._rules_edited)
+        for check in (self.strip_check, self.regex_check, self.ignore_case_check):
+            check.toggled.connect(self._rules_edited)
+        self.case_combo.currentIndexChanged.connect(self._rules_edited)
+        self.insert_at.valueChanged.connect(self._rules_edited)
+        self._rules_edited()
+
+    def build_rules(self) -> RuleSet:
+        rules: list = []
+        if self.strip_check.isChecked():
+            rules.append(StripPrefixRule())
+        if self.find_edit.text():
+            rules.append(
+                ReplaceRule(
+                    self.find_edit.text(),
+                    self.replace_edit.text(),
+                    self.regex_check.isChecked(),
+                    self.ignore_case_check.isChecked(),
+                )
+            )
+        if self.case_combo.currentData():
+            rules.append(CaseRule(self.case_combo.currentData()))
+        if self.insert_edit.text():
+            rules.append(InsertRule(self.insert_edit.text(), self.insert_at.value()))
+        if self.template_edit.text():
+            rules.append(TemplateRule(self.template_edit.text()))
+        return RuleSet(tuple(rules))
+
+    def _rules_edited(self) -> None:
+        ok = self.buttons.button(QtWidgets.QDialogButtonBox.Ok)
+        try:
+            self.rule_set = self.build_rules()
+        except ValueError as exc:
+            self.rule_set = RuleSet()
+            self.status.setText(str(exc))
+            ok.setEnabled(False)
+            self._check_delay.stop()
+            return
+        self.preview_model.set_rename(self.rule_set.apply if self.rule_set else None)
+        self.status.clear()
+        ok.setEnabled(bool(self.rule_set))
+        if self.rule_set:
+            self._check_delay.start()
+
+    def set_check_result(self, result: tuple[RuleSet, int, list[tuple[str, str, str]]]) -> None:
+        rules, count, skipped = result
+        if rules is not self.rule_set:
+            return
+        self.preview_model.set_problems(
+            {name: self._t(f"reason_{reason}") for name, _, reason in skipped}
+        )
+        self.status.setText(self._t("rules_summary").format(count=count, skipped=len(skipped)))
+
+
+class SortListView(QtWidgets.QListView):
     itemDropped = QtCore.pyqtSignal()
+    # Folders dropped from outside: paths, view row to insert at, move instead of copy.
+    foldersDropped = QtCore.pyqtSignal(list, int, bool)
+    typeAhead = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._tint: QtGui.QColor | None = None
+        self._external_row: int | None = None
+        # Folders carried by the current drag from outside, checked once on enter.
+        self._drag_folders: list[str] = []
+
+    def set_tint(self, color: QtGui.QColor | None) -> None:
+        """Translucent status colour painted over the rows (light rendering mode)."""
+        self._tint = color
+        self.viewport().update()
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:  # type: ignore[override]
+        with tracing.span("paint", "ui"):
+            super().paintEvent(event)
+        if self._tint is not None or self._external_row is not None:
+            painter = QtGui.QPainter(self.viewport())
+            if self._tint is not None:
+                painter.fillRect(event.rect(), self._tint)
+            if self._external_row is not None:
+                # The built-in drop indicator only covers internal moves.
+                rows = self.model().rowCount()
+                if self._external_row < rows:
+                    y = self.visualRect(self.model().index(self._external_row, 0)).top()
+                elif rows:
+                    y = self.visualRect(self.model().index(rows - 1, 0)).bottom()
+                else:
+                    y = 0
+                width = self.viewport().width()
+                painter.fillRect(0, max(0, y - 1), width, 2, QtGui.QColor("#3794ff"))
+
+    def _dropped_folders(self, event: QtGui.QDropEvent) -> list[str]:
+        """Folders dragged in from outside the view (e.g. from a file manager)."""
+        if event.source() is self or not event.mimeData().hasUrls():
+            return []
+        paths = [url.toLocalFile() for url in event.mimeData().urls()]
+        return [path for path in paths if path and os.path.isdir(path)]
+
+    def _drop_row(self, pos: QtCore.QPoint) -> int:
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return self.model().rowCount()
+        return index.row() + (1 if pos.y() >= self.visualRect(index).center().y() else 0)
+
+    def _set_external_row(self, row: int | None) -> None:
+        if row != self._external_row:
+            self._external_row = row
+            self.viewport().update()
+
+    def dragEnterEvent(self, event: QtGui.QDragEnterEvent) -> None:  # type: ignore[override]
+        self._drag_folders = self._dropped_folders(event)
+        if self._drag_folders:
+            event.acceptProposedAction()
+            return
+        super().dragEnterEvent(event)
+
+    def dragMoveEvent(self, event: QtGui.QDragMoveEvent) -> None:  # type: ignore[override]
+        if self._drag_folders:
+            self._set_external_row(self._drop_row(event.pos()))
+            event.acceptProposedAction()
+            return
+        super().dragMoveEvent(event)
+
+    def dragLeaveEvent(self, event: QtGui.QDragLeaveEvent) -> None:  # type: ignore[override]
+        self._drag_folders = []
+        self._set_external_row(None)
+        super().dragLeaveEvent(event)
 
     def dropEvent(self, event: QtGui.QDropEvent) -> None:
+        self._set_external_row(None)
+        paths, self._drag_folders = self._drag_folders, []
+        if paths:
+            move = event.proposedAction() == QtCore.Qt.MoveAction
+            # The move is done here; reporting a copy keeps the source from deleting anything.
+            event.setDropAction(QtCore.Qt.CopyAction)
+            event.accept()
+            self.foldersDropped.emit(paths, self._drop_row(event.pos()), move)
+            return
         super().dropEvent(event)
         self.itemDropped.emit()
 
+    def keyPressEvent(self, event: QtGui.QKeyEvent) -> None:  # type: ignore[override]
+        text = event.text()
+        if text.strip() and text.isprintable() and not event.modifiers() & (
+            QtCore.Qt.ControlModifier | QtCore.Qt.AltModifier
+        ):
+            self.typeAhead.emit(text)
+            return
+        super().keyPressEvent(event)
+
+    def selected_names(self) -> list[str]:
+        rows = sorted(index.row() for index in self.selectionModel().selectedRows())
+        model = self.model()
+        return [model.name(row) for row in rows]
+
+
+class SortTreeView(QtWidgets.QTreeView):
+    """Tree mode view; reorders are reported by ``FolderTreeModel.levelReordered``."""
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._tint: QtGui.QColor | None = None
+
+    def set_tint(self, color: QtGui.QColor | None) -> None:
+        self._tint = color
+        self.viewport().update()
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:  # type: ignore[override]
+        with tracing.span("paint", "ui"):
+            super().paintEvent(event)
+        if self._tint is not None:
+            painter = QtGui.QPainter(self.viewport())
+            painter.fillRect(event.rect(), self._tint)
+
+
+class TraceOverlay(QtWidgets.QLabel):
+    """Counters and recent slow operations, shown while tracing is on."""
+
+    def __init__(self, parent: QtWidgets.QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "QLabel { background: rgba(30, 30, 30, 190); color: #fff; border-radius: 6px;"
+            " padding: 6px 8px; font-size: 12px; font-family: Consolas, monospace; }"
+        )
+        self.hide()
+
 
 class DirectoryManagerApp(QtWidgets.QWidget):
-    def __init__(self) -> None:
+    def __init__(self, state_path: str | None = None) -> None:
         super().__init__()
         self.setAcceptDrops(True)
         icon_path = os.path.join(os.path.dirname(__file__), "Directory_Manager.ico")
         if os.path.exists(icon_path):
             self.setWindowIcon(QtGui.QIcon(icon_path))
         self.sort_paused = True
-        self._state = self._load_last_state()
-        self.language = self._state.get("language", "zh")
+        # Order kept in the directory's manifest only; renames happen on request.
+        self.order_manifest = False
+        self._store = StateStore(state_path or default_state_path(CONFIG_FILE))
+        self.language = self._store.get("language", "zh")
         if self.language not in LANG_STRINGS:
             self.language = "zh"
+        self._dir_cache = DirectoryCache()
+        STARTUP.mark("state_loaded")
         self._setup_ui()
-        self._setup_blur_overlay()
+        # Graphics effects and the first listing wait until the window has painted.
+        self.blur_overlay: QtWidgets.QWidget | None = None
+        self._light_rendering: bool | None = None
+        self._tint = PAUSED_TINT
+        self._startup_pending = True
+        self._setup_progress_bar()
 
-        self._last_folder_list: list[str] = []
-        self._timer = QtCore.QTimer(self)
-        self._timer.timeout.connect(self._auto_refresh_folder_list)
-        self._timer.start(1000)
+        self._base_path = ""
+        self._snapshot = DirectorySnapshot("")
+        self._cached_listing: tuple[str, list[str]] = ("", [])
+        self._staging_checked = ""
+        self._journal = RenameJournal(os.path.join(os.path.dirname(self._store.path), JOURNAL_DIR))
+        self._size_index = SizeIndex(os.path.join(os.path.dirname(self._store.path), SIZE_INDEX_FILE))
+        self._size_delay = QtCore.QTimer(self)
+        self._size_delay.setSingleShot(True)
+        self._size_delay.setInterval(150)
+        self._size_delay.timeout.connect(self._request_sizes)
+        self.list_view.verticalScrollBar().valueChanged.connect(self._size_delay.start)
+        self._set_show_sizes(bool(self._store.get("show_sizes", False)))
+        self._io.submit(
+            _recover_job, self._journal, serial=True, on_result=self._on_journal_recovered
+        )
+        QtWidgets.QShortcut(QtGui.QKeySequence.Undo, self, self._committed(self._undo_last_rename))
+        QtWidgets.QShortcut(QtGui.QKeySequence.Find, self, self._start_filter)
+        self.trace_overlay = TraceOverlay(self.list_view.parentWidget())
+        self._trace_timer = QtCore.QTimer(self)
+        self._trace_timer.setInterval(500)
+        self._trace_timer.timeout.connect(self._update_trace_overlay)
+        self._set_tracing(
+            os.environ.get(tracing.ENV_VAR, "") not in ("", "0")
+            or bool(self._store.get("tracing", False))
+        )
+        self._watcher = FolderWatcher(self)
+        self._watcher.directoryChanged.connect(self._auto_refresh_folder_list)
+        self._commits = CommitScheduler(self)
+        self._commits.commitDue.connect(self._commit_order)
+        self._commits.stateChanged.connect(self._on_commit_state)
+        self._deferred: list[Callable[[], None]] = []
+        QtWidgets.QShortcut(QtGui.QKeySequence.Save, self, self._commits.flush)
+        self._transfer_stops: set[threading.Event] = set()
+        self._cancel_transfers = QtWidgets.QShortcut(
+            QtGui.QKeySequence(QtCore.Qt.Key_Escape), self, self._stop_transfers
+        )
+        self._cancel_transfers.setEnabled(False)
+        self._set_tree_mode(bool(self._store.get("tree_mode", False)))
 
-        last_path = self._state.get("last_path", "")
+        self._set_sort_paused(True)
+        last_path = self._store.get("last_path", "")
         if isinstance(last_path, str) and last_path:
             self.path_edit.setText(last_path)
-            if os.path.exists(last_path):
-                self._refresh_list(last_path)
-        self._pause_sort()
+        recent = self._store.get("recent_paths", [])
+        for path in recent if isinstance(recent, list) else []:
+            if isinstance(path, str) and path:
+                self._add_tab(path)
         self._apply_language()
+        STARTUP.mark("ui_built")
+
+    def paintEvent(self, event: QtGui.QPaintEvent) -> None:  # type: ignore[override]
+        super().paintEvent(event)
+        if self._light_rendering:
+            self._paint_list_shadow()
+        if self._startup_pending:
+            self._startup_pending = False
+            STARTUP.mark("first_paint")
+            QtCore.QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self) -> None:
+        self._setup_blur_overlay()
+        self._apply_render_mode()
+        STARTUP.mark("effects_ready")
+        path = self.path_edit.text()
+        if path and not self._base_path:
+            self._refresh_list(path)
+        else:
+            self._finish_startup_profile()
+
+    def _finish_startup_profile(self) -> None:
+        if not STARTUP.enabled or STARTUP.finished:
+            return
+        STARTUP.finish(os.path.dirname(self._store.path), folders=self.folder_model.rowCount())
+        if STARTUP.exit_when_done:
+            QtCore.QTimer.singleShot(0, self.close)
+
+    def restore_window_size(self) -> None:
+        try:
+            width = int(self._store.get("win_width", 600))
+            height = int(self._store.get("win_height", 420))
+        except (TypeError, ValueError):
+            width, height = 600, 420
+        self.resize(width, height)
 
     def _t(self, key: str) -> str:
         return LANG_STRINGS.get(self.language, LANG_STRINGS["zh"]).get(key, key)
@@ -129,25 +882,126 @@ class DirectoryManagerApp(QtWidgets.QWidget):
         self.setWindowTitle(self._t("window_title"))
         self.browse_btn.setText(self._t("browse_button"))
         self.path_edit.setPlaceholderText(self._t("path_placeholder"))
+        self.filter_edit.setPlaceholderText(self._t("filter_placeholder"))
+        self._update_tab_bar()
 
-    def _auto_refresh_folder_list(self) -> None:
-        base_path = self.path_edit.text()
-        if not os.path.isdir(base_path):
+    def _auto_refresh_folder_list(self, path: str) -> None:
+        tracing.count("dir_changes")
+        if not self._base_path:
             return
-        try:
-            folders = [
-                f
-                for f in os.listdir(base_path)
-                if os.path.isdir(os.path.join(base_path, f))
-            ]
-            folders.sort()
-        except Exception:
-            folders = []
-        if folders != self._last_folder_list:
-            self._refresh_list(base_path)
+        if _same_path(path, self._base_path):
+            self._io.submit(
+                _scan_job, self._base_path, key="listing", on_result=self._on_auto_snapshot
+            )
+            return
+        entry = self._dir_cache.peek(path)
+        if entry is not None:
+            # A background tab changed: rescan it now so switching back stays instant.
+            entry.stale = True
+            self._io.submit(
+                _scan_job, entry.snapshot.path, key=f"cache:{entry.snapshot.path}",
+                on_result=self._on_cached_rescan,
+            )
+
+    def _on_cached_rescan(self, snapshot: DirectorySnapshot) -> None:
+        if snapshot.mtime_ns is None:
+            self._dir_cache.discard(snapshot.path)
+            self._update_watched()
+        else:
+            self._dir_cache.update_snapshot(snapshot)
+
+    def _on_auto_snapshot(self, snapshot: DirectorySnapshot) -> None:
+        if snapshot.mtime_ns is None:
+            return
+        if snapshot.path != self._snapshot.path or self._snapshot.diff(snapshot):
+            self._show_snapshot(snapshot)
+
+    def _setup_progress_bar(self) -> None:
+        self._io = IoExecutor(self)
+        self._io.busyChanged.connect(self._on_io_busy)
+        self._io.progress.connect(self._on_io_progress)
+        self.progress_bar = QtWidgets.QProgressBar(self.list_view.parentWidget())
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.setStyleSheet(
+            """
+            QProgressBar { border: none; background: transparent; }
+            QProgressBar::chunk { background: #3794ff; border-radius: 1px; }
+            """
+        )
+        self.progress_bar.hide()
+        self.status_label = QtWidgets.QLabel(self.list_view.parentWidget())
+        self.status_label.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.status_label.setStyleSheet(
+            "background: rgba(255,255,255,0.85); color: #555; font-size: 13px;"
+            " border-radius: 4px; padding: 1px 6px;"
+        )
+        self.status_label.hide()
+        self._io.status.connect(self._on_io_status)
+        self._progress_delay = QtCore.QTimer(self)
+        self._progress_delay.setSingleShot(True)
+        self._progress_delay.setInterval(300)
+        self._progress_delay.timeout.connect(self._show_progress_bar)
+
+    def _update_progress_geometry(self) -> None:
+        geo = self._active_view().geometry()
+        self.progress_bar.setGeometry(geo.left() + 6, geo.bottom() - 4, geo.width() - 12, 3)
+
+    def _show_progress_bar(self) -> None:
+        self._update_progress_geometry()
+        self.progress_bar.show()
+        self.progress_bar.raise_()
+
+    def _on_io_status(self, text: str) -> None:
+        self._show_status(text)
+
+    def _show_status(self, text: str) -> None:
+        self.status_label.setText(text)
+        self.status_label.adjustSize()
+        geo = self._active_view().geometry()
+        self.status_label.move(
+            geo.right() - self.status_label.width() - 14,
+            geo.bottom() - self.status_label.height() - 8,
+        )
+        self.status_label.show()
+        self.status_label.raise_()
+
+    def _on_io_busy(self, busy: bool) -> None:
+        if busy:
+            self.progress_bar.setRange(0, 0)
+            self._progress_delay.start()
+        else:
+            self._progress_delay.stop()
+            self.progress_bar.hide()
+            self.status_label.hide()
+            self._on_commit_state()
+
+    def _on_io_progress(self, done: int, total: int) -> None:
+        if total > 0:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
+        else:
+            self.progress_bar.setRange(0, 0)
+
+    def _show_error(self, message_key: str, exc: Exception) -> None:
+        QtWidgets.QMessageBox.critical(
+            self, self._t("error_title"), self._t(message_key).format(error=exc)
+        )
+
+    def closeEvent(self, event: QtGui.QCloseEvent) -> None:  # type: ignore[override]
+        self._commits.flush()
+        while not self._commits.idle and self._io.busy:
+            # A reorder waits for the running commit; let that one deliver its result.
+            QtWidgets.QApplication.processEvents(QtCore.QEventLoop.WaitForMoreEvents)
+        self._watcher.stop()
+        self._io.shutdown()
+        tracing.TRACER.flush()
+        self._store.set(win_width=str(self.width()), win_height=str(self.height()))
+        self._store.close()
+        super().closeEvent(event)
 
     def _setup_blur_overlay(self) -> None:
-        parent = self.list_widget.parentWidget()
+        parent = self.list_view.parentWidget()
         self.blur_overlay = QtWidgets.QWidget(parent)
         self._update_blur_geometry()
         self.blur_overlay.lower()
@@ -156,46 +1010,85 @@ class DirectoryManagerApp(QtWidgets.QWidget):
         blur = QtWidgets.QGraphicsBlurEffect()
         blur.setBlurRadius(16)
         self.blur_overlay.setGraphicsEffect(blur)
-        self.list_widget.installEventFilter(self)
+        self.list_view.installEventFilter(self)
 
     def _update_blur_geometry(self) -> None:
-        self.blur_overlay.setGeometry(self.list_widget.geometry())
+        if self.blur_overlay is not None:
+            self.blur_overlay.setGeometry(self._active_view().geometry())
 
     def eventFilter(self, obj: QtCore.QObject, event: QtCore.QEvent) -> bool:  # type: ignore[override]
-        if obj is self.list_widget and event.type() == QtCore.QEvent.Resize:
+        if obj is self.filter_edit and event.type() == QtCore.QEvent.KeyPress:
+            if event.key() == QtCore.Qt.Key_Escape:
+                self._close_filter()
+                return True
+            if event.key() in (QtCore.Qt.Key_Down, QtCore.Qt.Key_Return, QtCore.Qt.Key_Enter):
+                self.list_view.setFocus()
+                return True
+        if obj is self._active_view() and event.type() in (QtCore.QEvent.Resize, QtCore.QEvent.Move):
             self._update_blur_geometry()
+            self._update_progress_geometry()
         return super().eventFilter(obj, event)
 
-    def _show_blur(self, color: str) -> None:
+    def _show_blur(self, tint: tuple[int, int, int, float]) -> None:
+        self._tint = tint
+        r, g, b, alpha = tint
+        if self._light_rendering:
+            self._active_view().set_tint(QtGui.QColor(r, g, b, round(alpha * 255)))
+            return
+        if self.blur_overlay is None:
+            return
         self._update_blur_geometry()
-        self.blur_overlay.setStyleSheet(f"background: {color}; border-radius: 9px;")
+        self.blur_overlay.setStyleSheet(
+            f"background: rgba({r},{g},{b},{alpha:.2f}); border-radius: 9px;"
+        )
         self.blur_overlay.show()
         self.blur_overlay.raise_()
 
     def _hide_blur(self) -> None:
-        self.blur_overlay.hide()
+        for view in self._views():
+            view.set_tint(None)
+        if self.blur_overlay is not None:
+            self.blur_overlay.hide()
 
-    def _write_state(self) -> None:
-        try:
-            with open(CONFIG_FILE, "w", encoding="utf-8") as fh:
-                json.dump(self._state, fh, ensure_ascii=False, indent=2)
-        except Exception:
-            pass
+    def _apply_render_mode(self) -> None:
+        """Pick effects or light rendering from ``render_mode`` (auto, effects, light)."""
+        if self.blur_overlay is None:
+            return
+        mode = self._store.get("render_mode", "auto")
+        light = mode == "light" or (
+            mode != "effects" and self.folder_model.rowCount() >= LIGHT_RENDER_ROWS
+        )
+        if light != self._light_rendering:
+            self._set_light_rendering(light)
+
+    def _set_light_rendering(self, light: bool) -> None:
+        self._light_rendering = light
+        active = self._active_view()
+        for view in self._views():
+            view.set_tint(None)
+            if light or view is not active:
+                view.setGraphicsEffect(None)
+        if light:
+            if self.blur_overlay is not None:
+                self.blur_overlay.hide()
+        else:
+            self._setup_list_shadow()
+        self._show_blur(self._tint)
+        self.update()
+
+    def _paint_list_shadow(self) -> None:
+        # Cheap stand-in for QGraphicsDropShadowEffect: a few stacked translucent outlines.
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        painter.setBrush(QtCore.Qt.NoBrush)
+        rect = QtCore.QRectF(self._active_view().geometry()).translated(0, 2)
+        for spread in range(1, 5):
+            painter.setPen(QtGui.QPen(QtGui.QColor(0, 0, 0, 14 - 3 * spread), 1))
+            r = rect.adjusted(-spread, -spread, spread, spread)
+            painter.drawRoundedRect(r, 9 + spread, 9 + spread)
 
     def _update_state(self, **kwargs: str) -> None:
-        self._state.update(kwargs)
-        self._write_state()
-
-    def _load_last_state(self) -> dict[str, str]:
-        if os.path.exists(CONFIG_FILE):
-            try:
-                with open(CONFIG_FILE, "r", encoding="utf-8") as fh:
-                    data = json.load(fh)
-                if isinstance(data, dict):
-                    return {str(k): str(v) for k, v in data.items() if isinstance(v, (str, int, float))}
-            except Exception:
-                return {}
-        return {}
+        self._store.set(**kwargs)
 
     def _setup_ui(self) -> None:
         font = QtGui.QFont("微软雅黑", 14)
@@ -216,21 +1109,21 @@ class DirectoryManagerApp(QtWidgets.QWidget):
                 min-height: 40px;
             }
             QPushButton:hover { background: #2265b5;}
-            QListWidget {
+            QListView, QTreeView {
                 border-radius: 9px;
                 border: 0.7px solid #b5bac0;
                 background: #fff; font-size: 18px;
             }
-            QListWidget::item {
+            QListView::item, QTreeView::item {
                 height: 32px; border-radius: 5px; color: #222;
             }
-            QListWidget::item:selected:active {
+            QListView::item:selected:active, QTreeView::item:selected:active {
                 background: #3794ff; color: #fff;
             }
-            QListWidget::item:selected:!active {
+            QListView::item:selected:!active, QTreeView::item:selected:!active {
                 background: #b5c6e0; color: #222;
             }
-            QListWidget::item:hover {
+            QListView::item:hover, QTreeView::item:hover {
                 background: #eef5ff;
             }
             QScrollBar:vertical {
@@ -250,6 +1143,12 @@ class DirectoryManagerApp(QtWidgets.QWidget):
             QScrollBar::handle:vertical:hover {
                 background: #2265b5;
             }
+            QTabBar::tab {
+                background: #e6edf6; color: #333;
+                border-radius: 4px; padding: 3px 10px;
+                margin-right: 3px; font-size: 15px;
+            }
+            QTabBar::tab:selected { background: #3794ff; color: #fff; }
             """
         )
 
@@ -270,22 +1169,65 @@ class DirectoryManagerApp(QtWidgets.QWidget):
         path_layout.addWidget(self.browse_btn)
         layout.addLayout(path_layout)
 
-        self.list_widget = SortListWidget()
-        self.list_widget.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
-        self.list_widget.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
-        self.list_widget.itemDropped.connect(self._on_drop)
-        self.list_widget.currentRowChanged.connect(self._on_select)
-        self.list_widget.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
-        self.list_widget.customContextMenuRequested.connect(self._show_context_menu)
-        self.list_widget.itemDoubleClicked.connect(self._open_folder_in_explorer)
-        layout.addWidget(self.list_widget)
-
-        shadow = QtWidgets.QGraphicsDropShadowEffect(self.list_widget)
+        self.tab_bar = QtWidgets.QTabBar()
+        self.tab_bar.setTabsClosable(True)
+        self.tab_bar.setMovable(True)
+        self.tab_bar.setExpanding(False)
+        self.tab_bar.setElideMode(QtCore.Qt.ElideMiddle)
+        self.tab_bar.setDrawBase(False)
+        self.tab_bar.currentChanged.connect(self._on_tab_changed)
+        self.tab_bar.tabCloseRequested.connect(self._close_tab)
+        self.tab_bar.tabMoved.connect(self._save_tabs)
+        self.tab_bar.hide()
+        layout.addWidget(self.tab_bar)
+
+        self.filter_edit = QtWidgets.QLineEdit()
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self._apply_filter)
+        self.filter_edit.hide()
+        layout.addWidget(self.filter_edit)
+
+        self.folder_model = FolderListModel(self)
+        self.filter_model = FolderFilterModel(self)
+        self.filter_model.setSourceModel(self.folder_model)
+        self._name_index: NameIndex | None = None
+        self.list_view = SortListView()
+        self.list_view.setModel(self.folder_model)
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.list_view.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
+        self.list_view.setDefaultDropAction(QtCore.Qt.MoveAction)
+        self.list_view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.list_view.itemDropped.connect(self._on_drop)
+        self.list_view.foldersDropped.connect(self._import_folders)
+        self.list_view.typeAhead.connect(self._start_filter)
+        self.list_view.selectionModel().currentRowChanged.connect(self._on_select)
+        self.list_view.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self._show_context_menu)
+        self.list_view.doubleClicked.connect(self._open_folder_in_explorer)
+        self.folder_delegate = FolderItemDelegate(self._format_folder_stats, self.list_view)
+        self.list_view.setItemDelegate(self.folder_delegate)
+        layout.addWidget(self.list_view)
+        self.filter_edit.installEventFilter(self)
+        # Tree mode widgets are built the first time it is switched on.
+        self._tree_mode = False
+        self.tree_model: FolderTreeModel | None = None
+        self.tree_view: SortTreeView | None = None
+
+    def _setup_list_shadow(self) -> None:
+        view = self._active_view()
+        shadow = QtWidgets.QGraphicsDropShadowEffect(view)
         shadow.setBlurRadius(16)
         shadow.setXOffset(0)
         shadow.setYOffset(2)
         shadow.setColor(QtGui.QColor(0, 0, 0, 20))
-        self.list_widget.setGraphicsEffect(shadow)
+        view.setGraphicsEffect(shadow)
+
+    def _active_view(self) -> SortListView | SortTreeView:
+        return self.tree_view if self.tree_view is not None and self._tree_mode else self.list_view
+
+    def _views(self) -> list[SortListView | SortTreeView]:
+        return [self.list_view] if self.tree_view is None else [self.list_view, self.tree_view]
 
     def _on_browse_double_clicked(self) -> None:
         cur_w, cur_h = self.width(), self.height()
@@ -312,28 +1254,296 @@ class DirectoryManagerApp(QtWidgets.QWidget):
                     return
         event.ignore()
 
-    def _refresh_list(self, base_path: str) -> None:
-        self.list_widget.clear()
-        try:
-            folders = [
-                f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))
-            ]
-            folders.sort()
-        except Exception:
-            folders = []
-        for folder in folders:
-            item = QtWidgets.QListWidgetItem(folder)
-            self.list_widget.addItem(item)
-        n = len(folders)
-        max_show = min(n, 30)
-        row_h = self.list_widget.sizeHintForRow(0) if n else 32
+    def _refresh_list(self, base_path: str, snapshot: DirectorySnapshot | None = None) -> None:
+        if base_path != self._base_path:
+            self._commits.flush()
+            self._remember_view()
+            self._add_tab(base_path)
+        self._base_path = base_path
+        if snapshot is None or snapshot.path != base_path:
+            if base_path != self._snapshot.path:
+                cached = self._dir_cache.get(base_path)
+                if cached is not None:
+                    self._show_snapshot(cached.snapshot)
+                    self._restore_view(cached)
+                    self._update_tab_bar()
+                    if not cached.stale:
+                        # The watcher kept this listing current; no disk access needed.
+                        self._io.cancel("listing")
+                        return
+                else:
+                    self._io.submit(
+                        _load_cached_job,
+                        self._store,
+                        base_path,
+                        key="cache",
+                        on_result=self._show_cached_snapshot,
+                    )
+            self._io.submit(_scan_job, base_path, key="listing", on_result=self._on_listing)
+            return
+        self._show_snapshot(snapshot)
+
+    def _on_listing(self, snapshot: DirectorySnapshot) -> None:
+        if snapshot.mtime_ns is not None:
+            self._show_snapshot(snapshot)
+        elif snapshot.path == self._base_path:
+            self._dir_cache.discard(snapshot.path)
+            QtWidgets.QMessageBox.critical(self, self._t("error_title"), self._t("path_missing"))
+            index = self._tab_index(snapshot.path)
+            if index >= 0:
+                self._close_tab(index)
+
+    def _show_cached_snapshot(self, snapshot: DirectorySnapshot | None) -> None:
+        if snapshot is None or snapshot.path == self._snapshot.path:
+            return
+        self._cached_listing = (snapshot.path, snapshot.names)
+        self._show_snapshot(snapshot)
+
+    def _keeps_order(self) -> bool:
+        """Whether reorders are saved to the order manifest instead of renaming folders."""
+        return self.sort_paused or self.order_manifest
+
+    def _display_order(self, snapshot: DirectorySnapshot) -> list[str]:
+        names = snapshot.names
+        # A reorder waiting to be committed is shown until the commit lands.
+        order = self._commits.pending_order(snapshot.path)
+        if order is None:
+            if not self._keeps_order():
+                return names
+            order = self._store.load_order(snapshot.path)
+        if not order:
+            return names
+        ordered = [name for name in order if name in snapshot]
+        seen = set(ordered)
+        return ordered + [name for name in names if name not in seen]
+
+    def _show_snapshot(self, snapshot: DirectorySnapshot | None) -> None:
+        if snapshot is None or snapshot.path != self._base_path:
+            return
+        with tracing.span("refresh", "ui", folders=len(snapshot)):
+            self._apply_snapshot(snapshot)
+
+    def _apply_snapshot(self, snapshot: DirectorySnapshot) -> None:
+        if snapshot.path != self._snapshot.path:
+            meta = self._store.directory(snapshot.path)
+            self.order_manifest = bool(meta.get("manifest", False))
+            self._set_sort_paused(bool(meta.get("paused", True)))
+            self.folder_model.clear_stats()
+            self._io.cancel("name_index")
+            self._name_index = None
+            if self._journal.can_undo(snapshot.path) is None:
+                # Looked up once per directory; journaled jobs keep it current afterwards.
+                self._io.submit(_undo_state_job, self._journal, snapshot.path, serial=True)
+            self.filter_edit.clear()
+            self.filter_edit.hide()
+        diff: SnapshotDiff | None = None
+        renamed: list[tuple[str, str]] = []
+        if snapshot.path == self._snapshot.path:
+            diff = self._snapshot.diff(snapshot)
+            renamed = diff.renamed
+            if renamed:
+                # Renamed folders keep their place in a pending or manual order.
+                self._commits.remap(snapshot.path, renamed)
+                if self._keeps_order():
+                    self._remap_order(snapshot.path, renamed)
+        folders = self._display_order(snapshot)
+        if diff is not None:
+            if self._name_index is not None:
+                # Update the index first so the filtered view re-matches new names.
+                for name in diff.removed + [old for old, _ in diff.renamed]:
+                    self._name_index.remove(name)
+                for name in diff.added + [new for _, new in diff.renamed]:
+                    self._name_index.add(name)
+            self.folder_model.apply_names(folders, diff.renamed)
+        else:
+            self.folder_model.set_names(folders)
+        if self._tree_mode and self.tree_model is not None:
+            self.tree_model.set_root(snapshot.path, folders, renamed)
+        if snapshot.mtime_ns is not None:
+            if self._staging_checked != snapshot.path:
+                self._staging_checked = snapshot.path
+                if snapshot.occupied(delete_engine.STAGING_DIR):
+                    self._purge_staged(snapshot.path, None)
+            if self._cached_listing != (snapshot.path, snapshot.names):
+                self._cached_listing = (snapshot.path, snapshot.names)
+                self._store.save_snapshot(snapshot.path, snapshot.names)
+        self._update_fixed_heights()
+        self._snapshot = snapshot
+        self._update_watched()
+        self._apply_render_mode()
+        if snapshot.mtime_ns is not None:
+            self._request_sizes()
+            STARTUP.mark("listing")
+            self._finish_startup_profile()
+        else:
+            STARTUP.mark("cached_listing")
+
+    def _update_watched(self) -> None:
+        """One watcher pool for the current directory and every cached one."""
+        paths = self._dir_cache.paths()
+        if self._snapshot.path and self._snapshot.path == self._base_path:
+            paths.append(self._snapshot.path)
+        self._watcher.set_paths(paths)
+
+    def _remember_view(self) -> None:
+        snapshot = self._snapshot
+        if not snapshot.path or snapshot.path != self._base_path or snapshot.mtime_ns is None:
+            return
+        current = self.list_view.currentIndex()
+        self._dir_cache.put(
+            CachedDirectory(
+                snapshot,
+                scroll=self.list_view.verticalScrollBar().value(),
+                selected=self.list_view.selected_names(),
+                current=self.list_view.model().name(current.row()) if current.isValid() else None,
+            )
+        )
+
+    def _restore_view(self, entry: CachedDirectory) -> None:
+        model = self.folder_model
+        selection = QtCore.QItemSelection()
+        start = previous = -2
+        for row in model.rows_of(set(entry.selected)) + [-2]:
+            if row != previous + 1:
+                if start >= 0:
+                    selection.select(model.index(start), model.index(previous))
+                start = row
+            previous = row
+        selection_model = self.list_view.selectionModel()
+        if entry.current is not None:
+            rows = model.rows_of({entry.current})
+            if rows:
+                selection_model.setCurrentIndex(
+                    model.index(rows[0]), QtCore.QItemSelectionModel.NoUpdate
+                )
+        selection_model.select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
+        # The scroll range is only known once the view has laid out the new rows.
+        QtCore.QTimer.singleShot(
+            0, partial(self.list_view.verticalScrollBar().setValue, entry.scroll)
+        )
+
+    def _tab_index(self, path: str) -> int:
+        for index in range(self.tab_bar.count()):
+            if _same_path(self.tab_bar.tabData(index), path):
+                return index
+        return -1
+
+    def _add_tab(self, path: str) -> None:
+        bar = self.tab_bar
+        bar.blockSignals(True)
+        index = self._tab_index(path)
+        if index < 0:
+            index = bar.addTab(os.path.basename(os.path.normpath(path)) or path)
+            bar.setTabData(index, path)
+            while bar.count() > RECENT_TABS:
+                bar.removeTab(0)
+                index -= 1
+        bar.setCurrentIndex(index)
+        bar.blockSignals(False)
+        self._save_tabs()
+        self._update_tab_bar()
+
+    def _save_tabs(self) -> None:
+        self._store.set(recent_paths=[self.tab_bar.tabData(i) for i in range(self.tab_bar.count())])
+
+    def _update_tab_bar(self) -> None:
+        bar = self.tab_bar
+        stats = self._dir_cache.stats
+        summary = self._t("cache_stats").format(
+            count=len(self._dir_cache),
+            size=format_size(self._dir_cache.bytes),
+            hits=stats.hits,
+            misses=stats.misses,
+            evictions=stats.evictions,
+        )
+        for index in range(bar.count()):
+            bar.setTabToolTip(index, f"{bar.tabData(index)}\n{summary}")
+        visible = bar.count() > 1
+        if visible == bar.isHidden():
+            bar.setVisible(visible)
+            self._update_fixed_heights()
+
+    def _on_tab_changed(self, index: int) -> None:
+        path = self.tab_bar.tabData(index) if index >= 0 else None
+        if not path or path == self._base_path:
+            return
+        # The cached listing shows at once; the listing job reports a vanished directory.
+        self.path_edit.setText(path)
+        self._update_state(last_path=path)
+        self._refresh_list(path)
+
+    def _close_tab(self, index: int) -> None:
+        path = self.tab_bar.tabData(index)
+        # Removing the current tab selects a neighbour, which switches to it.
+        self.tab_bar.removeTab(index)
+        if path and not _same_path(path, self._base_path):
+            self._dir_cache.discard(path)
+            self._update_watched()
+        self._save_tabs()
+        self._update_tab_bar()
+
+    def _update_fixed_heights(self) -> None:
+        with tracing.span("relayout", "ui"):
+            self._set_fixed_heights()
+
+    def _set_fixed_heights(self) -> None:
+        view = self._active_view()
+        # Expanding branches must not resize the window, so the tree always gets 30 rows.
+        max_show = 30 if view is self.tree_view else min(self.folder_model.rowCount(), 30)
+        row_h = view.sizeHintForRow(0) if view.model().rowCount() else 32
         list_h = max_show * row_h + 4
-        self.list_widget.setFixedHeight(list_h)
+        view.setFixedHeight(list_h)
         top_h = self.path_edit.sizeHint().height() + 10 + 16
+        if not self.tab_bar.isHidden():
+            top_h += self.tab_bar.sizeHint().height() + 4
+        if self.filter_edit.isVisible():
+            top_h += self.filter_edit.sizeHint().height() + 4
         bottom_h = 18
         total_h = top_h + list_h + bottom_h
         self.setFixedHeight(total_h)
-        self._last_folder_list = folders
+
+    def _start_filter(self, text: str = "") -> None:
+        if not self.filter_edit.isVisible():
+            self.filter_edit.show()
+            self._update_fixed_heights()
+        self.filter_edit.setFocus()
+        if text:
+            self.filter_edit.setText(self.filter_edit.text() + text)
+
+    def _close_filter(self) -> None:
+        self.filter_edit.clear()
+        self.filter_edit.hide()
+        self._update_fixed_heights()
+        self.list_view.setFocus()
+
+    def _apply_filter(self, text: str) -> None:
+        if text and self._name_index is None and self._base_path:
+            # Until the index is built the filter falls back to a linear scan.
+            base_path = self._base_path
+            self._io.submit(
+                _name_index_job,
+                self.folder_model.names(),
+                key="name_index",
+                on_result=partial(self._on_name_index, base_path),
+            )
+        search = self._name_index.search if self._name_index is not None else None
+        self.filter_model.set_filter(text, search)
+        model = self.filter_model if text else self.folder_model
+        if self.list_view.model() is not model:
+            # setModel() gives the view a new selection model and leaves the old one to us.
+            old_selection = self.list_view.selectionModel()
+            self.list_view.setModel(model)
+            self.list_view.selectionModel().currentRowChanged.connect(self._on_select)
+            old_selection.deleteLater()
+        self._request_sizes()
+
+    def _on_name_index(self, base_path: str, index: NameIndex) -> None:
+        if base_path != self._base_path:
+            return
+        index.update(self.folder_model.names())
+        self._name_index = index
+        if self.filter_model.query:
+            self.filter_model.set_filter(self.filter_model.query, index.search)
 
     def _select_directory(self) -> None:
         cur_path = self.path_edit.text()
@@ -347,22 +1557,78 @@ class DirectoryManagerApp(QtWidgets.QWidget):
             self._refresh_list(path)
 
     def _confirm_sort(self) -> None:
-        base_path = self.path_edit.text()
-        folders = [self.list_widget.item(i).text() for i in range(self.list_widget.count())]
-        used_names: set[str] = set()
-        for i, folder_name in enumerate(folders, 1):
-            base_name = re.sub(r"^\d+_", "", folder_name)
-            new_name = f"{i:02d}_{base_name}"
-            current_path = os.path.join(base_path, folder_name)
-            new_path = os.path.join(base_path, new_name)
-            counter = 1
-            while new_name in used_names or (os.path.exists(new_path) and current_path != new_path):
-                new_name = f"{i:02d}_{base_name} ({counter})"
-                new_path = os.path.join(base_path, new_name)
-                counter += 1
-            used_names.add(new_name)
-            if os.path.exists(current_path):
-                os.rename(current_path, new_path)
+        """Number the folders in the shown order now, replacing any pending commit."""
+        self._commits.discard()
+        self._commit_order(self.path_edit.text(), self.folder_model.names())
+
+    def _commit_order(self, base_path: str, folders: list[str]) -> None:
+        """Rename *base_path*'s folders to number them in *folders* order (one journaled batch).
+
+        *base_path* is the shown directory or a tree level below it.
+        """
+        self._store.save_order(base_path, None)
+        if _same_path(base_path, self._base_path):
+            self._io.cancel("listing")
+            on_result = self._on_sorted
+            on_error = partial(self._on_mutation_failed, base_path, "rename_failed")
+        else:
+            self._io.cancel(f"tree:{base_path}")
+            on_result = self._on_tree_level_numbered
+            on_error = partial(self._on_tree_level_failed, base_path)
+        # The batch's own renames must not trigger rescans of a half-renamed directory.
+        self._watcher.suppress(base_path)
+        self._commits.begin()
+        self._io.submit(
+            _sort_job,
+            self._journal,
+            base_path,
+            folders,
+            self._numbering(),
+            serial=True,
+            on_result=partial(self._finish_commit, base_path, on_result),
+            on_error=partial(self._finish_commit, base_path, on_error),
+        )
+
+    def _on_sorted(self, result: tuple[DirectorySnapshot, list[tuple[str, str]]]) -> None:
+        self._show_snapshot(result[0])
+
+    def _finish_commit(self, base_path: str, callback: Callable[[Any], None], value: Any) -> None:
+        self._watcher.resume(base_path)
+        callback(value)
+        self._commits.end()
+
+    def _when_committed(self, action: Callable[[], None]) -> None:
+        """Run *action* now, or once pending and running reorder commits are done.
+
+        Folder names change when a commit lands, so actions that work on names
+        wait for it instead of racing it.
+        """
+        if self._commits.idle:
+            action()
+            return
+        self._deferred.append(action)
+        self._commits.flush()
+
+    def _committed(self, action: Callable[[], None]) -> Callable[[], None]:
+        return lambda: self._when_committed(action)
+
+    def _on_commit_state(self) -> None:
+        if self._commits.pending_count:
+            self._show_status(self._t("commit_pending").format(count=self._commits.pending_count))
+        elif self._commits.in_flight:
+            self._show_status(self._t("commit_running"))
+        elif not self._io.busy:
+            self.status_label.hide()
+        if self._commits.idle and self._deferred:
+            deferred, self._deferred = self._deferred, []
+            for action in deferred:
+                action()
+
+    def _numbering(self) -> NumberingScheme:
+        return NumberingScheme.from_settings(self._store.get("numbering"))
+
+    def _on_mutation_failed(self, base_path: str, message_key: str, exc: Exception) -> None:
+        self._show_error(message_key, exc)
         self._refresh_list(base_path)
 
     def _create_new_folder(self) -> None:
@@ -375,49 +1641,248 @@ class DirectoryManagerApp(QtWidgets.QWidget):
         )
         if not ok or not folder_name:
             return
-        counter = 1
-        original_name = folder_name
-        while os.path.exists(os.path.join(base_path, folder_name)):
-            folder_name = f"{original_name}({counter})"
-            counter += 1
+        self._submit_create(base_path, [folder_name])
+
+    def _bulk_create_folders(self) -> None:
+        dialog = BulkCreateDialog(self._t, self)
+        if dialog.exec_() != QtWidgets.QDialog.Accepted:
+            return
         try:
-            os.makedirs(os.path.join(base_path, folder_name))
-            self._refresh_list(base_path)
-        except Exception as exc:
-            QtWidgets.QMessageBox.critical(
-                self, self._t("error_title"), self._t("new_folder_failed").format(error=exc)
+            names = dialog.names()
+        except (ValueError, IndexError, KeyError) as exc:
+            self._show_error("new_folder_failed", exc)
+            return
+        if names:
+            self._submit_create(self.path_edit.text(), names)
+
+    def _submit_create(self, base_path: str, names: list[str]) -> None:
+        """Create *names* after the selection (or at the end) in one background batch."""
+        order = self.folder_model.names()
+        rows = self.folder_model.rows_of(set(self.list_view.selected_names()))
+        position = rows[-1] + 1 if rows else None
+        scheme = None if self._keeps_order() else self._numbering()
+        # Plain creation resolves collisions against the listing in memory;
+        # renumbering works from a fresh scan like every other sort.
+        snapshot = self._snapshot if scheme is None and self._snapshot.path == base_path else None
+        self._io.cancel("listing")
+        self._io.submit(
+            _create_folders_job,
+            self._journal,
+            base_path,
+            snapshot,
+            names,
+            order,
+            position,
+            scheme,
+            serial=True,
+            on_result=partial(self._on_folders_created, base_path),
+            on_error=partial(self._on_mutation_failed, base_path, "new_folder_failed"),
+        )
+
+    def _on_folders_created(
+        self,
+        base_path: str,
+        result: tuple[DirectorySnapshot, list[str], list[tuple[str, Exception]]],
+    ) -> None:
+        snapshot, order, failures = result
+        if self._keeps_order():
+            self._store.save_order(base_path, order)
+        if base_path == self._base_path:
+            self._show_snapshot(snapshot)
+        if failures:
+            items = "\n".join(f"{name}: {exc}" for name, exc in failures)
+            QtWidgets.QMessageBox.warning(
+                self,
+                self._t("error_title"),
+                self._t("bulk_create_failed").format(count=len(failures), items=items),
             )
 
+    def _import_folders(self, sources: list[str], row: int, move: bool) -> None:
+        """Copy or move folders dropped from outside in at view *row*."""
+        self._when_committed(
+            lambda: self._submit_transfer(self.path_edit.text(), sources, row, move)
+        )
+
+    def _submit_transfer(self, base_path: str, sources: list[str], row: int, move: bool) -> None:
+        if not base_path:
+            return
+        model = self.list_view.model()
+        if row < model.rowCount():
+            rows = self.folder_model.rows_of({model.name(row)})
+            position = rows[0] if rows else None
+        elif model is not self.folder_model and row:
+            # End of a filtered list: after the last match, not after every folder.
+            rows = self.folder_model.rows_of({model.name(row - 1)})
+            position = rows[0] + 1 if rows else None
+        else:
+            position = None
+        snapshot = self._snapshot if self._snapshot.path == base_path else None
+        stop = threading.Event()
+        self._transfer_stops.add(stop)
+        self._cancel_transfers.setEnabled(True)
+        # Arrivals are reported with the result; rescans meanwhile would only see part of them.
+        self._watcher.suppress(base_path)
+        self._io.cancel("listing")
+        self._io.submit(
+            _transfer_job,
+            base_path,
+            snapshot,
+            sources,
+            self.folder_model.names(),
+            position,
+            move,
+            stop,
+            self._t("transfer_progress"),
+            serial=True,
+            on_result=partial(self._end_transfer, base_path, stop, self._on_transferred),
+            on_error=partial(
+                self._end_transfer,
+                base_path,
+                stop,
+                partial(self._on_mutation_failed, base_path, "transfer_failed"),
+            ),
+        )
+
+    def _stop_transfers(self) -> None:
+        for stop in self._transfer_stops:
+            stop.set()
+
+    def _end_transfer(
+        self, base_path: str, stop: threading.Event, callback: Callable[[Any], None], value: Any
+    ) -> None:
+        self._transfer_stops.discard(stop)
+        self._cancel_transfers.setEnabled(bool(self._transfer_stops))
+        self._watcher.resume(base_path)
+        callback(value)
+
+    def _on_transferred(
+        self, result: tuple[DirectorySnapshot, list[str], TransferReport]
+    ) -> None:
+        snapshot, order, report = result
+        base_path = snapshot.path
+        if report.arrived:
+            if self._keeps_order():
+                self._store.save_order(base_path, order)
+            else:
+                # Shown in place now and numbered in one batch with the existing folders.
+                self._commits.schedule(base_path, order)
+            if base_path == self._base_path:
+                self._show_snapshot(snapshot)
+            if not self._keeps_order():
+                self._commits.flush()
+        if report.failures:
+            items = "\n".join(f"{name}: {exc}" for name, exc in report.failures)
+            QtWidgets.QMessageBox.warning(
+                self,
+                self._t("error_title"),
+                self._t("transfer_failures").format(count=len(report.failures), items=items),
+            )
+        elif report.cancelled:
+            # Shown for a moment once the busy indicator is gone.
+            QtCore.QTimer.singleShot(0, lambda: self._show_status(self._t("transfer_cancelled")))
+            QtCore.QTimer.singleShot(2000, self._on_commit_state)
+
     def _clear_prefix_number(self) -> None:
         base_path = self.path_edit.text()
-        folders = [
-            f for f in os.listdir(base_path) if os.path.isdir(os.path.join(base_path, f))
-        ]
-        changed = False
-        for old_name in folders:
-            new_name = re.sub(r"^\d+_?", "", old_name)
-            if new_name and new_name != old_name:
-                old_path = os.path.join(base_path, old_name)
-                new_path = os.path.join(base_path, new_name)
-                if os.path.exists(new_path):
-                    continue
-                try:
-                    os.rename(old_path, new_path)
-                    changed = True
-                except Exception as exc:
-                    QtWidgets.QMessageBox.critical(
-                        self,
-                        self._t("error_title"),
-                        self._t("clear_prefix_failed").format(error=exc),
-                    )
-        if changed:
-            self._refresh_list(base_path)
+        self._io.submit(
+            _clear_prefix_job,
+            self._journal,
+            base_path,
+            self._numbering(),
+            serial=True,
+            on_result=self._show_snapshot,
+            on_error=partial(self._on_mutation_failed, base_path, "clear_prefix_failed"),
+        )
+
+    def _rename_with_rules(self) -> None:
+        base_path = self._base_path
+        if not base_path or self._snapshot.path != base_path:
+            return
+        selected = set(self.list_view.selected_names())
+        names = self.folder_model.names()
+        if selected:
+            names = [name for name in names if name in selected]
+        snapshot = self._snapshot
+        dialog = RenameRulesDialog(self._t, names, self)
+        dialog.checkRequested.connect(
+            lambda rules: self._io.submit(
+                _rules_check_job,
+                snapshot,
+                rules,
+                names,
+                key="rules_check",
+                on_result=dialog.set_check_result,
+            )
+        )
+        accepted = dialog.exec_() == QtWidgets.QDialog.Accepted
+        self._io.cancel("rules_check")
+        if not accepted or not dialog.rule_set:
+            return
+        self._io.cancel("listing")
+        self._io.submit(
+            _rules_apply_job,
+            self._journal,
+            base_path,
+            dialog.rule_set,
+            names,
+            serial=True,
+            on_result=partial(self._on_rules_applied, base_path),
+            on_error=partial(self._on_mutation_failed, base_path, "rename_failed"),
+        )
+
+    def _on_rules_applied(
+        self,
+        base_path: str,
+        result: tuple[DirectorySnapshot, list[tuple[str, str]], list[tuple[str, str, str]]],
+    ) -> None:
+        snapshot, renamed, skipped = result
+        if base_path == self._base_path:
+            # Showing the result carries the manual order over the renames.
+            self._show_snapshot(snapshot)
+        else:
+            self._remap_order(base_path, renamed)
+        if skipped:
+            lines = [
+                f"{name} → {target}: {self._t(f'reason_{reason}')}"
+                for name, target, reason in skipped[:30]
+            ]
+            if len(skipped) > 30:
+                lines.append(f"... (+{len(skipped) - 30})")
+            QtWidgets.QMessageBox.warning(
+                self,
+                self._t("rename_title"),
+                self._t("rules_skipped").format(count=len(skipped), items="\n".join(lines)),
+            )
+
+    def _undo_last_rename(self) -> None:
+        base_path = self.path_edit.text()
+        self._io.submit(
+            _undo_job,
+            self._journal,
+            base_path,
+            serial=True,
+            on_result=lambda _: self._refresh_list(base_path),
+            on_error=partial(self._on_mutation_failed, base_path, "undo_failed"),
+        )
+
+    def _on_journal_recovered(self, results: list[RecoveryResult]) -> None:
+        if not results:
+            return
+        failed = sorted({r.base_path for r in results if r.action == "failed"})
+        if failed:
+            QtWidgets.QMessageBox.warning(
+                self,
+                self._t("error_title"),
+                self._t("recovery_failed").format(paths="\n".join(failed)),
+            )
+        if self._base_path:
+            self._io.submit(_undo_state_job, self._journal, self._base_path, serial=True)
+            self._refresh_list(self._base_path)
 
     def _delete_selected_folders(self) -> None:
-        items = self.list_widget.selectedItems()
-        if not items:
+        names = self.list_view.selected_names()
+        if not names:
             return
-        names = [item.text() for item in items]
         msg = self._t("confirm_delete_message").format(items="\n".join(names))
         if (
             QtWidgets.QMessageBox.question(
@@ -430,23 +1895,64 @@ class DirectoryManagerApp(QtWidgets.QWidget):
         ):
             return
         base_path = self.path_edit.text()
-        for name in names:
-            folder_path = os.path.join(base_path, name)
-            try:
-                shutil.rmtree(folder_path)
-            except Exception as exc:
-                QtWidgets.QMessageBox.warning(
-                    self,
-                    self._t("delete_failed_title"),
-                    self._t("delete_failed").format(name=name, error=exc),
-                )
-        self._refresh_list(base_path)
+        self._io.submit(
+            _stage_delete_job,
+            base_path,
+            names,
+            serial=True,
+            on_result=partial(self._on_delete_staged, base_path),
+        )
+
+    def _on_delete_staged(
+        self, base_path: str, result: tuple[list[StagedFolder], list[tuple[str, Exception]]]
+    ) -> None:
+        staged, failures = result
+        if staged and base_path == self._snapshot.path:
+            diff = SnapshotDiff(removed=[folder.name for folder in staged])
+            self._show_snapshot(self._snapshot.apply(diff))
+        if staged:
+            self._purge_staged(base_path, staged, failures)
+        else:
+            self._report_delete_failures(failures)
+
+    def _purge_staged(
+        self,
+        base_path: str,
+        staged: list[StagedFolder] | None,
+        failures: list[tuple[str, Exception]] | None = None,
+    ) -> None:
+        self._io.submit(
+            _purge_job,
+            base_path,
+            staged,
+            self._t("delete_progress"),
+            on_result=lambda report: self._on_purged(base_path, failures or [], report),
+        )
+
+    def _on_purged(
+        self, base_path: str, stage_failures: list[tuple[str, Exception]], report: DeleteReport
+    ) -> None:
+        self._report_delete_failures(stage_failures + report.failures)
+        if report.failures:
+            self._refresh_list(base_path)
+
+    def _report_delete_failures(self, failures: list[tuple[str, Exception]]) -> None:
+        if not failures:
+            return
+        items = "\n".join(
+            self._t("delete_failed").format(name=name, error=exc) for name, exc in failures
+        )
+        QtWidgets.QMessageBox.warning(
+            self,
+            self._t("delete_failed_title"),
+            self._t("delete_failed_summary").format(count=len(failures), items=items),
+        )
 
     def _on_select(self) -> None:
         pass
 
-    def _open_folder_in_explorer(self, item: QtWidgets.QListWidgetItem) -> None:
-        folder_name = item.text()
+    def _open_folder_in_explorer(self, index: QtCore.QModelIndex) -> None:
+        folder_name = self.list_view.model().name(index.row())
         base_path = self.path_edit.text()
         folder_path = os.path.join(base_path, folder_name)
         if os.path.exists(folder_path):
@@ -458,12 +1964,11 @@ class DirectoryManagerApp(QtWidgets.QWidget):
                 subprocess.Popen(["xdg-open", folder_path])
 
     def _rename_selected_folder(self) -> None:
-        selected = self.list_widget.selectedItems()
+        selected = self.list_view.selected_names()
         if len(selected) != 1:
             return
-        old_name = selected[0].text()
+        old_name = selected[0]
         base_path = self.path_edit.text()
-        old_path = os.path.join(base_path, old_name)
         new_name, ok = QtWidgets.QInputDialog.getText(
             self,
             self._t("rename_title"),
@@ -471,29 +1976,175 @@ class DirectoryManagerApp(QtWidgets.QWidget):
             text=old_name,
         )
         if ok and new_name and new_name != old_name:
-            new_path = os.path.join(base_path, new_name)
-            if os.path.exists(new_path):
-                QtWidgets.QMessageBox.critical(
-                    self, self._t("error_title"), self._t("rename_exists")
-                )
-                return
-            try:
-                os.rename(old_path, new_path)
-                self._refresh_list(base_path)
-            except Exception as exc:
-                QtWidgets.QMessageBox.critical(
-                    self, self._t("error_title"), self._t("rename_failed").format(error=exc)
-                )
+            self._io.submit(
+                _rename_job,
+                base_path,
+                old_name,
+                new_name,
+                serial=True,
+                on_result=lambda _: self._refresh_list(base_path),
+                on_error=self._on_rename_failed,
+            )
+
+    def _on_rename_failed(self, exc: Exception) -> None:
+        if isinstance(exc, FolderExistsError):
+            QtWidgets.QMessageBox.critical(self, self._t("error_title"), self._t("rename_exists"))
+        else:
+            self._show_error("rename_failed", exc)
+
+    def _set_sort_paused(self, paused: bool) -> None:
+        self.sort_paused = paused
+        if self.order_manifest:
+            self._show_blur(MANIFEST_TINT)
+        else:
+            self._show_blur(PAUSED_TINT if paused else SORTING_TINT)
+
+    def _remap_order(self, base_path: str, renamed: list[tuple[str, str]]) -> None:
+        order = self._store.load_order(base_path)
+        if order and renamed:
+            mapping = dict(renamed)
+            self._store.save_order(base_path, [mapping.get(name, name) for name in order])
+
+    def _set_order_manifest(self, enabled: bool) -> None:
+        """Keep this directory's order in its manifest (no renames) or go back to paused sorting."""
+        if not self._base_path:
+            return
+        self.order_manifest = enabled
+        self._store.update_directory(self._base_path, manifest=enabled or None, paused=True)
+        if enabled:
+            self._store.save_order(self._base_path, self.folder_model.names())
+        self._set_sort_paused(True)
+
+    def _materialize_prefixes(self) -> None:
+        """Rename folders to match the manifest order, touching only folders whose number changes."""
+        base_path = self._base_path
+        if not base_path:
+            return
+        self._io.cancel("listing")
+        self._io.submit(
+            _sort_job,
+            self._journal,
+            base_path,
+            self.folder_model.names(),
+            self._numbering(),
+            serial=True,
+            on_result=partial(self._on_materialized, base_path),
+            on_error=partial(self._on_mutation_failed, base_path, "rename_failed"),
+        )
+
+    def _on_materialized(
+        self, base_path: str, result: tuple[DirectorySnapshot, list[tuple[str, str]]]
+    ) -> None:
+        # The numbered names now sort in the manifest order by themselves.
+        self._store.save_order(base_path, None)
+        self._on_sorted(result)
 
     def _pause_sort(self) -> None:
-        self.sort_paused = True
-        self._show_blur("rgba(255,105,180,0.10)")
+        self._set_sort_paused(True)
+        if self._base_path:
+            self._store.update_directory(self._base_path, paused=True)
 
     def _resume_sort(self) -> None:
-        self.sort_paused = False
-        self._show_blur("rgba(120,255,170,0.10)")
+        self._set_sort_paused(False)
+        if self._base_path:
+            self._store.update_directory(self._base_path, paused=False)
         self._confirm_sort()
 
+    def _format_folder_stats(self, stats: tuple[int, int] | None) -> str:
+        if stats is None:
+            return "…"
+        size, items = stats
+        return self._t("folder_stats").format(size=format_size(size), items=items)
+
+    def _toggle_show_sizes(self, show: bool) -> None:
+        self._store.set(show_sizes=show)
+        self._set_show_sizes(show)
+
+    def _set_show_sizes(self, show: bool) -> None:
+        self.folder_delegate.show_stats = show
+        self.list_view.viewport().update()
+        if show:
+            self._request_sizes()
+        else:
+            self._io.cancel("sizes")
+
+    def _toggle_tracing(self, enabled: bool) -> None:
+        self._store.set(tracing=enabled)
+        self._set_tracing(enabled)
+
+    def _set_tracing(self, enabled: bool) -> None:
+        if enabled:
+            tracing.TRACER.enable(os.path.dirname(self._store.path))
+        else:
+            tracing.TRACER.disable()
+        if tracing.TRACER.enabled:
+            self._trace_timer.start()
+            self._update_trace_overlay()
+        else:
+            self._trace_timer.stop()
+            self.trace_overlay.hide()
+
+    def _update_trace_overlay(self) -> None:
+        tracer = tracing.TRACER
+        last = tracer.last_ms
+        lines = [
+            tracer.path,
+            self._t("trace_rates").format(
+                renames=tracer.rate("renames"),
+                deletes=tracer.rate("deletes"),
+                events=tracer.rate("dir_changes"),
+            ),
+            self._t("trace_last").format(
+                refresh=last.get("refresh", 0.0),
+                relayout=last.get("relayout", 0.0),
+                paint=last.get("paint", 0.0),
+            ),
+        ]
+        if tracer.slow:
+            lines.append(self._t("trace_slow"))
+            lines += [f"  {name:<16} {ms:8.1f} ms" for name, ms in reversed(tracer.slow)]
+        self.trace_overlay.setText("\n".join(lines))
+        self.trace_overlay.adjustSize()
+        geo = self._active_view().geometry()
+        self.trace_overlay.move(geo.right() - self.trace_overlay.width() - 14, geo.top() + 6)
+        self.trace_overlay.show()
+        self.trace_overlay.raise_()
+        tracer.flush()
+
+    def _request_sizes(self) -> None:
+        """Measure folders without stats yet, visible rows first."""
+        if not self.folder_delegate.show_stats or not self._base_path:
+            return
+        if self._snapshot.path != self._base_path or self._snapshot.mtime_ns is None:
+            return
+        model = self.list_view.model()
+        count = model.rowCount()
+        if not count:
+            return
+        viewport = self.list_view.viewport().rect()
+        first = self.list_view.indexAt(viewport.topLeft()).row()
+        last = self.list_view.indexAt(viewport.bottomLeft()).row()
+        first = max(first, 0)
+        last = count - 1 if last < 0 else last
+        order = list(range(first, last + 1)) + list(range(last + 1, count)) + list(range(first))
+        has_stats = self.folder_model.has_stats
+        names = [name for name in map(model.name, order) if not has_stats(name)]
+        if not names:
+            return
+        base_path = self._base_path
+        self._io.submit(
+            _size_job,
+            self._size_index,
+            base_path,
+            names,
+            key="sizes",
+            on_partial=partial(self._on_sizes, base_path),
+        )
+
+    def _on_sizes(self, base_path: str, stats: list[tuple[str, int, int]]) -> None:
+        if base_path == self._base_path:
+            self.folder_model.set_stats(stats)
+
     def _set_language(self, language: str) -> None:
         if language not in LANG_STRINGS:
             return
@@ -501,11 +2152,114 @@ class DirectoryManagerApp(QtWidgets.QWidget):
             return
         self.language = language
         self._apply_language()
+        self.list_view.viewport().update()
         self._update_state(language=language)
 
     def _on_drop(self) -> None:
-        if not self.sort_paused:
+        if not self._keeps_order():
+            # Quick successive drops are committed together once they stop.
+            self._commits.schedule(self._base_path, self.folder_model.names())
+        elif self._base_path:
+            self._store.save_order(self._base_path, self.folder_model.names())
+
+    def _toggle_tree_mode(self, enabled: bool) -> None:
+        self._store.set(tree_mode=enabled)
+        self._set_tree_mode(enabled)
+
+    def _set_tree_mode(self, enabled: bool) -> None:
+        if enabled and self.tree_view is None:
+            self._setup_tree()
+        if enabled == self._tree_mode:
+            return
+        assert self.tree_model is not None and self.tree_view is not None
+        self._tree_mode = enabled
+        if enabled:
+            if self.filter_edit.isVisible():
+                self._close_filter()
+            root = self._base_path if self._snapshot.path == self._base_path else ""
+            self.tree_model.set_root(root, self.folder_model.names())
+        else:
+            # Drop every loaded level; the next tree starts from the top again.
+            self.tree_model.set_root("", [])
+        self.list_view.setVisible(not enabled)
+        self.tree_view.setVisible(enabled)
+        if self._light_rendering is not None:
+            self._set_light_rendering(self._light_rendering)
+        self._update_fixed_heights()
+        self._update_blur_geometry()
+        self._update_progress_geometry()
+
+    def _setup_tree(self) -> None:
+        self.tree_model = FolderTreeModel(self)
+        self.tree_model.fetchRequested.connect(self._load_tree_level)
+        self.tree_model.levelReordered.connect(self._on_tree_level_reordered)
+        view = SortTreeView()
+        view.setModel(self.tree_model)
+        view.setHeaderHidden(True)
+        view.setUniformRowHeights(True)
+        view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        view.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
+        view.setDefaultDropAction(QtCore.Qt.MoveAction)
+        view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        view.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+        view.customContextMenuRequested.connect(self._show_tree_context_menu)
+        view.expanded.connect(self._on_tree_expanded)
+        view.collapsed.connect(self.tree_model.mark_collapsed)
+        view.installEventFilter(self)
+        view.hide()
+        layout = self.layout()
+        layout.insertWidget(layout.indexOf(self.list_view) + 1, view)
+        self.tree_view = view
+
+    def _load_tree_level(self, path: str) -> None:
+        self._io.submit(_scan_job, path, key=f"tree:{path}", on_result=self._on_tree_level)
+
+    def _on_tree_level(self, snapshot: DirectorySnapshot) -> None:
+        if self.tree_model is None:
+            return
+        names = self._display_order(snapshot) if snapshot.mtime_ns is not None else []
+        self.tree_model.set_children(snapshot.path, names)
+
+    def _on_tree_expanded(self, index: QtCore.QModelIndex) -> None:
+        assert self.tree_model is not None
+        self.tree_model.mark_expanded(index)
+        if self.tree_model.is_loaded(index):
+            # Only the top level is watched; lower levels are re-listed when expanded.
+            self._load_tree_level(self.tree_model.path(index))
+
+    def _on_tree_level_reordered(self, path: str, names: list[str]) -> None:
+        if _same_path(path, self._base_path):
+            self.folder_model.set_names(names)
+            self._on_drop()
+        elif self._keeps_order():
+            self._store.save_order(path, names)
+        else:
+            self._commits.schedule(path, names)
+
+    def _number_current_level(self) -> None:
+        assert self.tree_model is not None and self.tree_view is not None
+        path, names = self.tree_model.level(self.tree_view.currentIndex())
+        if path:
+            self._number_level(path, names)
+
+    def _number_level(self, path: str, names: list[str]) -> None:
+        """Number one tree level in its shown order, like ``_confirm_sort`` does for the top."""
+        if _same_path(path, self._base_path):
+            self.folder_model.set_names(names)
             self._confirm_sort()
+        else:
+            self._commit_order(path, names)
+
+    def _on_tree_level_numbered(
+        self, result: tuple[DirectorySnapshot, list[tuple[str, str]]]
+    ) -> None:
+        snapshot, renamed = result
+        if self.tree_model is not None:
+            self.tree_model.set_children(snapshot.path, self._display_order(snapshot), renamed)
+
+    def _on_tree_level_failed(self, path: str, exc: Exception) -> None:
+        self._show_error("rename_failed", exc)
+        self._load_tree_level(path)
 
     def _on_path_entry(self) -> None:
         path = self.path_edit.text()
@@ -517,42 +2271,86 @@ class DirectoryManagerApp(QtWidgets.QWidget):
 
     def _show_context_menu(self, pos: QtCore.QPoint) -> None:
         menu = QtWidgets.QMenu(self)
-        menu.addAction(self._t("context_new_folder"), self._create_new_folder)
+        committed = self._committed
+        menu.addAction(self._t("context_new_folder"), committed(self._create_new_folder))
+        menu.addAction(self._t("context_bulk_create"), committed(self._bulk_create_folders))
         menu.addAction(self._t("context_select_dir"), self._select_directory)
         menu.addSeparator()
-        selected_count = len(self.list_widget.selectedItems())
-        act_rename = menu.addAction(self._t("context_rename"), self._rename_selected_folder)
+        selected_count = len(self.list_view.selectionModel().selectedRows())
+        act_rename = menu.addAction(self._t("context_rename"), committed(self._rename_selected_folder))
         act_rename.setEnabled(selected_count == 1)
-        act_delete = menu.addAction(self._t("context_delete"), self._delete_selected_folders)
+        act_delete = menu.addAction(self._t("context_delete"), committed(self._delete_selected_folders))
         act_delete.setEnabled(selected_count >= 1)
         menu.addSeparator()
-        menu.addAction(self._t("context_clear_prefix"), self._clear_prefix_number)
+        menu.addAction(self._t("context_rules"), committed(self._rename_with_rules))
+        menu.addAction(self._t("context_clear_prefix"), committed(self._clear_prefix_number))
+        act_undo = menu.addAction(self._t("context_undo"), committed(self._undo_last_rename))
+        act_undo.setEnabled(bool(self._journal.can_undo(self.path_edit.text())))
         menu.addSeparator()
-        if self.sort_paused:
-            menu.addAction(self._t("context_start_sort"), self._resume_sort)
-        else:
-            menu.addAction(self._t("context_pause_sort"), self._pause_sort)
+        self._add_sort_actions(menu)
         menu.addSeparator()
+        act_sizes = menu.addAction(self._t("context_show_sizes"))
+        act_sizes.setCheckable(True)
+        act_sizes.setChecked(self.folder_delegate.show_stats)
+        act_sizes.toggled.connect(self._toggle_show_sizes)
+        act_trace = menu.addAction(self._t("context_trace"))
+        act_trace.setCheckable(True)
+        act_trace.setChecked(tracing.TRACER.enabled)
+        act_trace.toggled.connect(self._toggle_tracing)
+        self._add_tree_mode_action(menu)
         lang_menu = menu.addMenu(self._t("context_language"))
         for code, label_key in [("zh", "language_zh"), ("en", "language_en")]:
             action = lang_menu.addAction(self._t(label_key))
             action.setCheckable(True)
             action.setChecked(self.language == code)
             action.triggered.connect(partial(self._set_language, code))
-        menu.setStyleSheet(
-            """
-            QMenu { font-size:16px; }
-            QMenu::item:selected { background-color: #3794ff; color: #fff; }
-            """
+        menu.setStyleSheet(MENU_STYLE)
+        menu.exec_(self.list_view.mapToGlobal(pos))
+
+    def _show_tree_context_menu(self, pos: QtCore.QPoint) -> None:
+        assert self.tree_view is not None
+        menu = QtWidgets.QMenu(self)
+        act_number = menu.addAction(
+            self._t("context_number_level"), self._committed(self._number_current_level)
+        )
+        act_number.setEnabled(bool(self._base_path))
+        menu.addSeparator()
+        self._add_sort_actions(menu)
+        menu.addSeparator()
+        self._add_tree_mode_action(menu)
+        menu.setStyleSheet(MENU_STYLE)
+        menu.exec_(self.tree_view.mapToGlobal(pos))
+
+    def _add_sort_actions(self, menu: QtWidgets.QMenu) -> None:
+        committed = self._committed
+        if self.order_manifest:
+            menu.addAction(self._t("context_materialize"), committed(self._materialize_prefixes))
+        elif self.sort_paused:
+            menu.addAction(self._t("context_start_sort"), committed(self._resume_sort))
+        else:
+            menu.addAction(self._t("context_pause_sort"), committed(self._pause_sort))
+        action = menu.addAction(self._t("context_manifest"))
+        action.setCheckable(True)
+        action.setChecked(self.order_manifest)
+        action.setEnabled(bool(self._base_path))
+        action.toggled.connect(
+            lambda enabled: self._when_committed(partial(self._set_order_manifest, enabled))
         )
-        menu.exec_(self.list_widget.mapToGlobal(pos))
+
+    def _add_tree_mode_action(self, menu: QtWidgets.QMenu) -> None:
+        action = menu.addAction(self._t("context_tree_mode"))
+        action.setCheckable(True)
+        action.setChecked(self._tree_mode)
+        action.toggled.connect(self._toggle_tree_mode)
 
 
 def main() -> None:
     app = QtWidgets.QApplication(sys.argv)
+    STARTUP.mark("qapplication")
     window = DirectoryManagerApp()
-    window.resize(600, 420)
+    window.restore_window_size()
     window.show()
+    STARTUP.mark("shown")
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,156 @@
+"""Batch numbering from the command line, without loading Qt.
+
+    python folder_cli.py sort [--order order.txt] PATH...
+    python folder_cli.py clear-prefix PATH...
+
+``directory_manager.py`` forwards the same sub-commands here before PyQt5 is
+imported.  Several directories are processed in parallel on a process pool.
+Every batch runs under the GUI's rename journal, so crash recovery and
+"Undo Rename" cover command-line runs as well.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from folder_snapshot import DirectorySnapshot
+from rename_journal import JOURNAL_DIR, RenameJournal
+from rename_planner import (
+    DEFAULT_SCHEME,
+    NumberingScheme,
+    RenamePlan,
+    match_order,
+    plan_clear_prefix,
+    plan_sort,
+)
+from state_store import CONFIG_FILE, StateStore, default_state_path
+
+COMMANDS = ("sort", "clear-prefix")
+
+
+@dataclass
+class DirectoryResult:
+    path: str
+    renamed: list[tuple[str, str]] = field(default_factory=list)
+    error: str | None = None
+
+
+def is_command(argv: Sequence[str]) -> bool:
+    return bool(argv) and argv[0] in COMMANDS
+
+
+def _journal() -> RenameJournal:
+    return RenameJournal(os.path.join(os.path.dirname(default_state_path(CONFIG_FILE)), JOURNAL_DIR))
+
+
+def _saved_numbering() -> dict:
+    settings = StateStore(default_state_path(CONFIG_FILE)).get("numbering")
+    return dict(settings) if isinstance(settings, dict) else {}
+
+
+def process_directory(
+    command: str,
+    path: str,
+    order: list[str] | None = None,
+    dry_run: bool = False,
+    scheme: NumberingScheme = DEFAULT_SCHEME,
+) -> DirectoryResult:
+    result = DirectoryResult(path)
+    try:
+        journal = _journal()
+        if not dry_run:
+            journal.recover([path])
+        snapshot = DirectorySnapshot.scan(path)
+        if snapshot.mtime_ns is None:
+            raise FileNotFoundError(f"not a directory: {path}")
+        plan: RenamePlan
+        if command == "sort":
+            folders = match_order(snapshot.names, order, scheme) if order else snapshot.names
+            plan = plan_sort(folders, snapshot, scheme)
+        else:
+            plan = plan_clear_prefix(snapshot, scheme)
+        if plan and not dry_run:
+            journal.run(plan, kind="clear_prefix" if command == "clear-prefix" else "sort")
+        result.renamed = plan.renamed
+    except Exception as exc:
+        result.error = str(exc) or type(exc).__name__
+    return result
+
+
+def _read_order(path: str) -> list[str]:
+    with open(path, "r", encoding="utf-8-sig") as fh:
+        return [line.strip() for line in fh if line.strip()]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="directory_manager", description="Number folders in bulk.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sort = sub.add_parser("sort", help="number the folders of each PATH")
+    sort.add_argument("--order", metavar="FILE", help="folder names in the wanted order, one per line")
+    clear = sub.add_parser("clear-prefix", help="strip numeric prefixes in each PATH")
+    for command in (sort, clear):
+        command.add_argument("paths", nargs="+", metavar="PATH")
+        command.add_argument("-n", "--dry-run", action="store_true", help="only print the renames")
+        command.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+        command.add_argument("-v", "--verbose", action="store_true", help="list every rename")
+        command.add_argument("--separator", help="text between number and name (default: saved setting or _)")
+    sort.add_argument("--start", type=int, help="first number (default: saved setting or 1)")
+    sort.add_argument("--width", type=int, help="digits per number; 0 sizes it to the folder count")
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if sys.stdout is None:  # windowed (--noconsole) build
+        sys.stdout = sys.stderr = open(os.devnull, "w")
+    order = _read_order(args.order) if getattr(args, "order", None) else None
+    settings = _saved_numbering()
+    for option in ("separator", "start", "width"):
+        if getattr(args, option, None) is not None:
+            settings[option] = getattr(args, option)
+    try:
+        scheme = NumberingScheme(
+            str(settings.get("separator", "_")),
+            int(settings.get("start", 1)),
+            int(settings.get("width", 0)),
+        )
+    except (TypeError, ValueError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    paths = [os.path.abspath(p) for p in args.paths]
+    jobs = max(1, min(args.jobs, len(paths)))
+    if jobs == 1:
+        results = [process_directory(args.command, p, order, args.dry_run, scheme) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(
+                pool.map(
+                    process_directory,
+                    [args.command] * len(paths),
+                    paths,
+                    [order] * len(paths),
+                    [args.dry_run] * len(paths),
+                    [scheme] * len(paths),
+                )
+            )
+    failed = 0
+    for result in results:
+        if result.error is not None:
+            failed += 1
+            print(f"{result.path}: error: {result.error}", file=sys.stderr)
+            continue
+        verb = "would rename" if args.dry_run else "renamed"
+        print(f"{result.path}: {verb} {len(result.renamed)}")
+        if args.verbose or args.dry_run:
+            for old, new in result.renamed:
+                print(f"  {old} -> {new}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
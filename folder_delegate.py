@@ -0,0 +1,64 @@
+"""Item delegate for the folder list.
+
+Draws the folder name as usual and, when size columns are enabled, the
+folder's total size and item count right-aligned in the same row.  The name
+is elided so the two never overlap.
+"""
+
+from __future__ import annotations
+
+from typing import Callable
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from folder_model import STATS_ROLE
+
+STATS_MARGIN = 10
+STATS_GAP = 16
+
+
+class FolderItemDelegate(QtWidgets.QStyledItemDelegate):
+    def __init__(
+        self,
+        format_stats: Callable[[tuple[int, int] | None], str],
+        parent: QtCore.QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.show_stats = False
+        self._format_stats = format_stats
+
+    def _stats_text(self, index: QtCore.QModelIndex) -> str:
+        return self._format_stats(index.data(STATS_ROLE))
+
+    def initStyleOption(  # type: ignore[override]
+        self, option: QtWidgets.QStyleOptionViewItem, index: QtCore.QModelIndex
+    ) -> None:
+        super().initStyleOption(option, index)
+        if self.show_stats:
+            fm = option.fontMetrics
+            reserved = fm.horizontalAdvance(self._stats_text(index)) + STATS_MARGIN + STATS_GAP
+            option.text = fm.elidedText(
+                option.text, QtCore.Qt.ElideRight, max(0, option.rect.width() - reserved)
+            )
+
+    def paint(  # type: ignore[override]
+        self,
+        painter: QtGui.QPainter,
+        option: QtWidgets.QStyleOptionViewItem,
+        index: QtCore.QModelIndex,
+    ) -> None:
+        super().paint(painter, option, index)
+        if not self.show_stats:
+            return
+        painter.save()
+        painter.setFont(option.font)
+        if option.state & QtWidgets.QStyle.State_Selected and option.state & QtWidgets.QStyle.State_Active:
+            painter.setPen(QtGui.QColor("#e8f1ff"))
+        else:
+            painter.setPen(QtGui.QColor("#888"))
+        painter.drawText(
+            option.rect.adjusted(0, 0, -STATS_MARGIN, 0),
+            QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter,
+            self._stats_text(index),
+        )
+        painter.restore()
@@ -0,0 +1,418 @@
+"""List model holding the folder names shown in the main view.
+
+Updates are applied incrementally (renames in place, then row removals,
+moves and insertions) so selection and scroll position survive a refresh and
+an unchanged row is never rebuilt.  ``FolderFilterModel`` narrows the list
+to the filter matches and ``RenamePreviewModel`` backs the batch-rename
+preview.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterable
+
+from PyQt5 import QtCore, QtGui
+
+# Beyond this many row moves a single model reset is cheaper than signalling
+# each move to the view.
+MAX_INCREMENTAL_MOVES = 512
+# Each move looks its row up by a linear search; past this many rows searched in
+# total a reset is cheaper as well, however few the moves (e.g. in 100k folders).
+MAX_INCREMENTAL_SCAN = 1 << 20
+
+ROWS_MIME_TYPE = "application/x-directory-manager-rows"
+
+# ``(total bytes, total entries)`` of a folder, or None until it was measured.
+STATS_ROLE = QtCore.Qt.UserRole + 1
+
+
+class FolderListModel(QtCore.QAbstractListModel):
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._names: list[str] = []
+        self._stats: dict[str, tuple[int, int]] = {}
+        self._row_cache: dict[str, int] | None = None
+        for signal in (self.modelReset, self.rowsInserted, self.rowsRemoved, self.rowsMoved):
+            signal.connect(self._drop_row_cache)
+
+    def names(self) -> list[str]:
+        return list(self._names)
+
+    def name(self, row: int) -> str:
+        return self._names[row]
+
+    def rows_of(self, names: set[str]) -> list[int]:
+        """Sorted rows of the given names (names not in the model are ignored)."""
+        if len(names) * 8 >= len(self._names):
+            return [row for row, name in enumerate(self._names) if name in names]
+        if self._row_cache is None:
+            self._row_cache = {name: row for row, name in enumerate(self._names)}
+        cache = self._row_cache
+        return sorted(cache[name] for name in names if name in cache)
+
+    def _drop_row_cache(self) -> None:
+        self._row_cache = None
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else len(self._names)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):  # type: ignore[override]
+        if not index.isValid() or not 0 <= index.row() < len(self._names):
+            return None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole, QtCore.Qt.ToolTipRole):
+            return self._names[index.row()]
+        if role == STATS_ROLE:
+            return self._stats.get(self._names[index.row()])
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:  # type: ignore[override]
+        if not index.isValid():
+            return QtCore.Qt.ItemIsDropEnabled
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable | QtCore.Qt.ItemIsDragEnabled
+
+    def supportedDropActions(self) -> QtCore.Qt.DropActions:  # type: ignore[override]
+        return QtCore.Qt.MoveAction
+
+    def mimeTypes(self) -> list[str]:  # type: ignore[override]
+        return [ROWS_MIME_TYPE]
+
+    def mimeData(self, indexes: list[QtCore.QModelIndex]) -> QtCore.QMimeData:  # type: ignore[override]
+        mime = QtCore.QMimeData()
+        rows = sorted({index.row() for index in indexes if index.isValid()})
+        mime.setData(ROWS_MIME_TYPE, ",".join(map(str, rows)).encode("ascii"))
+        return mime
+
+    def dropMimeData(  # type: ignore[override]
+        self,
+        data: QtCore.QMimeData,
+        action: QtCore.Qt.DropAction,
+        row: int,
+        column: int,
+        parent: QtCore.QModelIndex,
+    ) -> bool:
+        if action != QtCore.Qt.MoveAction or not data.hasFormat(ROWS_MIME_TYPE):
+            return False
+        raw = bytes(data.data(ROWS_MIME_TYPE)).decode("ascii")
+        rows = [int(r) for r in raw.split(",") if r]
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self._names)
+        persistent = [QtCore.QPersistentModelIndex(self.index(r)) for r in rows]
+        dest = QtCore.QPersistentModelIndex(self.index(row)) if row < len(self._names) else None
+        for pindex in persistent:
+            target = dest.row() if dest is not None and dest.isValid() else len(self._names)
+            self.moveRows(QtCore.QModelIndex(), pindex.row(), 1, QtCore.QModelIndex(), target)
+            # Keep the dropped rows contiguous and in their original order.
+            next_row = pindex.row() + 1
+            dest = QtCore.QPersistentModelIndex(self.index(next_row)) if next_row < len(self._names) else None
+        return True
+
+    def moveRows(  # type: ignore[override]
+        self,
+        source_parent: QtCore.QModelIndex,
+        source_row: int,
+        count: int,
+        dest_parent: QtCore.QModelIndex,
+        dest_child: int,
+    ) -> bool:
+        if source_parent.isValid() or dest_parent.isValid() or count <= 0:
+            return False
+        if source_row <= dest_child <= source_row + count:
+            return False
+        if not self.beginMoveRows(
+            QtCore.QModelIndex(), source_row, source_row + count - 1, QtCore.QModelIndex(), dest_child
+        ):
+            return False
+        block = self._names[source_row : source_row + count]
+        del self._names[source_row : source_row + count]
+        insert_at = dest_child - count if dest_child > source_row else dest_child
+        self._names[insert_at:insert_at] = block
+        self.endMoveRows()
+        return True
+
+    def has_stats(self, name: str) -> bool:
+        return name in self._stats
+
+    def set_stats(self, stats: Iterable[tuple[str, int, int]]) -> None:
+        for name, size, items in stats:
+            self._stats[name] = (size, items)
+        if self._names:
+            # One signal for the whole batch; the view only repaints visible rows.
+            self.dataChanged.emit(self.index(0), self.index(len(self._names) - 1), [STATS_ROLE])
+
+    def clear_stats(self) -> None:
+        self._stats.clear()
+
+    def set_names(self, names: Iterable[str]) -> None:
+        self.beginResetModel()
+        self._names = list(names)
+        self.endResetModel()
+
+    def apply_names(self, names: list[str], renamed: Iterable[tuple[str, str]] = ()) -> bool:
+        """Bring the model in line with *names*; returns False if it had to reset."""
+        rows = {name: row for row, name in enumerate(self._names)}
+        for old, new in renamed:
+            row = rows.get(old)
+            if row is not None and new not in rows:
+                del rows[old]
+                self._names[row] = new
+                self._row_cache = None
+                if old in self._stats:
+                    self._stats[new] = self._stats.pop(old)
+                rows[new] = row
+                index = self.index(row)
+                self.dataChanged.emit(index, index)
+
+        wanted = set(names)
+        stale = [row for name, row in rows.items() if name not in wanted]
+        for row in stale:
+            self._stats.pop(self._names[row], None)
+        stale.sort(reverse=True)
+        k = 0
+        while k < len(stale):
+            end = start = stale[k]
+            k += 1
+            while k < len(stale) and stale[k] == start - 1:
+                start = stale[k]
+                k += 1
+            self.beginRemoveRows(QtCore.QModelIndex(), start, end)
+            del self._names[start : end + 1]
+            self.endRemoveRows()
+
+        present = set(self._names)
+        moves = scanned = 0
+        i = 0
+        while i < len(names):
+            name = names[i]
+            if i < len(self._names) and self._names[i] == name:
+                i += 1
+                continue
+            if name in present:
+                moves += 1
+                if moves > MAX_INCREMENTAL_MOVES or scanned > MAX_INCREMENTAL_SCAN:
+                    self.set_names(names)
+                    return False
+                j = self._names.index(name, i)
+                scanned += j - i
+                self.beginMoveRows(QtCore.QModelIndex(), j, j, QtCore.QModelIndex(), i)
+                self._names.insert(i, self._names.pop(j))
+                self.endMoveRows()
+                i += 1
+                continue
+            end = i + 1
+            while end < len(names) and names[end] not in present:
+                end += 1
+            self.beginInsertRows(QtCore.QModelIndex(), i, end - 1)
+            self._names[i:i] = names[i:end]
+            self.endInsertRows()
+            i = end
+        return True
+
+
+class FolderFilterModel(QtCore.QAbstractProxyModel):
+    """The rows of a ``FolderListModel`` whose names match a filter, in source order.
+
+    Matching is delegated to a callable (normally ``NameIndex.search``).  Drops
+    are translated to source positions, so reordering a filtered view moves the
+    folders within the full list.
+    """
+
+    def __init__(self, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._search: Callable[[str], set[str]] | None = None
+        self._query = ""
+        self._rows: list[int] = []
+        self._proxy_rows: dict[int, int] = {}
+
+    # -- filtering ---------------------------------------------------------
+
+    @property
+    def query(self) -> str:
+        return self._query
+
+    def setSourceModel(self, model: QtCore.QAbstractItemModel) -> None:  # type: ignore[override]
+        self.beginResetModel()
+        old = self.sourceModel()
+        if old is not None:
+            old.disconnect(self)
+        super().setSourceModel(model)
+        model.modelReset.connect(self._reset)
+        model.rowsInserted.connect(self._reset)
+        model.rowsRemoved.connect(self._reset)
+        model.rowsMoved.connect(self._relayout)
+        model.layoutChanged.connect(self._relayout)
+        model.dataChanged.connect(self._source_data_changed)
+        self._compute_rows()
+        self.endResetModel()
+
+    def set_filter(self, query: str, search: Callable[[str], set[str]] | None) -> None:
+        self.beginResetModel()
+        self._query = query
+        self._search = search
+        self._compute_rows()
+        self.endResetModel()
+
+    def _matches(self) -> set[str]:
+        source: FolderListModel = self.sourceModel()
+        if self._search is not None:
+            return self._search(self._query)
+        key = self._query.casefold()
+        return {name for name in source._names if key in name.casefold()}
+
+    def _compute_rows(self) -> None:
+        source = self.sourceModel()
+        if source is None or not self._query:
+            self._rows = []
+        else:
+            matches = self._matches()
+            self._rows = source.rows_of(matches)
+        self._proxy_rows = {src: row for row, src in enumerate(self._rows)}
+
+    def _reset(self) -> None:
+        self.beginResetModel()
+        self._compute_rows()
+        self.endResetModel()
+
+    def _relayout(self) -> None:
+        # Same names, new source positions: keep selection and current item.
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        sources = [QtCore.QPersistentModelIndex(self.mapToSource(index)) for index in persistent]
+        self._compute_rows()
+        self.changePersistentIndexList(
+            persistent, [self.mapFromSource(QtCore.QModelIndex(src)) for src in sources]
+        )
+        self.layoutChanged.emit()
+
+    def _source_data_changed(
+        self,
+        top_left: QtCore.QModelIndex,
+        bottom_right: QtCore.QModelIndex,
+        roles: Iterable[int] = (),
+    ) -> None:
+        if not roles or QtCore.Qt.DisplayRole in roles:
+            self._reset()  # a rename may change what matches
+        elif self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, 0), roles)
+
+    # -- proxy mapping -----------------------------------------------------
+
+    def name(self, row: int) -> str:
+        return self.sourceModel().name(self._rows[row])
+
+    def index(self, row: int, column: int = 0, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:  # type: ignore[override]
+        if parent.isValid() or column != 0 or not 0 <= row < len(self._rows):
+            return QtCore.QModelIndex()
+        return self.createIndex(row, 0)
+
+    def parent(self, index: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:  # type: ignore[override]
+        return QtCore.QModelIndex()
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else 1
+
+    def mapToSource(self, proxy_index: QtCore.QModelIndex) -> QtCore.QModelIndex:  # type: ignore[override]
+        if not proxy_index.isValid() or not 0 <= proxy_index.row() < len(self._rows):
+            return QtCore.QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()])
+
+    def mapFromSource(self, source_index: QtCore.QModelIndex) -> QtCore.QModelIndex:  # type: ignore[override]
+        if not source_index.isValid():
+            return QtCore.QModelIndex()
+        row = self._proxy_rows.get(source_index.row())
+        return QtCore.QModelIndex() if row is None else self.createIndex(row, 0)
+
+    # -- drag and drop -----------------------------------------------------
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:  # type: ignore[override]
+        if not index.isValid():
+            return QtCore.Qt.ItemIsDropEnabled
+        return self.sourceModel().flags(self.mapToSource(index))
+
+    def supportedDropActions(self) -> QtCore.Qt.DropActions:  # type: ignore[override]
+        return self.sourceModel().supportedDropActions()
+
+    def mimeTypes(self) -> list[str]:  # type: ignore[override]
+        return self.sourceModel().mimeTypes()
+
+    def mimeData(self, indexes: list[QtCore.QModelIndex]) -> QtCore.QMimeData:  # type: ignore[override]
+        return self.sourceModel().mimeData([self.mapToSource(index) for index in indexes])
+
+    def dropMimeData(  # type: ignore[override]
+        self,
+        data: QtCore.QMimeData,
+        action: QtCore.Qt.DropAction,
+        row: int,
+        column: int,
+        parent: QtCore.QModelIndex,
+    ) -> bool:
+        if row < 0:
+            row = parent.row() if parent.isValid() else len(self._rows)
+        if row < len(self._rows):
+            source_row = self._rows[row]
+        else:
+            # After the last visible folder, not at the end of the whole list.
+            source_row = self._rows[-1] + 1 if self._rows else self.sourceModel().rowCount()
+        return self.sourceModel().dropMimeData(data, action, source_row, 0, QtCore.QModelIndex())
+
+
+class RenamePreviewModel(QtCore.QAbstractTableModel):
+    """Current and new names side by side; new names are computed only when a row is shown."""
+
+    def __init__(self, names: list[str], parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self._names = names
+        self._rename: Callable[[str, int], str] | None = None
+        self._targets: dict[int, str] = {}
+        self._problems: dict[str, str] = {}
+        self.headers = ("", "")
+
+    def set_rename(self, rename: Callable[[str, int], str] | None) -> None:
+        """*rename(name, index)* gives the new name; index is the 1-based row."""
+        self._rename = rename
+        self._targets.clear()
+        self._problems = {}
+        if self._names:
+            self.dataChanged.emit(self.index(0, 1), self.index(len(self._names) - 1, 1))
+
+    def set_problems(self, problems: dict[str, str]) -> None:
+        """Mark rows (by current name) that will be skipped, with the reason as tooltip."""
+        self._problems = problems
+        if self._names:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._names) - 1, 1))
+
+    def target(self, row: int) -> str:
+        target = self._targets.get(row)
+        if target is None:
+            name = self._names[row]
+            try:
+                target = self._rename(name, row + 1) if self._rename is not None else name
+            except (ValueError, KeyError, IndexError) as exc:
+                target = f"<{exc}>"
+            self._targets[row] = target
+        return target
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else len(self._names)
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # type: ignore[override]
+        return 0 if parent.isValid() else 2
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):  # type: ignore[override]
+        if not index.isValid() or not 0 <= index.row() < len(self._names):
+            return None
+        name = self._names[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            return name if index.column() == 0 else self.target(index.row())
+        if role == QtCore.Qt.ToolTipRole:
+            return self._problems.get(name)
+        if role == QtCore.Qt.ForegroundRole and name in self._problems:
+            return QtGui.QBrush(QtGui.QColor(200, 40, 40))
+        return None
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role: int = QtCore.Qt.DisplayRole):  # type: ignore[override]
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.headers[section]
+        return None
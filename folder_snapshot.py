@@ -0,0 +1,187 @@
+"""One-pass ``os.scandir`` listing of a directory's sub-folders.
+
+A ``DirectorySnapshot`` is the single source of truth for every listing code
+path: it is taken once per refresh cycle and shared by the list view, the
+sorter and the prefix cleaner.  Two snapshots can be diffed into added,
+removed and renamed folders.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Hashable, Iterable, Iterator
+
+import tracing
+
+# On Windows ``DirEntry.stat()`` is filled from the FindNextFile data and costs
+# no extra syscall, while ``DirEntry.inode()`` would.  On POSIX the inode comes
+# straight from ``d_ino``.
+_STAT_IS_FREE = sys.platform.startswith("win")
+
+# Temporary and staging folders created by the app itself; they occupy their
+# names but are never listed.
+INTERNAL_PREFIX = ".dm_"
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+@lru_cache(maxsize=262144)
+def natural_key(name: str) -> tuple:
+    """Sort key that orders digit runs by value, so ``9_x`` sorts before ``10_x``.
+
+    Text and numbers alternate at fixed positions, so keys always compare;
+    the name itself breaks ties (``01_x`` vs ``1_x``) to keep the order total.
+    Keys are cached across snapshots, so a refresh does not re-parse names.
+    """
+    parts = _DIGITS.split(name)
+    return (
+        tuple(int(p) if i % 2 else p.casefold() for i, p in enumerate(parts)),
+        name,
+    )
+
+
+def _entry_id(entry: os.DirEntry) -> Hashable | None:
+    try:
+        if _STAT_IS_FREE:
+            # Creation time; the mtime of a folder changes with its contents.
+            return entry.stat(follow_symlinks=False).st_ctime_ns
+        return entry.inode()
+    except OSError:
+        return None
+
+
+def file_identity(path: str) -> int | None:
+    """An identity of the entry at *path* that survives renames and changes inside it.
+
+    The inode on POSIX, the NTFS file index on Windows (``os.stat`` fills
+    ``st_ino`` from it); None where the file system has neither.  Costs one
+    ``stat``, so it is meant for the few names of a batch, not whole listings.
+    Raises ``OSError`` if nothing is at *path*.
+    """
+    return os.stat(path, follow_symlinks=False).st_ino or None
+
+
+@dataclass(frozen=True)
+class FolderEntry:
+    name: str
+    file_id: Hashable | None = None
+
+
+@dataclass
+class SnapshotDiff:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    renamed: list[tuple[str, str]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.renamed)
+
+
+class DirectorySnapshot:
+    def __init__(
+        self,
+        path: str,
+        entries: Iterable[FolderEntry] = (),
+        other_names: Iterable[str] = (),
+        mtime_ns: int | None = None,
+    ) -> None:
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self._entries: dict[str, FolderEntry] = {e.name: e for e in entries}
+        self._other_names = frozenset(other_names)
+        self._names: list[str] | None = None
+        self._occupied: frozenset[str] | None = None
+
+    @classmethod
+    def scan(cls, path: str) -> "DirectorySnapshot":
+        entries: list[FolderEntry] = []
+        other: list[str] = []
+        try:
+            mtime_ns: int | None = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        try:
+            with tracing.span("scandir", "fs"), os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if is_dir and not entry.name.startswith(INTERNAL_PREFIX):
+                        entries.append(FolderEntry(entry.name, _entry_id(entry)))
+                    else:
+                        other.append(entry.name)
+        except OSError:
+            return cls(path, mtime_ns=mtime_ns)
+        return cls(path, entries, other, mtime_ns)
+
+    @property
+    def names(self) -> list[str]:
+        if self._names is None:
+            self._names = sorted(self._entries, key=natural_key)
+        return self._names
+
+    def entry(self, name: str) -> FolderEntry | None:
+        return self._entries.get(name)
+
+    def occupied_keys(self) -> frozenset[str]:
+        """``os.path.normcase``'d names of every entry, folder or not."""
+        if self._occupied is None:
+            self._occupied = frozenset(
+                os.path.normcase(n) for n in (*self._entries, *self._other_names)
+            )
+        return self._occupied
+
+    def occupied(self, name: str) -> bool:
+        return os.path.normcase(name) in self.occupied_keys()
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def diff(self, newer: "DirectorySnapshot") -> SnapshotDiff:
+        old_names = self._entries.keys()
+        new_names = newer._entries.keys()
+        removed = [n for n in old_names if n not in new_names]
+        added = [n for n in new_names if n not in old_names]
+        result = SnapshotDiff()
+        if removed and added:
+            by_id: dict[Hashable, str] = {}
+            for name in removed:
+                file_id = self._entries[name].file_id
+                if file_id is not None:
+                    by_id.setdefault(file_id, name)
+            for name in added:
+                file_id = newer._entries[name].file_id
+                old = by_id.pop(file_id, None) if file_id is not None else None
+                if old is not None:
+                    result.renamed.append((old, name))
+            moved_from = {old for old, _ in result.renamed}
+            moved_to = {new for _, new in result.renamed}
+            removed = [n for n in removed if n not in moved_from]
+            added = [n for n in added if n not in moved_to]
+        result.added = sorted(added)
+        result.removed = sorted(removed)
+        return result
+
+    def apply(self, diff: SnapshotDiff) -> "DirectorySnapshot":
+        """Return a new snapshot with *diff* applied, without touching the disk."""
+        entries = dict(self._entries)
+        moved = {old: entries.pop(old, None) for old, _ in diff.renamed}
+        for old, new in diff.renamed:
+            prev = moved[old]
+            entries[new] = FolderEntry(new, prev.file_id if prev else None)
+        for name in diff.removed:
+            entries.pop(name, None)
+        for name in diff.added:
+            entries.setdefault(name, FolderEntry(name))
+        return DirectorySnapshot(self.path, entries.values(), self._other_names, None)
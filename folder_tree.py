@@ -0,0 +1,366 @@
+"""Lazily loaded folder tree for numbering nested levels.
+
+``FolderTreeModel`` only knows the folders of a level once that level has
+been expanded: ``fetchMore`` emits ``fetchRequested`` with the directory to
+list and the caller answers with ``set_children`` when its background scan
+finishes, so nothing below the root is ever walked eagerly.  Until a level is
+loaded its folder shows an expander.  Rows can be dragged within their own
+level (never into another one) and every reorder is reported through
+``levelReordered``.  When more than ``max_nodes`` folders are loaded, the
+children of the least recently collapsed branches are dropped again and
+re-listed the next time the branch is expanded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from typing import Iterable
+
+from PyQt5 import QtCore
+
+TREE_MIME_TYPE = "application/x-directory-manager-tree-rows"
+
+# Loaded folders kept before collapsed branches are released (roughly 150
+# bytes each, so about 15 MB).
+MAX_LOADED_NODES = 100_000
+# Beyond this many separate row ranges disappearing at once, the level is
+# rebuilt in one removal instead of signalling each range.
+MAX_INCREMENTAL_REMOVALS = 64
+
+
+class _Node:
+    __slots__ = ("name", "parent", "row", "children", "loading")
+
+    def __init__(self, name: str, parent: "_Node | None", row: int = 0) -> None:
+        self.name = name
+        self.parent = parent
+        self.row = row
+        # None until the level has been listed.
+        self.children: list[_Node] | None = None
+        self.loading = False
+
+    @property
+    def path(self) -> str:
+        if self.parent is None:
+            return self.name
+        return os.path.join(self.parent.path, self.name)
+
+
+def _runs(rows: list[int]) -> list[tuple[int, int]]:
+    """Sorted rows grouped into ``(first, last)`` ranges."""
+    runs: list[tuple[int, int]] = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1] = (runs[-1][0], row)
+        else:
+            runs.append((row, row))
+    return runs
+
+
+class FolderTreeModel(QtCore.QAbstractItemModel):
+    fetchRequested = QtCore.pyqtSignal(str)
+    levelReordered = QtCore.pyqtSignal(str, list)
+
+    def __init__(self, parent: QtCore.QObject | None = None, max_nodes: int = MAX_LOADED_NODES) -> None:
+        super().__init__(parent)
+        self.max_nodes = max_nodes
+        self._root = _Node("", None)
+        self._root.children = []
+        self._loaded = 0
+        # Loaded branches the view has collapsed, least recently collapsed first.
+        self._collapsed: OrderedDict[int, _Node] = OrderedDict()
+
+    @property
+    def root_path(self) -> str:
+        return self._root.name
+
+    @property
+    def loaded_count(self) -> int:
+        return self._loaded
+
+    def set_root(self, path: str, names: Iterable[str], renamed: Iterable[tuple[str, str]] = ()) -> None:
+        """Show *names* as the top level of *path*; a new root drops every loaded level."""
+        if path and path == self._root.name:
+            self.set_children(path, names, renamed)
+            return
+        self.beginResetModel()
+        self._root = _Node(path, None)
+        self._root.children = [_Node(name, self._root, row) for row, name in enumerate(names)]
+        self._loaded = len(self._root.children)
+        self._collapsed.clear()
+        self.endResetModel()
+
+    def set_children(
+        self, path: str, names: Iterable[str], renamed: Iterable[tuple[str, str]] = ()
+    ) -> None:
+        """Listing of *path* in display order; *renamed* pairs keep their subtrees."""
+        node = self._find(path)
+        if node is None:
+            return
+        node.loading = False
+        names = list(names)
+        if node.children is None:
+            node.children = []
+            if names:
+                self.beginInsertRows(self._index(node), 0, len(names) - 1)
+                node.children = [_Node(name, node, row) for row, name in enumerate(names)]
+                self._loaded += len(names)
+                self.endInsertRows()
+            else:
+                # The expander has to go; views only re-ask hasChildren on relayout.
+                self.layoutAboutToBeChanged.emit()
+                self.layoutChanged.emit()
+        else:
+            self._update_level(node, names, dict(renamed))
+        self._trim()
+
+    def path(self, index: QtCore.QModelIndex) -> str:
+        return self._node(index).path
+
+    def level(self, index: QtCore.QModelIndex) -> tuple[str, list[str]]:
+        """Directory and folder order of the level *index* belongs to (the top level if invalid)."""
+        node = self._node(index).parent if index.isValid() else self._root
+        assert node is not None
+        return node.path, [child.name for child in node.children or ()]
+
+    def is_loaded(self, index: QtCore.QModelIndex) -> bool:
+        return self._node(index).children is not None
+
+    def mark_expanded(self, index: QtCore.QModelIndex) -> None:
+        self._collapsed.pop(id(self._node(index)), None)
+
+    def mark_collapsed(self, index: QtCore.QModelIndex) -> None:
+        node = self._node(index)
+        if node.children:
+            self._collapsed[id(node)] = node
+            self._collapsed.move_to_end(id(node))
+            self._trim()
+
+    def _trim(self) -> None:
+        while self._loaded > self.max_nodes and self._collapsed:
+            _, node = self._collapsed.popitem(last=False)
+            self._release(node)
+
+    def _release(self, node: _Node) -> None:
+        children = node.children
+        if not children:
+            return
+        self.beginRemoveRows(self._index(node), 0, len(children) - 1)
+        for child in children:
+            self._forget(child)
+        node.children = None
+        self.endRemoveRows()
+
+    def _forget(self, node: _Node) -> None:
+        self._loaded -= 1
+        self._collapsed.pop(id(node), None)
+        for child in node.children or ():
+            self._forget(child)
+
+    def _update_level(self, node: _Node, names: list[str], renamed: dict[str, str]) -> None:
+        parent = self._index(node)
+        children = node.children
+        assert children is not None
+        if renamed:
+            changed = [child.row for child in children if child.name in renamed]
+            for row in changed:
+                children[row].name = renamed[children[row].name]
+            if changed:
+                self.dataChanged.emit(self.index(changed[0], 0, parent), self.index(changed[-1], 0, parent))
+        wanted = set(names)
+        gone = [child.row for child in children if child.name not in wanted]
+        runs = _runs(gone)
+        if len(runs) > MAX_INCREMENTAL_REMOVALS:
+            runs = [(0, len(children) - 1)]
+        for first, last in reversed(runs):
+            self.beginRemoveRows(parent, first, last)
+            for child in children[first : last + 1]:
+                self._forget(child)
+            del children[first : last + 1]
+            for row in range(first, len(children)):
+                children[row].row = row
+            self.endRemoveRows()
+        present = {child.name for child in children}
+        fresh = [name for name in names if name not in present]
+        if fresh:
+            start = len(children)
+            self.beginInsertRows(parent, start, start + len(fresh) - 1)
+            children.extend(_Node(name, node, start + i) for i, name in enumerate(fresh))
+            self._loaded += len(fresh)
+            self.endInsertRows()
+        self._reorder(node, names)
+
+    def _reorder(self, node: _Node, names: list[str]) -> None:
+        children = node.children
+        assert children is not None
+        by_name = {child.name: child for child in children}
+        ordered = [by_name[name] for name in names if name in by_name]
+        if len(ordered) != len(children) or all(a is b for a, b in zip(ordered, children)):
+            return
+        parents = [QtCore.QPersistentModelIndex(self._index(node))]
+        hint = QtCore.QAbstractItemModel.VerticalSortHint
+        self.layoutAboutToBeChanged.emit(parents, hint)
+        level = {id(child) for child in children}
+        old = [i for i in self.persistentIndexList() if id(i.internalPointer()) in level]
+        node.children = ordered
+        for row, child in enumerate(ordered):
+            child.row = row
+        self.changePersistentIndexList(
+            old, [self.createIndex(i.internalPointer().row, i.column(), i.internalPointer()) for i in old]
+        )
+        self.layoutChanged.emit(parents, hint)
+
+    def _find(self, path: str) -> _Node | None:
+        root = self._root
+        if not root.name:
+            return None
+        try:
+            rel = os.path.relpath(path, root.name)
+        except ValueError:  # another drive
+            return None
+        if rel == os.curdir:
+            return root
+        if rel.startswith(os.pardir):
+            return None
+        node = root
+        for part in rel.split(os.sep):
+            found = next((child for child in node.children or () if child.name == part), None)
+            if found is None:
+                return None
+            node = found
+        return node
+
+    def _node(self, index: QtCore.QModelIndex) -> _Node:
+        return index.internalPointer() if index.isValid() else self._root
+
+    def _index(self, node: _Node) -> QtCore.QModelIndex:
+        if node.parent is None:
+            return QtCore.QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def index(self, row: int, column: int = 0, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:  # type: ignore[override]
+        if not self.hasIndex(row, column, parent):
+            return QtCore.QModelIndex()
+        children = self._node(parent).children
+        assert children is not None
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index: QtCore.QModelIndex = QtCore.QModelIndex()) -> QtCore.QModelIndex:  # type: ignore[override]
+        if not index.isValid():
+            return QtCore.QModelIndex()
+        parent = index.internalPointer().parent
+        return QtCore.QModelIndex() if parent is None else self._index(parent)
+
+    def rowCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # type: ignore[override]
+        if parent.column() > 0:
+            return 0
+        return len(self._node(parent).children or ())
+
+    def columnCount(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> int:  # type: ignore[override]
+        return 1
+
+    def hasChildren(self, parent: QtCore.QModelIndex = QtCore.QModelIndex()) -> bool:  # type: ignore[override]
+        children = self._node(parent).children
+        return children is None or bool(children)
+
+    def canFetchMore(self, parent: QtCore.QModelIndex) -> bool:  # type: ignore[override]
+        node = self._node(parent)
+        return node.children is None and not node.loading
+
+    def fetchMore(self, parent: QtCore.QModelIndex) -> None:  # type: ignore[override]
+        node = self._node(parent)
+        if node.children is None and not node.loading:
+            node.loading = True
+            self.fetchRequested.emit(node.path)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole):  # type: ignore[override]
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            return node.name
+        if role == QtCore.Qt.ToolTipRole:
+            return node.path
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:  # type: ignore[override]
+        if not index.isValid():
+            return QtCore.Qt.ItemIsDropEnabled
+        return (
+            QtCore.Qt.ItemIsEnabled
+            | QtCore.Qt.ItemIsSelectable
+            | QtCore.Qt.ItemIsDragEnabled
+            | QtCore.Qt.ItemIsDropEnabled
+        )
+
+    def supportedDropActions(self) -> QtCore.Qt.DropActions:  # type: ignore[override]
+        return QtCore.Qt.MoveAction
+
+    def mimeTypes(self) -> list[str]:  # type: ignore[override]
+        return [TREE_MIME_TYPE]
+
+    def mimeData(self, indexes: list[QtCore.QModelIndex]) -> QtCore.QMimeData:  # type: ignore[override]
+        """Rows of the first index's level; selected rows of other levels are not dragged."""
+        mime = QtCore.QMimeData()
+        indexes = [index for index in indexes if index.isValid()]
+        if indexes:
+            level = indexes[0].parent()
+            rows = sorted({index.row() for index in indexes if index.parent() == level})
+            payload = {"path": self._node(level).path, "rows": rows}
+            mime.setData(TREE_MIME_TYPE, json.dumps(payload).encode("utf-8"))
+        return mime
+
+    def _drop_target(
+        self, data: QtCore.QMimeData, row: int, parent: QtCore.QModelIndex
+    ) -> tuple[_Node, list[int], int] | None:
+        if not data.hasFormat(TREE_MIME_TYPE):
+            return None
+        try:
+            payload = json.loads(bytes(data.data(TREE_MIME_TYPE)).decode("utf-8"))
+            path, rows = payload["path"], [int(r) for r in payload["rows"]]
+        except (ValueError, KeyError, TypeError):
+            return None
+        node = self._node(parent)
+        if row < 0:
+            # Dropping onto a folder would move it into another level.
+            if parent.isValid():
+                return None
+            row = len(node.children or ())
+        if node.children is None or self._find(path) is not node:
+            return None
+        return node, [r for r in rows if 0 <= r < len(node.children)], row
+
+    def canDropMimeData(  # type: ignore[override]
+        self,
+        data: QtCore.QMimeData,
+        action: QtCore.Qt.DropAction,
+        row: int,
+        column: int,
+        parent: QtCore.QModelIndex,
+    ) -> bool:
+        return action == QtCore.Qt.MoveAction and self._drop_target(data, row, parent) is not None
+
+    def dropMimeData(  # type: ignore[override]
+        self,
+        data: QtCore.QMimeData,
+        action: QtCore.Qt.DropAction,
+        row: int,
+        column: int,
+        parent: QtCore.QModelIndex,
+    ) -> bool:
+        target = self._drop_target(data, row, parent) if action == QtCore.Qt.MoveAction else None
+        if target is None:
+            return False
+        node, rows, row = target
+        names = [child.name for child in node.children or ()]
+        moving = set(rows)
+        block = [names[r] for r in rows]
+        rest = [name for r, name in enumerate(names) if r not in moving]
+        insert_at = row - sum(1 for r in rows if r < row)
+        order = rest[:insert_at] + block + rest[insert_at:]
+        if order != names:
+            self._reorder(node, order)
+            self.levelReordered.emit(node.path, order)
+        return True
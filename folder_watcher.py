@@ -0,0 +1,251 @@
+"""Change detection for the managed directory.
+
+``FolderWatcher`` watches a set of directories (the current one plus the
+cached recent ones).  It prefers ``QFileSystemWatcher`` and falls back to
+adaptive mtime polling when native notifications are unavailable (e.g.
+network mounts).  Bursts of events are coalesced into a single
+``directoryChanged`` emission per directory, and events for a directory the
+app is changing itself can be held back until it is done.  Deciding how to
+watch a path and the polling ``stat`` calls run on an ``IoExecutor``, since
+network shares are exactly where they stall.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+
+from PyQt5 import QtCore
+
+from io_executor import IoExecutor, TaskContext
+
+NETWORK_FS_TYPES = {"nfs", "nfs4", "cifs", "smbfs", "smb3", "afs", "9p", "fuse.sshfs", "davfs", "ncpfs"}
+
+
+def is_network_path(path: str) -> bool:
+    norm = path.replace("\\", "/")
+    if norm.startswith("//"):
+        return True
+    if sys.platform.startswith("win"):
+        try:
+            import ctypes
+
+            drive = os.path.splitdrive(os.path.abspath(path))[0]
+            if drive:
+                return ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == 4  # DRIVE_REMOTE
+        except Exception:
+            return False
+        return False
+    try:
+        real = os.path.realpath(path)
+        best, fs_type = "", ""
+        with open("/proc/mounts", "r", encoding="utf-8") as fh:
+            for line in fh:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount_point = parts[1].replace("\\040", " ")
+                if (real == mount_point or real.startswith(mount_point.rstrip("/") + "/")) and len(
+                    mount_point
+                ) > len(best):
+                    best, fs_type = mount_point, parts[2]
+        return fs_type in NETWORK_FS_TYPES
+    except OSError:
+        return False
+
+
+class _Poller(QtCore.QObject):
+    """Adaptive mtime polling for one directory: 1s after a change, backing off to 8s.
+
+    The next poll is only scheduled once the previous ``stat`` returned, so a
+    stalled share never piles up requests.
+    """
+
+    changed = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self, path: str, min_ms: int, max_ms: int, io: IoExecutor, parent: QtCore.QObject
+    ) -> None:
+        super().__init__(parent)
+        self.path = path
+        self._min_ms = min_ms
+        self._max_ms = max_ms
+        self._interval = min_ms
+        self._io = io
+        self._primed = False
+        self._mtime_ns: int | None = None
+        self._stopped = False
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._poll)
+        self._poll()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._timer.stop()
+        self._io.cancel(f"poll:{self.path}")
+
+    def _poll(self) -> None:
+        self._io.submit(_mtime_job, self.path, key=f"poll:{self.path}", on_result=self._on_mtime)
+
+    def _on_mtime(self, mtime: int | None) -> None:
+        if self._stopped:
+            return
+        if not self._primed:
+            self._primed = True
+            self._mtime_ns = mtime
+        elif mtime != self._mtime_ns:
+            self._mtime_ns = mtime
+            self._interval = self._min_ms
+            self.changed.emit(self.path)
+        else:
+            self._interval = min(self._interval * 2, self._max_ms)
+        self._timer.start(self._interval)
+
+
+def _mtime_job(ctx: TaskContext, path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _classify_job(ctx: TaskContext, path: str) -> tuple[bool, bool]:
+    """Whether *path* is a directory and whether it lives on a network mount."""
+    return os.path.isdir(path), is_network_path(path)
+
+
+class FolderWatcher(QtCore.QObject):
+    """One shared watcher for every directory the app keeps fresh.
+
+    Native notifications are used where possible; directories on network
+    mounts (or that the native watcher refuses) are polled.  Events are
+    debounced per directory.
+    """
+
+    directoryChanged = QtCore.pyqtSignal(str)
+
+    def __init__(
+        self,
+        parent: QtCore.QObject | None = None,
+        debounce_ms: int = 250,
+        min_poll_ms: int = 1000,
+        max_poll_ms: int = 8000,
+    ) -> None:
+        super().__init__(parent)
+        # Its own small pool: a stalled share must not hold up listings or
+        # show up as app activity.
+        self._io = IoExecutor(self, max_threads=2)
+        self._paths: set[str] = set()
+        self._pollers: dict[str, _Poller] = {}
+        self._pending: set[str] = set()
+        self._suppressed: dict[str, int] = {}
+        self._held: set[str] = set()
+        self._min_poll_ms = min_poll_ms
+        self._max_poll_ms = max_poll_ms
+
+        self._fs_watcher = QtCore.QFileSystemWatcher(self)
+        self._fs_watcher.directoryChanged.connect(self._on_native_event)
+
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self._emit_changed)
+
+    def paths(self) -> list[str]:
+        return sorted(self._paths)
+
+    def polling(self, path: str) -> bool:
+        return os.path.normpath(path) in self._pollers
+
+    def watch(self, path: str) -> None:
+        """Watch *path* only."""
+        self.set_paths([path] if path else [])
+
+    def set_paths(self, paths: list[str]) -> None:
+        wanted = {os.path.normpath(p) for p in paths if p}
+        for path in self._paths - wanted:
+            self._remove(path)
+        for path in wanted - self._paths:
+            self._add(path)
+
+    def stop(self) -> None:
+        self.set_paths([])
+        self._debounce.stop()
+        self._pending.clear()
+
+    def _add(self, path: str) -> None:
+        self._paths.add(path)
+        self._io.submit(
+            _classify_job,
+            path,
+            key=f"classify:{path}",
+            on_result=lambda result: self._on_classified(path, *result),
+        )
+
+    def _on_classified(self, path: str, is_dir: bool, network: bool) -> None:
+        if path not in self._paths:
+            return
+        if not is_dir:
+            self._paths.discard(path)
+            return
+        if network or not self._fs_watcher.addPath(path):
+            self._start_polling(path)
+
+    def _remove(self, path: str) -> None:
+        self._paths.discard(path)
+        self._io.cancel(f"classify:{path}")
+        self._pending.discard(path)
+        self._held.discard(path)
+        if path in self._fs_watcher.directories():
+            self._fs_watcher.removePath(path)
+        poller = self._pollers.pop(path, None)
+        if poller is not None:
+            poller.stop()
+            poller.deleteLater()
+
+    def _start_polling(self, path: str) -> None:
+        if path in self._pollers:
+            return
+        poller = _Poller(path, self._min_poll_ms, self._max_poll_ms, self._io, self)
+        poller.changed.connect(self._queue)
+        self._pollers[path] = poller
+
+    def _on_native_event(self, path: str) -> None:
+        path = os.path.normpath(path)
+        if path not in self._paths:
+            return
+        if path not in self._fs_watcher.directories():
+            # The directory itself was removed or replaced; keep an eye on it by polling.
+            self._start_polling(path)
+        self._queue(path)
+
+    def suppress(self, path: str) -> None:
+        """Hold back events for *path* (e.g. while the app renames inside it) until ``resume``."""
+        path = os.path.normpath(path)
+        self._suppressed[path] = self._suppressed.get(path, 0) + 1
+
+    def resume(self, path: str) -> None:
+        """End one ``suppress``; events held meanwhile are reported once."""
+        path = os.path.normpath(path)
+        count = self._suppressed.get(path, 0) - 1
+        if count > 0:
+            self._suppressed[path] = count
+            return
+        self._suppressed.pop(path, None)
+        if path in self._held:
+            self._held.discard(path)
+            self._queue(path)
+
+    def _queue(self, path: str) -> None:
+        if path in self._suppressed:
+            self._held.add(path)
+            return
+        self._pending.add(path)
+        self._debounce.start()
+
+    def _emit_changed(self) -> None:
+        pending, self._pending = self._pending, set()
+        for path in sorted(pending):
+            if path in self._paths:
+                self.directoryChanged.emit(path)
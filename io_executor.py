@@ -0,0 +1,171 @@
+"""Run filesystem work off the GUI thread.
+
+Jobs are plain callables executed on a ``QThreadPool``.  Each job receives a
+``TaskContext`` as its first argument for cooperative cancellation and progress
+reporting; results, errors and progress come back to the GUI thread through
+the ``TaskHandle`` signals.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable
+
+from PyQt5 import QtCore
+
+import tracing
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class TaskContext:
+    def __init__(self, handle: "TaskHandle") -> None:
+        self._handle = handle
+
+    @property
+    def cancelled(self) -> bool:
+        return self._handle.is_cancelled()
+
+    def check(self) -> None:
+        if self._handle.is_cancelled():
+            raise TaskCancelled()
+
+    def progress(self, done: int, total: int = 0) -> None:
+        self._handle.progress.emit(done, total)
+
+    def status(self, text: str) -> None:
+        self._handle.status.emit(text)
+
+    def partial(self, value: Any) -> None:
+        """Deliver an intermediate result to the ``on_partial`` callback."""
+        self._handle.partial.emit(value)
+
+
+class TaskHandle(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(object)
+    progress = QtCore.pyqtSignal(int, int)
+    status = QtCore.pyqtSignal(str)
+    partial = QtCore.pyqtSignal(object)
+    done = QtCore.pyqtSignal()
+
+    def __init__(self, key: str | None, serial: bool, parent: QtCore.QObject | None = None) -> None:
+        super().__init__(parent)
+        self.key = key
+        self.serial = serial
+        self._cancel = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+
+class _Runnable(QtCore.QRunnable):
+    def __init__(self, handle: TaskHandle, fn: Callable[..., Any], args: tuple[Any, ...]) -> None:
+        super().__init__()
+        self.setAutoDelete(True)
+        self._handle = handle
+        self._fn = fn
+        self._args = args
+
+    def run(self) -> None:
+        handle = self._handle
+        try:
+            if handle.is_cancelled():
+                return
+            with tracing.span(self._fn.__name__.strip("_"), "io", key=handle.key):
+                result = self._fn(TaskContext(handle), *self._args)
+            if not handle.is_cancelled():
+                handle.finished.emit(result)
+        except TaskCancelled:
+            pass
+        except Exception as exc:
+            handle.failed.emit(exc)
+        finally:
+            handle.done.emit()
+
+
+class IoExecutor(QtCore.QObject):
+    """Thread pool for disk work.
+
+    ``serial=True`` jobs (mutations) run one at a time in submission order; the
+    others (listings) run concurrently.  Submitting a job with a ``key`` cancels
+    any still-pending job with the same key, so only the latest result is
+    delivered.
+    """
+
+    busyChanged = QtCore.pyqtSignal(bool)
+    progress = QtCore.pyqtSignal(int, int)
+    status = QtCore.pyqtSignal(str)
+
+    def __init__(self, parent: QtCore.QObject | None = None, max_threads: int = 4) -> None:
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(max_threads)
+        self._serial_pool = QtCore.QThreadPool(self)
+        self._serial_pool.setMaxThreadCount(1)
+        self._active: set[TaskHandle] = set()
+        self._keyed: dict[str, TaskHandle] = {}
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._active)
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        key: str | None = None,
+        serial: bool = False,
+        on_result: Callable[[Any], None] | None = None,
+        on_error: Callable[[Exception], None] | None = None,
+        on_partial: Callable[[Any], None] | None = None,
+    ) -> TaskHandle:
+        if key is not None:
+            previous = self._keyed.get(key)
+            if previous is not None:
+                previous.cancel()
+        handle = TaskHandle(key, serial, self)
+        if on_result is not None:
+            handle.finished.connect(on_result)
+        if on_error is not None:
+            handle.failed.connect(on_error)
+        if on_partial is not None:
+            handle.partial.connect(on_partial)
+        handle.progress.connect(self.progress)
+        handle.status.connect(self.status)
+        handle.done.connect(lambda: self._on_done(handle))
+        if key is not None:
+            self._keyed[key] = handle
+        was_busy = self.busy
+        self._active.add(handle)
+        pool = self._serial_pool if serial else self._pool
+        pool.start(_Runnable(handle, fn, args))
+        if not was_busy:
+            self.busyChanged.emit(True)
+        return handle
+
+    def cancel(self, key: str) -> None:
+        handle = self._keyed.get(key)
+        if handle is not None:
+            handle.cancel()
+
+    def shutdown(self, wait_ms: int = 5000) -> None:
+        """Cancel pending listings and wait for in-flight mutations to finish."""
+        for handle in list(self._active):
+            if not handle.serial:
+                handle.cancel()
+        self._serial_pool.waitForDone(wait_ms)
+        self._pool.waitForDone(wait_ms)
+
+    def _on_done(self, handle: TaskHandle) -> None:
+        self._active.discard(handle)
+        if handle.key is not None and self._keyed.get(handle.key) is handle:
+            del self._keyed[handle.key]
+        handle.deleteLater()
+        if not self._active:
+            self.busyChanged.emit(False)
@@ -0,0 +1,118 @@
+"""In-memory search index over folder names for the filter box.
+
+Queries of three or more characters are substring matches answered from a
+trigram index (intersect the posting sets, then verify); shorter queries are
+prefix matches on the name, or on the name without its number prefix, found
+by bisecting sorted key lists.  Names are added and removed one at a time, so
+the index follows directory changes without a rebuild.
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from typing import Iterable
+
+_NUMBER_PREFIX = re.compile(r"^\d+[\W_]*")
+
+
+def _trigrams(key: str) -> set[str]:
+    return {key[i : i + 3] for i in range(len(key) - 2)}
+
+
+class NameIndex:
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._names: set[str] = set()
+        self._postings: dict[str, set[str]] = {}
+        self._full: list[tuple[str, str]] = []
+        self._bare: list[tuple[str, str]] = []
+        # Type-ahead usually extends the previous query, so its result is refined.
+        self._last: tuple[str, set[str]] | None = None
+        names = list(names)
+        for name in names:
+            self._add_postings(name)
+        self._names.update(names)
+        self._full = sorted((name.casefold(), name) for name in names)
+        self._bare = sorted((self._bare_key(name), name) for name in names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._names
+
+    @staticmethod
+    def _bare_key(name: str) -> str:
+        return _NUMBER_PREFIX.sub("", name, count=1).casefold()
+
+    def _add_postings(self, name: str) -> None:
+        postings = self._postings
+        for gram in _trigrams(name.casefold()):
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = bucket = set()
+            bucket.add(name)
+
+    def add(self, name: str) -> None:
+        if name in self._names:
+            return
+        self._names.add(name)
+        self._add_postings(name)
+        bisect.insort(self._full, (name.casefold(), name))
+        bisect.insort(self._bare, (self._bare_key(name), name))
+        self._last = None
+
+    def remove(self, name: str) -> None:
+        if name not in self._names:
+            return
+        self._names.discard(name)
+        for gram in _trigrams(name.casefold()):
+            bucket = self._postings.get(gram)
+            if bucket is not None:
+                bucket.discard(name)
+                if not bucket:
+                    del self._postings[gram]
+        for keys, key in ((self._full, name.casefold()), (self._bare, self._bare_key(name))):
+            i = bisect.bisect_left(keys, (key, name))
+            if i < len(keys) and keys[i] == (key, name):
+                del keys[i]
+        self._last = None
+
+    def update(self, names: Iterable[str]) -> None:
+        """Bring the index in line with *names* by adding and removing the difference."""
+        wanted = set(names)
+        for name in self._names - wanted:
+            self.remove(name)
+        for name in wanted - self._names:
+            self.add(name)
+
+    @staticmethod
+    def _prefix(keys: list[tuple[str, str]], key: str) -> list[tuple[str, str]]:
+        # Every key starting with *key* sorts between *key* and *key* + U+10FFFF.
+        lo = bisect.bisect_left(keys, (key, ""))
+        hi = bisect.bisect_left(keys, (key + "\U0010ffff", ""), lo)
+        return keys[lo:hi]
+
+    def search(self, query: str) -> set[str]:
+        """Names matching *query* (case-insensitive); the result must not be modified."""
+        key = query.casefold()
+        if not key:
+            return self._names
+        if len(key) < 3:
+            return {name for _, name in self._prefix(self._full, key)} | {
+                name for _, name in self._prefix(self._bare, key)
+            }
+        last = self._last
+        if last is not None and key.startswith(last[0]) and len(last[0]) >= 3:
+            result = {name for name in last[1] if key in name.casefold()}
+        else:
+            grams = sorted(_trigrams(key), key=lambda g: len(self._postings.get(g, ())))
+            result = set(self._postings.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not result:
+                    break
+                result &= self._postings.get(gram, set())
+            if len(key) > 3:
+                result = {name for name in result if key in name.casefold()}
+        self._last = (key, result)
+        return result
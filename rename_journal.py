@@ -0,0 +1,446 @@
+"""Write-ahead journal for batch renames.
+
+Every batch is written (and fsynced) to its own JSON record before the first
+rename runs, and marked complete afterwards.  A batch that fails part-way is
+rolled back on the spot; one interrupted by a crash is rolled forward or back
+by ``recover()`` on the next start.  Completed batches double as the undo
+history: undo replays the inverse steps straight from the record.
+"""
+
+from __future__ import annotations
+
+import errno
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Hashable, Iterable
+
+import tracing
+from folder_snapshot import file_identity
+from rename_planner import RenamePlan, RenameStep, net_renames
+
+JOURNAL_DIR = "rename_journal"
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_ROLLED_BACK = "rolled_back"
+STATUS_UNDONE = "undone"
+STATUS_FAILED = "failed"
+
+
+class UndoConflict(Exception):
+    """A folder named in the batch was renamed or replaced since; undoing would hit the wrong one."""
+
+
+@dataclass
+class RecoveryResult:
+    batch_id: str
+    base_path: str
+    action: str  # "forward", "back" or "failed"
+
+
+def _record_ids(record: dict) -> dict[str, int]:
+    # Older records on Windows stored (ctime, mtime) pairs, which change with a
+    # folder's contents; those names are treated as having no known identity.
+    return {name: value for name, value in record.get("ids", {}).items() if isinstance(value, int)}
+
+
+def _identity(base_path: str, name: str) -> Hashable:
+    """``file_identity`` of *name*: None if nothing is there, True if it has no identity."""
+    try:
+        file_id = file_identity(os.path.join(base_path, name))
+    except OSError:
+        return None
+    return True if file_id is None else file_id
+
+
+def _path_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _fsync_dir(path: str) -> None:
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+# How a non-blocking lock reports that another process holds it.
+_LOCK_HELD = {errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK, errno.EDEADLK}
+
+
+class _BatchLock:
+    """Exclusive lock on a batch's ``.lock`` file, held by the process running it.
+
+    The OS drops the lock when that process exits, so a pending record whose
+    lock can be taken belongs to a run that was interrupted, while one whose
+    lock is held is still being executed (by the GUI or the command line).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._fd: int | None = None
+
+    def acquire(self) -> bool:
+        """Take the lock without waiting; False if another run holds it."""
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            # No lock file possible here; there is nothing to coordinate with.
+            return True
+        try:
+            if os.name == "nt":
+                import msvcrt
+
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError as exc:
+            os.close(fd)
+            # Other errors mean the file system cannot lock; go ahead unlocked.
+            return exc.errno not in _LOCK_HELD
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        if os.name == "nt":
+            import msvcrt
+
+            try:
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            except OSError:
+                pass
+        os.close(fd)
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def _record_order(name: str) -> str:
+    # Ids start with a local timestamp; older ones stop at seconds, newer ones
+    # add nanoseconds.  Padding makes both compare by time.
+    stamp, _, rest = name.partition("_")
+    return stamp.ljust(23, "0") + "_" + rest
+
+
+class RenameJournal:
+    def __init__(self, directory: str, keep: int = 20) -> None:
+        self.directory = directory
+        self.keep = keep
+        self._last_ns = 0
+        self._ns_lock = threading.Lock()
+        # Whether a directory has a batch to undo, kept current by the batches
+        # run through this journal so the UI never has to read the records.
+        self._undoable: dict[str, bool] = {}
+
+    def _new_batch_id(self) -> str:
+        with self._ns_lock:
+            # Strictly increasing, so batches committed within one clock tick keep their order.
+            ns = max(time.time_ns(), self._last_ns + 1)
+            self._last_ns = ns
+        seconds, fraction = divmod(ns, 1_000_000_000)
+        stamp = time.strftime("%Y%m%d%H%M%S", time.localtime(seconds))
+        return f"{stamp}{fraction:09d}_{uuid.uuid4().hex[:8]}"
+
+    # -- records -----------------------------------------------------------
+
+    def _record_path(self, batch_id: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.json")
+
+    def _lock_path(self, batch_id: str) -> str:
+        return os.path.join(self.directory, f"{batch_id}.lock")
+
+    def _read(self, path: str) -> dict | None:
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                record = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if isinstance(record, dict) and "id" in record and "steps" in record:
+            return record
+        return None
+
+    def _write(self, record: dict, durable: bool) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._record_path(record["id"])
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(record, fh, ensure_ascii=False)
+            if durable:
+                fh.flush()
+                os.fsync(fh.fileno())
+        os.replace(tmp, path)
+        if durable:
+            _fsync_dir(self.directory)
+
+    def _set_status(self, record: dict, status: str) -> None:
+        record["status"] = status
+        try:
+            self._write(record, durable=False)
+        except OSError:
+            pass
+
+    def records(self) -> list[dict]:
+        """All readable records, oldest first."""
+        try:
+            names = sorted(
+                (n for n in os.listdir(self.directory) if n.endswith(".json")), key=_record_order
+            )
+        except OSError:
+            return []
+        records = []
+        for name in names:
+            record = self._read(os.path.join(self.directory, name))
+            if record is not None:
+                records.append(record)
+        return records
+
+    def _prune(self) -> None:
+        finished = [r for r in self.records() if r.get("status") != STATUS_PENDING]
+        for record in finished[: max(0, len(finished) - self.keep)]:
+            for path in (self._record_path(record["id"]), self._lock_path(record["id"])):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    # -- execution ---------------------------------------------------------
+
+    def run(
+        self,
+        plan: RenamePlan,
+        kind: str = "sort",
+        progress: Callable[[int, int], None] | None = None,
+    ) -> str | None:
+        """Execute *plan* under the journal; on failure undo what ran and re-raise."""
+        if not plan.steps:
+            return None
+        # Identities of the folders as the batch finds them; a name first seen as
+        # a source is still held by its original folder.
+        file_ids: dict[str, int] = {}
+        for step in plan.steps:
+            if step.source in file_ids:
+                continue
+            try:
+                file_id = file_identity(os.path.join(plan.base_path, step.source))
+            except OSError:
+                continue
+            if file_id is not None:
+                file_ids[step.source] = file_id
+        batch_id = self._new_batch_id()
+        record = {
+            "id": batch_id,
+            "kind": kind,
+            "base_path": plan.base_path,
+            "steps": [[step.source, step.target] for step in plan.steps],
+            "ids": file_ids,
+            "status": STATUS_PENDING,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        # Held until the record is final, so ``recover`` in another process leaves it alone.
+        lock = _BatchLock(self._lock_path(batch_id))
+        lock.acquire()
+        try:
+            self._execute(plan, record, kind, progress)
+        finally:
+            lock.release()
+        if kind != "undo":
+            self._undoable[_path_key(plan.base_path)] = True
+        self._prune()
+        return batch_id
+
+    def _execute(
+        self,
+        plan: RenamePlan,
+        record: dict,
+        kind: str,
+        progress: Callable[[int, int], None] | None,
+    ) -> None:
+        self._write(record, durable=True)
+        steps = plan.steps
+        done = 0
+        try:
+            with tracing.span("rename_batch", "fs", kind=kind, steps=len(steps)):
+                for step in steps:
+                    os.rename(
+                        os.path.join(plan.base_path, step.source),
+                        os.path.join(plan.base_path, step.target),
+                    )
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(steps))
+        except Exception:
+            rolled_back = self._rollback(plan.base_path, steps[:done])
+            self._set_status(record, STATUS_ROLLED_BACK if rolled_back else STATUS_FAILED)
+            raise
+        finally:
+            tracing.count("renames", done)
+        self._set_status(record, STATUS_DONE)
+
+    @staticmethod
+    def _rollback(base_path: str, done_steps: list[RenameStep]) -> bool:
+        ok = True
+        for step in reversed(done_steps):
+            try:
+                os.rename(os.path.join(base_path, step.target), os.path.join(base_path, step.source))
+            except OSError:
+                ok = False
+        return ok
+
+    # -- recovery ----------------------------------------------------------
+
+    @staticmethod
+    def _completed_steps(
+        base_path: str, steps: list[RenameStep], ids: dict[str, Hashable]
+    ) -> int | None:
+        """How many leading steps are on disk, judged by which folder sits under each name.
+
+        Folder identities (inode, or the NTFS file index) are recorded with the
+        batch, so e.g. a completed swap is told apart from an untouched one.
+        Names without a recorded identity fall back to existence.
+        """
+        state: dict[str, Hashable] = {}
+        for step in steps:
+            state.setdefault(step.source, ids.get(step.source, True))
+            state.setdefault(step.target, None)
+
+        actual = {name: _identity(base_path, name) for name in state}
+
+        def matches(name: str) -> bool:
+            expected, found = state[name], actual[name]
+            if expected is None or found is None:
+                return expected is found
+            return expected is True or found is True or expected == found
+
+        mismatches = sum(1 for name in state if not matches(name))
+        best = 0 if mismatches == 0 else None
+        for k, step in enumerate(steps, 1):
+            moved = state[step.source]
+            for name, value in ((step.source, None), (step.target, moved)):
+                before = matches(name)
+                state[name] = value
+                mismatches += int(before) - int(matches(name))
+            if mismatches == 0:
+                best = k
+        return best
+
+    def recover(self, base_paths: Iterable[str] | None = None) -> list[RecoveryResult]:
+        """Finish or roll back interrupted batches (only those under *base_paths* if given).
+
+        Batches another process is still running are skipped.
+        """
+        wanted = None if base_paths is None else {_path_key(p) for p in base_paths}
+        results: list[RecoveryResult] = []
+        for record in self.records():
+            if record.get("status") != STATUS_PENDING:
+                continue
+            base_path = record.get("base_path", "")
+            if wanted is not None and _path_key(base_path) not in wanted:
+                continue
+            lock = _BatchLock(self._lock_path(record["id"]))
+            if not lock.acquire():
+                continue
+            try:
+                result = self._recover_record(record["id"])
+            finally:
+                lock.release()
+            if result is not None:
+                results.append(result)
+        return results
+
+    def _recover_record(self, batch_id: str) -> RecoveryResult | None:
+        # Re-read under the lock: the owner may have finished since ``records()``.
+        record = self._read(self._record_path(batch_id))
+        if record is None or record.get("status") != STATUS_PENDING:
+            return None
+        base_path = record.get("base_path", "")
+        steps = [RenameStep(src, dst) for src, dst in record["steps"]]
+        ids: dict[str, Hashable] = dict(_record_ids(record))
+        done = self._completed_steps(base_path, steps, ids)
+        action = "failed"
+        if done is not None:
+            try:
+                for step in steps[done:]:
+                    os.rename(
+                        os.path.join(base_path, step.source),
+                        os.path.join(base_path, step.target),
+                    )
+                    done += 1
+                action = "forward"
+            except OSError:
+                if self._rollback(base_path, steps[:done]):
+                    action = "back"
+        status = {"forward": STATUS_DONE, "back": STATUS_ROLLED_BACK}.get(action, STATUS_FAILED)
+        self._set_status(record, status)
+        self._undoable.pop(_path_key(base_path), None)
+        return RecoveryResult(record["id"], base_path, action)
+
+    # -- undo --------------------------------------------------------------
+
+    @staticmethod
+    def _check_undo(record: dict) -> None:
+        """Raise ``UndoConflict`` unless every renamed folder still sits under its new name.
+
+        Single renames bypass the journal and other programs can rename too, so
+        the name alone does not say the folder is the one the batch moved.
+        """
+        ids = _record_ids(record)
+        expected: dict[str, int | None] = {}
+        for source, target in record["steps"]:
+            expected[target] = expected.pop(source, ids.get(source))
+        for name, file_id in expected.items():
+            found = _identity(record["base_path"], name)
+            if found is None:
+                raise UndoConflict(f"{name!r} no longer exists")
+            if file_id is not None and found is not True and found != file_id:
+                raise UndoConflict(f"{name!r} is no longer the folder this batch renamed")
+
+    def can_undo(self, base_path: str) -> bool | None:
+        """Cached ``last_undoable`` answer; None until looked up (reads no records)."""
+        return self._undoable.get(_path_key(base_path))
+
+    def last_undoable(self, base_path: str) -> dict | None:
+        norm = _path_key(base_path)
+        found = None
+        for record in reversed(self.records()):
+            if _path_key(record.get("base_path", "")) != norm:
+                continue
+            if record.get("status") == STATUS_DONE and record.get("kind") != "undo":
+                found = record
+                break
+        self._undoable[norm] = found is not None
+        return found
+
+    def undo(
+        self, base_path: str, progress: Callable[[int, int], None] | None = None
+    ) -> RenamePlan | None:
+        record = self.last_undoable(base_path)
+        if record is None:
+            return None
+        self._check_undo(record)
+        inverse = RenamePlan(
+            record["base_path"],
+            steps=[RenameStep(dst, src) for src, dst in reversed(record["steps"])],
+        )
+        inverse.targets = net_renames(inverse.steps)
+        self.run(inverse, kind="undo", progress=progress)
+        self._set_status(record, STATUS_UNDONE)
+        self.last_undoable(base_path)
+        return inverse
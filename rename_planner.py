@@ -0,0 +1,313 @@
+"""Plan the smallest set of renames that numbers folders in a given order.
+
+Folders whose name is already correct are left alone.  Renames are ordered
+so that a folder only moves onto a name once its previous owner has moved
+away; every cycle (for example a swap of two numbered folders) is broken with
+exactly one temporary name.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Hashable, Iterable, Sequence
+
+from folder_snapshot import INTERNAL_PREFIX, DirectorySnapshot, SnapshotDiff
+
+TEMP_PREFIX = INTERNAL_PREFIX + "tmp_"
+
+
+@dataclass(frozen=True)
+class NumberingScheme:
+    """How sort prefixes look: ``{number}{separator}{name}``.
+
+    ``width`` 0 sizes the number to the folder count (never below two digits),
+    so 100 or more folders still sort correctly by name.
+    """
+
+    separator: str = "_"
+    start: int = 1
+    width: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.separator or self.separator[0].isdigit():
+            raise ValueError(f"invalid numbering separator: {self.separator!r}")
+        if self.start < 0 or self.width < 0:
+            raise ValueError("numbering start and width must not be negative")
+
+    @classmethod
+    def from_settings(cls, settings: object) -> "NumberingScheme":
+        """Scheme from a stored settings dict; invalid or missing values use defaults."""
+        if not isinstance(settings, dict):
+            return cls()
+        try:
+            return cls(
+                str(settings.get("separator", "_")),
+                int(settings.get("start", 1)),
+                int(settings.get("width", 0)),
+            )
+        except (TypeError, ValueError):
+            return cls()
+
+    def digits(self, count: int) -> int:
+        if self.width:
+            return self.width
+        return max(2, len(str(self.start + max(count, 1) - 1)))
+
+    def strip(self, name: str) -> str:
+        """*name* without its sort prefix."""
+        return re.sub(rf"^\d+{re.escape(self.separator)}", "", name)
+
+    def strip_loose(self, name: str) -> str:
+        """*name* without any leading number, with or without the separator."""
+        return re.sub(rf"^\d+(?:{re.escape(self.separator)})?", "", name)
+
+
+DEFAULT_SCHEME = NumberingScheme()
+
+
+@dataclass(frozen=True)
+class RenameStep:
+    source: str
+    target: str
+
+
+@dataclass
+class RenamePlan:
+    base_path: str
+    steps: list[RenameStep] = field(default_factory=list)
+    targets: dict[str, str] = field(default_factory=dict)
+    temp_count: int = 0
+    file_ids: dict[str, Hashable] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __bool__(self) -> bool:
+        return bool(self.steps)
+
+    @property
+    def renamed(self) -> list[tuple[str, str]]:
+        return [(src, dst) for src, dst in self.targets.items() if src != dst]
+
+    def to_diff(self) -> SnapshotDiff:
+        return SnapshotDiff(renamed=self.renamed)
+
+
+def net_renames(steps: Iterable[RenameStep]) -> dict[str, str]:
+    """Collapse a step sequence into ``{original name: final name}``."""
+    origin: dict[str, str] = {}
+    for step in steps:
+        origin[step.target] = origin.pop(step.source, step.source)
+    return {orig: cur for cur, orig in origin.items() if orig != cur}
+
+
+def sort_target_names(
+    folders: Sequence[str], blocked: Iterable[str] = (), scheme: NumberingScheme = DEFAULT_SCHEME
+) -> list[str]:
+    """Numbered target name for each folder, avoiding *blocked* names (normcase'd)."""
+    taken = set(blocked)
+    targets: list[str] = []
+    digits = scheme.digits(len(folders))
+    sep = scheme.separator
+    for i, folder_name in enumerate(folders, scheme.start):
+        base_name = scheme.strip(folder_name)
+        new_name = f"{i:0{digits}d}{sep}{base_name}"
+        counter = 1
+        while os.path.normcase(new_name) in taken:
+            new_name = f"{i:0{digits}d}{sep}{base_name} ({counter})"
+            counter += 1
+        taken.add(os.path.normcase(new_name))
+        targets.append(new_name)
+    return targets
+
+
+def match_order(
+    names: Sequence[str], requested: Iterable[str], scheme: NumberingScheme = DEFAULT_SCHEME
+) -> list[str]:
+    """Arrange *names* by *requested*, matching exact names first, then prefix-free ones.
+
+    Folders that are not requested keep their relative order after the
+    requested ones.
+    """
+    exact = set(names)
+    bare: dict[str, list[str]] = {}
+    for name in names:
+        bare.setdefault(scheme.strip(name), []).append(name)
+    used: set[str] = set()
+    ordered: list[str] = []
+    for wanted in requested:
+        if wanted in exact and wanted not in used:
+            match = wanted
+        else:
+            match = next((n for n in bare.get(wanted, ()) if n not in used), None)
+        if match is not None:
+            used.add(match)
+            ordered.append(match)
+    return ordered + [name for name in names if name not in used]
+
+
+def order_renames(
+    base_path: str, mapping: dict[str, str], occupied: Iterable[str] = ()
+) -> RenamePlan:
+    """Turn a ``{source: target}`` mapping into an executable, collision-free plan."""
+    plan = RenamePlan(base_path, targets=dict(mapping))
+    pending = {src: dst for src, dst in mapping.items() if src != dst}
+    owner = {os.path.normcase(src): src for src in pending}
+    used = set(occupied) | set(owner) | {os.path.normcase(dst) for dst in pending.values()}
+    waiting: dict[str, str] = {}
+    ready: list[str] = []
+    for src, dst in pending.items():
+        blocker = owner.get(os.path.normcase(dst))
+        if blocker is None or blocker == src:
+            ready.append(src)
+        else:
+            waiting[os.path.normcase(dst)] = src
+    temp_names = (f"{TEMP_PREFIX}{uuid.uuid4().hex[:8]}_{n}" for n in itertools.count())
+
+    def vacate(src: str) -> None:
+        key = os.path.normcase(src)
+        owner.pop(key, None)
+        waiter = waiting.pop(key, None)
+        if waiter is not None:
+            ready.append(waiter)
+
+    while pending:
+        if not ready:
+            # Only cycles remain: park one member under a temporary name.
+            src = next(iter(pending))
+            temp = next(temp_names)
+            while os.path.normcase(temp) in used:
+                temp = next(temp_names)
+            used.add(os.path.normcase(temp))
+            plan.steps.append(RenameStep(src, temp))
+            plan.temp_count += 1
+            dst = pending.pop(src)
+            pending[temp] = dst
+            dst_key = os.path.normcase(dst)
+            if waiting.get(dst_key) == src:
+                waiting[dst_key] = temp
+            vacate(src)
+            continue
+        src = ready.pop()
+        dst = pending.pop(src)
+        plan.steps.append(RenameStep(src, dst))
+        vacate(src)
+    return plan
+
+
+def _file_ids(snapshot: DirectorySnapshot, names: Iterable[str]) -> dict[str, Hashable]:
+    ids: dict[str, Hashable] = {}
+    for name in names:
+        entry = snapshot.entry(name)
+        if entry is not None and entry.file_id is not None:
+            ids[name] = entry.file_id
+    return ids
+
+
+def plan_sort(
+    folders: Sequence[str], snapshot: DirectorySnapshot, scheme: NumberingScheme = DEFAULT_SCHEME
+) -> RenamePlan:
+    """Dry run: the renames ``execute_plan`` would perform to number *folders* in order."""
+    return plan_sort_targets(folders, snapshot, scheme)[0]
+
+
+def plan_sort_targets(
+    folders: Sequence[str], snapshot: DirectorySnapshot, scheme: NumberingScheme = DEFAULT_SCHEME
+) -> tuple[RenamePlan, list[str]]:
+    """``plan_sort`` plus the numbered name of every entry of *folders*.
+
+    Entries that are not in *snapshot* yet (folders about to be created) get
+    a target name too, so they can be created under it directly.
+    """
+    present = [name for name in folders if name in snapshot]
+    moving = {os.path.normcase(name) for name in present}
+    blocked = snapshot.occupied_keys() - moving
+    targets = sort_target_names(folders, blocked, scheme)
+    mapping = {name: target for name, target in zip(folders, targets) if name in snapshot}
+    plan = order_renames(snapshot.path, mapping, snapshot.occupied_keys())
+    plan.file_ids = _file_ids(snapshot, mapping)
+    return plan, targets
+
+
+def plan_renames(
+    snapshot: DirectorySnapshot, mapping: dict[str, str]
+) -> tuple[RenamePlan, list[tuple[str, str, str]]]:
+    """Plan an arbitrary ``{source: target}`` batch, checking collisions once for all of it.
+
+    A target claimed by an earlier source of the batch is skipped as
+    ``"duplicate"``; one held by an entry that keeps its name (including
+    sources skipped themselves) as ``"exists"``.  Returns the plan and the
+    skipped ``(source, target, reason)`` triples.
+    """
+    skipped: list[tuple[str, str, str]] = []
+    accepted: dict[str, str] = {}
+    claimed: set[str] = set()
+    for src, dst in mapping.items():
+        if src == dst or src not in snapshot:
+            continue
+        key = os.path.normcase(dst)
+        if key in claimed:
+            skipped.append((src, dst, "duplicate"))
+            continue
+        claimed.add(key)
+        accepted[src] = dst
+    occupied = snapshot.occupied_keys()
+    while True:
+        staying = occupied - {os.path.normcase(src) for src in accepted}
+        blocked = [src for src, dst in accepted.items() if os.path.normcase(dst) in staying]
+        if not blocked:
+            break
+        for src in blocked:
+            skipped.append((src, accepted.pop(src), "exists"))
+    plan = order_renames(snapshot.path, accepted, occupied)
+    plan.file_ids = _file_ids(snapshot, accepted)
+    return plan, skipped
+
+
+def plan_clear_prefix(
+    snapshot: DirectorySnapshot, scheme: NumberingScheme = DEFAULT_SCHEME
+) -> RenamePlan:
+    """Strip the numeric prefix of every folder whose bare name is still free."""
+    plan = RenamePlan(snapshot.path)
+    existing = set(snapshot.occupied_keys())
+    for old_name in snapshot.names:
+        new_name = scheme.strip_loose(old_name)
+        if not new_name or new_name == old_name or os.path.normcase(new_name) in existing:
+            continue
+        existing.discard(os.path.normcase(old_name))
+        existing.add(os.path.normcase(new_name))
+        plan.steps.append(RenameStep(old_name, new_name))
+        plan.targets[old_name] = new_name
+    plan.file_ids = _file_ids(snapshot, plan.targets)
+    return plan
+
+
+def execute_plan(
+    plan: RenamePlan, progress: Callable[[int, int], None] | None = None
+) -> None:
+    total = len(plan.steps)
+    for i, step in enumerate(plan.steps, 1):
+        os.rename(
+            os.path.join(plan.base_path, step.source), os.path.join(plan.base_path, step.target)
+        )
+        if progress is not None:
+            progress(i, total)
+
+
+def sort_folders(
+    base_path: str,
+    folders: Sequence[str],
+    dry_run: bool = False,
+    snapshot: DirectorySnapshot | None = None,
+    scheme: NumberingScheme = DEFAULT_SCHEME,
+) -> RenamePlan:
+    if snapshot is None:
+        snapshot = DirectorySnapshot.scan(base_path)
+    plan = plan_sort(folders, snapshot, scheme)
+    if not dry_run:
+        execute_plan(plan)
+    return plan
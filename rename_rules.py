@@ -0,0 +1,144 @@
+"""Rule-based batch renaming.
+
+A ``RuleSet`` is an ordered tuple of small, immutable rules (find/replace,
+regex replace, case change, prefix strip, insert text, template).  Rules
+compile their patterns once on construction, so computing one name is cheap
+and previews can evaluate just the rows on screen.  ``plan_rules`` applies a
+rule set to a whole batch and checks every collision in one pass.
+"""
+
+from __future__ import annotations
+
+import re
+import string
+from dataclasses import dataclass, field
+from typing import Iterable, Protocol
+
+from bulk_create import name_error
+from folder_snapshot import DirectorySnapshot
+from rename_planner import DEFAULT_SCHEME, NumberingScheme, RenamePlan, plan_renames
+
+CASE_MODES = ("lower", "upper", "title")
+TEMPLATE_FIELDS = ("name", "stem", "n")
+
+
+class Rule(Protocol):
+    def apply(self, name: str, index: int) -> str: ...
+
+
+@dataclass(frozen=True)
+class ReplaceRule:
+    """Replace every match of *find*; with ``regex`` *replace* may use ``\\1`` groups."""
+
+    find: str
+    replace: str = ""
+    regex: bool = False
+    ignore_case: bool = False
+    pattern: "re.Pattern[str]" = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.find:
+            raise ValueError("nothing to find")
+        flags = re.IGNORECASE if self.ignore_case else 0
+        try:
+            pattern = re.compile(self.find if self.regex else re.escape(self.find), flags)
+            if self.regex:
+                pattern.sub(self.replace, "")  # parses the replacement template
+        except (re.error, IndexError) as exc:
+            raise ValueError(str(exc)) from exc
+        object.__setattr__(self, "pattern", pattern)
+
+    def apply(self, name: str, index: int) -> str:
+        if self.regex:
+            return self.pattern.sub(self.replace, name)
+        return self.pattern.sub(lambda _: self.replace, name)
+
+
+@dataclass(frozen=True)
+class CaseRule:
+    mode: str = "lower"
+
+    def __post_init__(self) -> None:
+        if self.mode not in CASE_MODES:
+            raise ValueError(f"unknown case mode: {self.mode!r}")
+
+    def apply(self, name: str, index: int) -> str:
+        return getattr(name, self.mode)()
+
+
+@dataclass(frozen=True)
+class StripPrefixRule:
+    scheme: NumberingScheme = DEFAULT_SCHEME
+
+    def apply(self, name: str, index: int) -> str:
+        return self.scheme.strip_loose(name) or name
+
+
+@dataclass(frozen=True)
+class InsertRule:
+    """Insert *text* at *at* characters from the start, or from the end when negative (-1 = end)."""
+
+    text: str
+    at: int = 0
+
+    def apply(self, name: str, index: int) -> str:
+        pos = self.at if self.at >= 0 else len(name) + self.at + 1
+        pos = max(0, min(pos, len(name)))
+        return name[:pos] + self.text + name[pos:]
+
+
+@dataclass(frozen=True)
+class TemplateRule:
+    """New name from *template* with ``{name}``, ``{stem}`` (no number prefix) and ``{n}``."""
+
+    template: str
+    scheme: NumberingScheme = DEFAULT_SCHEME
+
+    def __post_init__(self) -> None:
+        try:
+            fields = [f for _, f, _, _ in string.Formatter().parse(self.template) if f is not None]
+            unknown = [f for f in fields if f.split(".")[0].split("[")[0] not in TEMPLATE_FIELDS]
+            if unknown:
+                raise ValueError(f"unknown placeholder: {{{unknown[0]}}}")
+            self.template.format(name="x", stem="x", n=1)
+        except (IndexError, KeyError, AttributeError) as exc:
+            raise ValueError(f"invalid template: {exc}") from exc
+
+    def apply(self, name: str, index: int) -> str:
+        return self.template.format(name=name, stem=self.scheme.strip_loose(name), n=index)
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    rules: tuple[Rule, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def apply(self, name: str, index: int = 1) -> str:
+        """*name* after every rule; *index* is the folder's 1-based position in the batch."""
+        for rule in self.rules:
+            name = rule.apply(name, index)
+        return name
+
+    def targets(self, names: Iterable[str]) -> dict[str, str]:
+        return {name: self.apply(name, i) for i, name in enumerate(names, 1)}
+
+
+def plan_rules(
+    rules: RuleSet, snapshot: DirectorySnapshot, names: Iterable[str]
+) -> tuple[RenamePlan, list[tuple[str, str, str]]]:
+    """Plan renaming *names* by *rules*; skipped ``(source, target, reason)`` come back too.
+
+    Reasons are ``"invalid"`` (not a usable folder name), ``"duplicate"`` and
+    ``"exists"`` (see ``plan_renames``).
+    """
+    mapping: dict[str, str] = {}
+    skipped: list[tuple[str, str, str]] = []
+    for name, target in rules.targets(names).items():
+        if target != name and name_error(target) is not None:
+            skipped.append((name, target, "invalid"))
+        else:
+            mapping[name] = target
+    plan, conflicts = plan_renames(snapshot, mapping)
+    return plan, skipped + conflicts
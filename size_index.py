@@ -0,0 +1,139 @@
+"""Recursive size and item counts for folders, cached on disk.
+
+The index stores one record per directory, keyed by path and validated by the
+directory's mtime and inode.  A directory whose record still matches is not
+listed again (only its sub-directories are visited), so a rescan only pays
+for the parts of a tree whose entries changed.  File-content growth that does
+not touch a directory's mtime is picked up the next time that directory's
+entries change.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator
+
+from state_store import atomic_write_json
+
+INDEX_VERSION = 1
+
+
+class SizeIndex:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: dict[str, list] | None = None
+        self._dirty = False
+
+    def _ensure_loaded(self) -> dict[str, list]:
+        with self._lock:
+            if self._records is None:
+                records: dict[str, list] = {}
+                try:
+                    with open(self.path, "r", encoding="utf-8") as fh:
+                        data = json.load(fh)
+                    if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+                        records = data.get("dirs", {})
+                except (OSError, ValueError):
+                    pass
+                self._records = records
+            return self._records
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty or self._records is None:
+                return
+            data = {"version": INDEX_VERSION, "dirs": dict(self._records)}
+            self._dirty = False
+        try:
+            atomic_write_json(self.path, data, durable=False)
+        except OSError:
+            pass
+
+    def _dir_record(self, path: str) -> tuple[int, int, list[str]] | None:
+        """``(own file bytes, own entry count, sub-directory names)`` for *path*."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        records = self._ensure_loaded()
+        key = os.path.normcase(path)
+        with self._lock:
+            cached = records.get(key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_ino:
+            return cached[2], cached[3], cached[4]
+        size = items = 0
+        subdirs: list[str] = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    items += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            size += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        with self._lock:
+            records[key] = [st.st_mtime_ns, st.st_ino, size, items, subdirs]
+            self._dirty = True
+        return size, items, subdirs
+
+    def measure(self, path: str, cancelled: Callable[[], bool] | None = None) -> tuple[int, int]:
+        """Total bytes and total entries below *path*."""
+        total_size = total_items = 0
+        stack = [path]
+        while stack:
+            if cancelled is not None and cancelled():
+                break
+            current = stack.pop()
+            record = self._dir_record(current)
+            if record is None:
+                continue
+            size, items, subdirs = record
+            total_size += size
+            total_items += items
+            stack.extend(os.path.join(current, name) for name in subdirs)
+        return total_size, total_items
+
+
+def scan_folders(
+    index: SizeIndex,
+    base_path: str,
+    names: Iterable[str],
+    workers: int = 4,
+    cancelled: Callable[[], bool] | None = None,
+) -> Iterator[tuple[str, int, int]]:
+    """Measure each folder in parallel, yielding ``(name, bytes, entries)`` as they finish.
+
+    Work is submitted in the order of *names*, so callers put visible rows first.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(index.measure, os.path.join(base_path, name), cancelled): name
+            for name in names
+        }
+        try:
+            for future in as_completed(futures):
+                if cancelled is not None and cancelled():
+                    break
+                size, items = future.result()
+                yield futures[future], size, items
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def format_size(size: int) -> str:
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024 or unit == "TB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+    return f"{size} B"
@@ -0,0 +1,62 @@
+"""Startup phase timings, from module import to the first directory listing.
+
+Enabled by ``--profile-startup`` or ``DM_PROFILE_STARTUP=1`` (``=exit`` also
+quits once startup is complete, for scripted measurements).  Each run
+appends one JSON line to ``startup_profile.jsonl`` next to the state file and
+prints the phases to stderr.  This module is imported before PyQt5 so the
+Qt import itself is measured.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+
+PROFILE_FILE = "startup_profile.jsonl"
+ENV_VAR = "DM_PROFILE_STARTUP"
+ARGV_FLAG = "--profile-startup"
+
+
+class StartupProfile:
+    def __init__(self, enabled: bool, exit_when_done: bool = False) -> None:
+        self.enabled = enabled
+        self.exit_when_done = exit_when_done
+        self.wall_start = time.time()
+        self._start = time.perf_counter()
+        self.phases: list[tuple[str, float]] = []
+        self.finished = False
+
+    @classmethod
+    def from_environment(cls, argv: list[str]) -> "StartupProfile":
+        value = os.environ.get(ENV_VAR, "")
+        enabled = ARGV_FLAG in argv or value not in ("", "0")
+        if ARGV_FLAG in argv:
+            argv.remove(ARGV_FLAG)
+        return cls(enabled, exit_when_done=value == "exit")
+
+    def mark(self, phase: str) -> None:
+        if self.enabled and not self.finished:
+            self.phases.append((phase, round((time.perf_counter() - self._start) * 1000, 2)))
+
+    def finish(self, directory: str, **extra: object) -> None:
+        """Record the last phase and write the run; later marks are ignored."""
+        if not self.enabled or self.finished:
+            return
+        self.finished = True
+        record = {
+            "started": self.wall_start,
+            "frozen": bool(getattr(sys, "frozen", False)),
+            "phases": dict(self.phases),
+            **extra,
+        }
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, PROFILE_FILE), "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record) + "\n")
+        except OSError:
+            pass
+        if sys.stderr is not None:
+            for phase, ms in self.phases:
+                print(f"startup {phase:>16}: {ms:8.1f} ms", file=sys.stderr)
@@ -0,0 +1,282 @@
+"""Persistent application state with write-behind, atomic saves.
+
+``last_state.json`` keeps every key it was loaded with (window settings such
+as ``win_width``/``font_base`` included) plus a ``directories`` table of
+per-directory metadata.  Cached directory listings live in separate files
+under ``snapshots/`` so they are only read when that directory is opened, and
+manual folder orders likewise under ``orders/`` (one manifest per directory),
+so saving a reorder rewrites only that directory's manifest.  Changes are
+coalesced and written on a background timer by replacing each file
+atomically; ``flush()`` forces a synchronous save.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from typing import Any
+
+import tracing
+
+CONFIG_FILE = "last_state.json"
+DEBOUNCE_SECONDS = 0.5
+# A failed save is tried again after this long, with everything unsaved still pending.
+RETRY_SECONDS = 5.0
+
+
+def app_dir() -> str:
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(os.path.abspath(sys.executable))
+    return os.path.dirname(os.path.abspath(__file__))
+
+
+def user_config_dir() -> str:
+    if sys.platform.startswith("win"):
+        root = os.environ.get("APPDATA") or os.path.expanduser("~")
+    elif sys.platform.startswith("darwin"):
+        root = os.path.expanduser("~/Library/Application Support")
+    else:
+        root = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(root, "DirectoryManager")
+
+
+def default_state_path(filename: str, directory: str | None = None) -> str:
+    """Next to the program if that is writable (or already used), else the user config dir.
+
+    *directory* is the program directory, :func:`app_dir` by default.
+    """
+    directory = directory or app_dir()
+    local = os.path.join(directory, filename)
+    if os.path.exists(local) or os.access(directory, os.W_OK):
+        return local
+    return os.path.join(user_config_dir(), filename)
+
+
+def atomic_write_json(path: str, data: Any, durable: bool = True) -> None:
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with tracing.span("write_json", "fs", file=os.path.basename(path), durable=durable):
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False, indent=2)
+                if durable:
+                    fh.flush()
+                    os.fsync(fh.fileno())
+            os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+
+def _dir_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+
+class StateStore:
+    def __init__(self, path: str, debounce: float = DEBOUNCE_SECONDS) -> None:
+        self.path = path
+        self.debounce = debounce
+        self._lock = threading.RLock()
+        self._write_lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+        self._dirty = False
+        self._pending_snapshots: dict[str, list[str]] = {}
+        # Manual orders read or saved so far (None = no manifest) and the ones not written yet.
+        self._orders: dict[str, list[str] | None] = {}
+        self._pending_orders: set[str] = set()
+        # Error of the last save, None once a save succeeded.
+        self.last_error: OSError | None = None
+        self._data: dict[str, Any] = self._load()
+
+    @property
+    def snapshot_dir(self) -> str:
+        return os.path.join(os.path.dirname(self.path), "snapshots")
+
+    @property
+    def order_dir(self) -> str:
+        return os.path.join(os.path.dirname(self.path), "orders")
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    # -- top-level keys ----------------------------------------------------
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._data.get(key, default)
+
+    def set(self, **values: Any) -> None:
+        with self._lock:
+            changed = False
+            for key, value in values.items():
+                if self._data.get(key) != value:
+                    self._data[key] = value
+                    changed = True
+            if changed:
+                self._mark_dirty()
+
+    # -- per-directory metadata -------------------------------------------
+
+    def directory(self, path: str) -> dict[str, Any]:
+        with self._lock:
+            table = self._data.get("directories")
+            if not isinstance(table, dict):
+                return {}
+            meta = table.get(_dir_key(path))
+            return dict(meta) if isinstance(meta, dict) else {}
+
+    def update_directory(self, path: str, **values: Any) -> None:
+        with self._lock:
+            table = self._data.get("directories")
+            if not isinstance(table, dict):
+                table = self._data["directories"] = {}
+            meta = table.setdefault(_dir_key(path), {})
+            changed = False
+            for key, value in values.items():
+                if value is None:
+                    changed |= meta.pop(key, None) is not None
+                elif meta.get(key) != value:
+                    meta[key] = value
+                    changed = True
+            if changed:
+                self._mark_dirty()
+
+    def _snapshot_file(self, path: str, directory: str | None = None) -> str:
+        digest = hashlib.sha1(_dir_key(path).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(directory or self.snapshot_dir, f"{digest}.json")
+
+    def _read_names(self, file: str, path: str) -> list[str] | None:
+        try:
+            with open(file, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or _dir_key(data.get("path", "")) != _dir_key(path):
+            return None
+        names = data.get("names")
+        return [str(n) for n in names] if isinstance(names, list) else None
+
+    def load_snapshot(self, path: str) -> list[str] | None:
+        with self._lock:
+            pending = self._pending_snapshots.get(_dir_key(path))
+            if pending is not None:
+                return list(pending)
+        return self._read_names(self._snapshot_file(path), path)
+
+    def load_order(self, path: str) -> list[str] | None:
+        """The manual folder order saved for *path*, or None.
+
+        Read from disk once per directory; orders kept in the ``directories``
+        table by older versions are still honoured until the next save.
+        """
+        key = _dir_key(path)
+        with self._lock:
+            if key in self._orders:
+                order = self._orders[key]
+                return None if order is None else list(order)
+        order = self._read_names(self._snapshot_file(path, self.order_dir), path)
+        if order is None:
+            legacy = self.directory(path).get("order")
+            if isinstance(legacy, list):
+                order = [str(n) for n in legacy]
+        with self._lock:
+            self._orders.setdefault(key, order)
+        return None if order is None else list(order)
+
+    def save_order(self, path: str, names: list[str] | None) -> None:
+        """Replace (or with None, delete) the manual order of *path*."""
+        key = _dir_key(path)
+        with self._lock:
+            self._orders[key] = None if names is None else list(names)
+            self._pending_orders.add(key)
+            self._schedule()
+        if "order" in self.directory(path):
+            self.update_directory(path, order=None)
+
+    def save_snapshot(self, path: str, names: list[str]) -> None:
+        with self._lock:
+            self._pending_snapshots[_dir_key(path)] = list(names)
+            self._schedule()
+
+    # -- persistence -------------------------------------------------------
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+        self._schedule()
+
+    def _schedule(self, delay: float | None = None) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(self.debounce if delay is None else delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        # Writes are serialised so an older copy can never land after a newer one.
+        with self._write_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not (self._dirty or self._pending_snapshots or self._pending_orders):
+                    return
+                # Only the files that changed are rewritten.
+                data = json.loads(json.dumps(self._data)) if self._dirty else None
+                snapshots = dict(self._pending_snapshots)
+                orders = {key: self._orders.get(key) for key in self._pending_orders}
+                self._pending_orders.clear()
+                self._dirty = False
+            error: OSError | None = None
+            if data is not None:
+                try:
+                    atomic_write_json(self.path, data)
+                    data = None
+                except OSError as exc:
+                    error = exc
+            unsaved_orders: list[str] = []
+            for key, names in orders.items():
+                file = self._snapshot_file(key, self.order_dir)
+                try:
+                    if names is None:
+                        if os.path.exists(file):
+                            os.remove(file)
+                    else:
+                        atomic_write_json(file, {"path": key, "names": names})
+                except OSError as exc:
+                    error = exc
+                    unsaved_orders.append(key)
+            saved_snapshots: dict[str, list[str]] = {}
+            for key, names in snapshots.items():
+                try:
+                    atomic_write_json(
+                        self._snapshot_file(key), {"path": key, "names": names}, durable=False
+                    )
+                    saved_snapshots[key] = names
+                except OSError as exc:
+                    error = exc
+            with self._lock:
+                for key, names in saved_snapshots.items():
+                    if self._pending_snapshots.get(key) is names:
+                        del self._pending_snapshots[key]
+                self.last_error = error
+                if error is not None:
+                    # Whatever was not written stays pending and is tried again later.
+                    self._dirty = self._dirty or data is not None
+                    self._pending_orders.update(unsaved_orders)
+                    self._schedule(RETRY_SECONDS)
+            if error is not None and sys.stderr is not None:
+                print(f"Could not save state: {error}", file=sys.stderr)
+
+    def close(self) -> None:
+        self.flush()
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from folder_snapshot import DirectorySnapshot
+from rename_journal import RenameJournal, UndoConflict
+from rename_planner import NumberingScheme, plan_sort
+
+
+def _sort(journal: RenameJournal, base: str, order: list[str]) -> None:
+    snapshot = DirectorySnapshot.scan(base)
+    journal.run(plan_sort(order, snapshot, NumberingScheme.from_settings(None)))
+
+
+@pytest.fixture
+def base(tmp_path):
+    path = tmp_path / "base"
+    for name in ("a", "b", "c"):
+        (path / name).mkdir(parents=True)
+    return str(path)
+
+
+def test_undo_after_editing_inside_a_renamed_folder(tmp_path, base):
+    journal = RenameJournal(str(tmp_path / "journal"))
+    _sort(journal, base, ["c", "a", "b"])
+    assert sorted(os.listdir(base)) == ["01_c", "02_a", "03_b"]
+    # Changing a folder's contents must not make it look like another folder.
+    with open(os.path.join(base, "01_c", "notes.txt"), "w", encoding="utf-8") as fh:
+        fh.write("edited")
+    os.mkdir(os.path.join(base, "02_a", "sub"))
+    journal.undo(base)
+    assert sorted(os.listdir(base)) == ["a", "b", "c"]
+    assert os.path.exists(os.path.join(base, "c", "notes.txt"))
+
+
+def test_undo_refuses_a_replaced_folder(tmp_path, base):
+    journal = RenameJournal(str(tmp_path / "journal"))
+    _sort(journal, base, ["c", "a", "b"])
+    os.rename(os.path.join(base, "01_c"), os.path.join(base, "elsewhere"))
+    os.mkdir(os.path.join(base, "01_c"))
+    with pytest.raises(UndoConflict):
+        journal.undo(base)
+    assert sorted(os.listdir(base)) == ["01_c", "02_a", "03_b", "elsewhere"]
@@ -0,0 +1,164 @@
+"""Opt-in timing spans and counters for file-system work and UI refreshes.
+
+Enabled with ``DM_TRACE=1`` or from the context menu.  Spans are written in
+the Chrome trace event format to ``trace.json`` next to the state file, which
+opens in ``chrome://tracing`` or https://ui.perfetto.dev (the closing ``]``
+is optional in that format, so the file is valid while still being written).
+The file rotates at ``MAX_BYTES`` keeping ``BACKUPS`` old files.  Recent slow
+spans, last durations and counter rates are kept in memory for the in-app
+overlay.  While disabled, ``span`` and ``count`` cost one attribute check.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator
+
+TRACE_FILE = "trace.json"
+ENV_VAR = "DM_TRACE"
+MAX_BYTES = 8 * 1024 * 1024
+BACKUPS = 3
+SLOW_MS = 30.0
+RATE_WINDOW = 5.0
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.path = ""
+        self._lock = threading.Lock()
+        self._fh: Any = None
+        self._written = 0
+        self._threads: set[int] = set()
+        self.last_ms: dict[str, float] = {}
+        self.slow: deque[tuple[str, float]] = deque(maxlen=8)
+        self.totals: dict[str, int] = {}
+        self._events: dict[str, deque[tuple[float, int]]] = {}
+
+    def enable(self, directory: str) -> None:
+        if self.enabled:
+            return
+        self.path = os.path.join(directory, TRACE_FILE)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if os.path.exists(self.path):
+                self._shift_backups()
+            self._open()
+        except OSError:
+            return
+        self.enabled = True
+
+    def disable(self) -> None:
+        with self._lock:
+            self.enabled = False
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._fh is not None:
+                self._fh.flush()
+
+    def span(self, name: str, cat: str = "app", **args: Any) -> contextlib.AbstractContextManager:
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, cat, args)
+
+    @contextlib.contextmanager
+    def _span(self, name: str, cat: str, args: dict[str, Any]) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._record(name, cat, start, end, args)
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled or n <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self.totals[name] = self.totals.get(name, 0) + n
+            events = self._events.setdefault(name, deque())
+            events.append((now, n))
+            while events and events[0][0] < now - RATE_WINDOW:
+                events.popleft()
+            total = self.totals[name]
+        self._write({"name": name, "ph": "C", "ts": _us(time.perf_counter()), "args": {name: total}})
+
+    def rate(self, name: str) -> float:
+        """Events per second over the last ``RATE_WINDOW`` seconds."""
+        now = time.monotonic()
+        with self._lock:
+            events = self._events.get(name, ())
+            return sum(n for t, n in events if t >= now - RATE_WINDOW) / RATE_WINDOW
+
+    def _record(self, name: str, cat: str, start: float, end: float, args: dict[str, Any]) -> None:
+        ms = (end - start) * 1000
+        self.last_ms[name] = ms
+        if ms >= SLOW_MS:
+            self.slow.append((name, ms))
+        event = {"name": name, "cat": cat, "ph": "X", "ts": _us(start), "dur": _us(end - start)}
+        if args:
+            event["args"] = args
+        self._write(event)
+
+    def _write(self, event: dict[str, Any]) -> None:
+        tid = threading.get_native_id()
+        event["pid"] = os.getpid()
+        event["tid"] = tid
+        with self._lock:
+            if self._fh is None:
+                return
+            lines = []
+            if tid not in self._threads:
+                self._threads.add(tid)
+                lines.append(
+                    {"name": "thread_name", "ph": "M", "pid": event["pid"], "tid": tid,
+                     "args": {"name": threading.current_thread().name}}
+                )
+            lines.append(event)
+            text = "".join(json.dumps(line, default=str) + ",\n" for line in lines)
+            try:
+                self._fh.write(text)
+                self._written += len(text)
+                if self._written >= MAX_BYTES:
+                    self._rotate()
+            except OSError:
+                pass
+
+    def _open(self) -> None:
+        self._fh = open(self.path, "w", encoding="utf-8")
+        self._fh.write("[\n")
+        self._written = 2
+        self._threads.clear()
+
+    def _rotate(self) -> None:
+        self._fh.close()
+        self._shift_backups()
+        self._open()
+
+    def _shift_backups(self) -> None:
+        root, ext = os.path.splitext(self.path)
+        for i in range(BACKUPS - 1, 0, -1):
+            older = f"{root}.{i}{ext}"
+            if os.path.exists(older):
+                os.replace(older, f"{root}.{i + 1}{ext}")
+        os.replace(self.path, f"{root}.1{ext}")
+
+
+def _us(seconds: float) -> int:
+    return int(seconds * 1_000_000)
+
+
+TRACER = Tracer()
+span = TRACER.span
+count = TRACER.count
@@ -0,0 +1,319 @@
+"""Bring folders from elsewhere into a directory.
+
+``plan_transfer`` picks a free name for every dropped folder and its place in
+the folder order.  ``transfer`` then moves folders on the same device with one
+rename each and copies the rest on a thread pool, file by file in fixed-size
+chunks, reporting progress and throughput and stopping between chunks when
+cancelled.  Copies are built in a hidden staging folder and renamed into place
+only once complete, so a failed or cancelled copy never shows up half-filled.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+import tracing
+from bulk_create import plan_create
+from delete_engine import is_tree, remove_tree
+from folder_snapshot import INTERNAL_PREFIX, DirectorySnapshot
+
+STAGING_DIR = INTERNAL_PREFIX + "incoming"
+CHUNK_SIZE = 1 << 20
+# Progress is reported at most this often (seconds); chunks arrive far faster.
+REPORT_INTERVAL = 0.1
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+@dataclass
+class TransferItem:
+    source: str
+    # Folder name inside the target directory.
+    name: str
+    move: bool
+
+
+@dataclass
+class TransferPlan:
+    base_path: str
+    items: list[TransferItem] = field(default_factory=list)
+    # Full folder order afterwards, with the new names inserted at the drop position.
+    order: list[str] = field(default_factory=list)
+    rejected: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class TransferReport:
+    moved: list[str] = field(default_factory=list)
+    copied: list[str] = field(default_factory=list)
+    failures: list[tuple[str, Exception]] = field(default_factory=list)
+    bytes: int = 0
+    seconds: float = 0.0
+    cancelled: bool = False
+
+    @property
+    def arrived(self) -> list[str]:
+        return self.moved + self.copied
+
+    @property
+    def throughput(self) -> float:
+        """Copied bytes per second."""
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+
+def source_error(source: str, base_path: str) -> str | None:
+    """Why *source* cannot be brought into *base_path*, or None if it can."""
+    if not os.path.isdir(source):
+        return "not a folder"
+    src = os.path.normcase(os.path.realpath(source))
+    base = os.path.normcase(os.path.realpath(base_path))
+    if os.path.dirname(src) == base:
+        return "already in this folder"
+    if base == src or base.startswith(src.rstrip(os.sep) + os.sep):
+        return "contains this folder"
+    return None
+
+
+def same_device(source: str, base_path: str) -> bool:
+    try:
+        return os.stat(source).st_dev == os.stat(base_path).st_dev
+    except OSError:
+        return False
+
+
+def plan_transfer(
+    sources: Sequence[str],
+    snapshot: DirectorySnapshot,
+    order: Sequence[str],
+    position: int | None = None,
+    move: bool = False,
+) -> TransferPlan:
+    """Plan bringing *sources* into *snapshot*'s directory at *position* of *order*.
+
+    Names already taken get a ``(n)`` suffix, as for new folders.
+    """
+    plan = TransferPlan(snapshot.path)
+    accepted: list[str] = []
+    for source in sources:
+        error = source_error(source, snapshot.path)
+        if error is not None:
+            plan.rejected.append((source, error))
+        else:
+            accepted.append(source)
+    names = [os.path.basename(os.path.normpath(source)) for source in accepted]
+    created = plan_create(names, snapshot, order, position)
+    rejected = {name for name, _ in created.rejected}
+    plan.rejected.extend(created.rejected)
+    accepted = [source for source, name in zip(accepted, names) if name not in rejected]
+    plan.items = [
+        TransferItem(source, name, move) for source, name in zip(accepted, created.created)
+    ]
+    plan.order = created.order
+    return plan
+
+
+class _Meter:
+    """Thread-safe byte counter that reports progress at a bounded rate."""
+
+    def __init__(self, total: int, progress: Callable[[int, int], None] | None) -> None:
+        self.done = 0
+        self.total = total
+        self._progress = progress
+        self._lock = threading.Lock()
+        self._reported = 0.0
+
+    def add(self, count: int) -> None:
+        with self._lock:
+            self.done += count
+            now = time.perf_counter()
+            if self._progress is None or now - self._reported < REPORT_INTERVAL:
+                return
+            self._reported = now
+            done = self.done
+        self._progress(done, self.total)
+
+
+@dataclass
+class _Copy:
+    item: TransferItem
+    staged_path: str
+    dirs: list[str] = field(default_factory=list)
+    files: list[tuple[str, str, int]] = field(default_factory=list)
+    links: list[tuple[str, str]] = field(default_factory=list)
+    # Files not copied yet; a cancelled transfer still finishes copies that reached zero.
+    remaining: int = 0
+    error: Exception | None = None
+
+
+def _walk(copy: _Copy) -> int:
+    """Collect *copy*'s directories, files and links; returns the total file size."""
+    total = 0
+    pending = [""]
+    while pending:
+        rel = pending.pop()
+        copy.dirs.append(rel)
+        with os.scandir(os.path.join(copy.item.source, rel)) as it:
+            for entry in it:
+                child = os.path.join(rel, entry.name)
+                info = entry.stat(follow_symlinks=False)
+                if is_tree(info):
+                    pending.append(child)
+                elif entry.is_symlink() or entry.is_dir(follow_symlinks=False):
+                    # Symlinks and junctions are recreated as links, never followed.
+                    copy.links.append((entry.path, child))
+                else:
+                    size = info.st_size
+                    copy.files.append((entry.path, child, size))
+                    total += size
+    copy.remaining = len(copy.files)
+    return total
+
+
+def _copy_file(
+    source: str, target: str, meter: _Meter, cancelled: Callable[[], bool] | None
+) -> None:
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        while True:
+            if cancelled is not None and cancelled():
+                raise TransferCancelled()
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            dst.write(chunk)
+            meter.add(len(chunk))
+    try:
+        shutil.copystat(source, target)
+    except OSError:
+        pass
+
+
+def _rename_into(source: str, base_path: str, name: str) -> None:
+    target = os.path.join(base_path, name)
+    # ``os.rename`` would silently replace an empty folder that appeared meanwhile.
+    if os.path.lexists(target):
+        raise FileExistsError(errno.EEXIST, "name already taken", target)
+    os.rename(source, target)
+
+
+def _finish(copy: _Copy, base_path: str) -> None:
+    """Copy directory times and modes bottom-up, then rename the copy into place."""
+    for rel in reversed(copy.dirs):
+        try:
+            shutil.copystat(
+                os.path.join(copy.item.source, rel), os.path.join(copy.staged_path, rel)
+            )
+        except OSError:
+            pass
+    _rename_into(copy.staged_path, base_path, copy.item.name)
+
+
+def transfer(
+    base_path: str,
+    items: Sequence[TransferItem],
+    workers: int = 8,
+    progress: Callable[[int, int], None] | None = None,
+    cancelled: Callable[[], bool] | None = None,
+) -> TransferReport:
+    """Move or copy *items* into *base_path*; *progress* receives copied and total bytes.
+
+    A cancelled transfer keeps the folders already moved by rename and the
+    copies whose files were all copied, and discards every other copy.
+    """
+    report = TransferReport()
+    started = time.perf_counter()
+    copies: list[_Copy] = []
+    staging = os.path.join(base_path, STAGING_DIR, uuid.uuid4().hex[:8])
+    for item in items:
+        if item.move and same_device(item.source, base_path):
+            try:
+                _rename_into(item.source, base_path, item.name)
+                report.moved.append(item.name)
+                tracing.count("renames")
+                continue
+            except OSError as exc:
+                if exc.errno != errno.EXDEV:
+                    report.failures.append((item.name, exc))
+                    continue
+        copies.append(_Copy(item, os.path.join(staging, item.name)))
+    total = 0
+    for copy in copies:
+        try:
+            total += _walk(copy)
+            for rel in copy.dirs:
+                os.makedirs(os.path.join(copy.staged_path, rel), exist_ok=True)
+            for source, rel in copy.links:
+                os.symlink(os.readlink(source), os.path.join(copy.staged_path, rel))
+        except OSError as exc:
+            copy.error = exc
+    meter = _Meter(total, progress)
+    jobs = [
+        (copy, source, rel)
+        for copy in copies
+        if copy.error is None
+        for source, rel, _ in copy.files
+    ]
+    if jobs:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(
+                    _copy_file, source, os.path.join(copy.staged_path, rel), meter, cancelled
+                ): copy
+                for copy, source, rel in jobs
+            }
+            for future in as_completed(futures):
+                copy = futures[future]
+                try:
+                    future.result()
+                except TransferCancelled:
+                    report.cancelled = True
+                except Exception as exc:
+                    if copy.error is None:
+                        copy.error = exc
+                if cancelled is not None and cancelled():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+        # Counted once the pool has stopped, so files finished after a cancel count too.
+        for future, copy in futures.items():
+            if not future.cancelled() and future.exception() is None:
+                copy.remaining -= 1
+    report.cancelled = report.cancelled or (cancelled is not None and cancelled())
+    for copy in copies:
+        if copy.error is not None:
+            report.failures.append((copy.item.name, copy.error))
+        elif copy.remaining:
+            continue
+        else:
+            try:
+                _finish(copy, base_path)
+                report.copied.append(copy.item.name)
+            except OSError as exc:
+                report.failures.append((copy.item.name, exc))
+            else:
+                if copy.item.move:
+                    try:
+                        remove_tree(copy.item.source)
+                    except OSError as exc:
+                        # The copy is in place; only the original could not be removed.
+                        report.failures.append((copy.item.source, exc))
+    if os.path.lexists(staging):
+        try:
+            remove_tree(staging)
+            os.rmdir(os.path.dirname(staging))
+        except OSError:
+            pass
+    report.bytes = meter.done
+    report.seconds = time.perf_counter() - started
+    if progress is not None:
+        progress(meter.done, total)
+    return report